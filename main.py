@@ -1,10 +1,17 @@
-from collections import namedtuple
-from os import getcwd, path
+from datetime import datetime
+from json import dump, load
+from os import getcwd, path, remove
 from timeit import default_timer
-from nltk import download, data
 from argparse import ArgumentParser, Namespace
-from src import crawler, clustering
-from json import load, loads
+from typing import TYPE_CHECKING, Any, List, Tuple
+from src import instrumentation
+
+# Every command imports what it needs, so short commands don't pay for
+# loading the crawling and clustering libraries
+if TYPE_CHECKING:
+    from src.clustering import NewsClusterer
+    from src.dedup import Removal
+    from src.model.news_corpus import NewsCorpus
 
 def main() -> None:
     parser = ArgumentParser(description='Scrap HN and Cluster the results')
@@ -13,7 +20,7 @@ def main() -> None:
         'command',
         metavar='cmd',
         type=str,
-        choices=['init', 'crawl', 'cluster'],
+        choices=['init', 'crawl', 'cluster', 'assign', 'benchmark'],
         help='Command to be executed'
     )
     parser.add_argument(
@@ -41,21 +48,202 @@ def main() -> None:
         action='store_true',
         help='Determine if the crawling should respect robots.txt or not, defaults to False',
     )
-    parser.set_defaults(polite=False)
+    parser.add_argument(
+        '-w',
+        '--workers',
+        metavar='workers',
+        type=int,
+        required=False,
+        default=None,
+        help='Number of worker processes used to parse articles on crawl and to tokenize documents on cluster',
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='cache',
+        action='store_false',
+        help='Always rebuild the tf-idf matrix instead of reading it from the feature cache',
+    )
+    parser.add_argument(
+        '-s',
+        '--streaming',
+        dest='streaming',
+        action='store_true',
+        help='Cluster the articles in batches with Mini-Batch K-Means, keeping memory bounded for large crawls',
+    )
+    parser.add_argument(
+        '-k',
+        '--clusters',
+        metavar='clusters',
+        type=int,
+        required=False,
+        default=4,
+        help='Number of clusters used on streaming mode, defaults to 4',
+    )
+    parser.add_argument(
+        '-r',
+        '--components',
+        metavar='components',
+        type=int,
+        required=False,
+        default=None,
+        help='Reduce the tf-idf matrix to this many LSA components before clustering, defaults to no reduction',
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        dest='incremental',
+        action='store_true',
+        help='Skip articles crawled before, revalidate cached pages and merge new articles into the existing file',
+    )
+    parser.add_argument(
+        '-o',
+        '--format',
+        metavar='format',
+        type=str,
+        choices=['json', 'jsonl', 'jsonl.gz'],
+        required=False,
+        default='json',
+        help='Format of the crawling result file. jsonl and jsonl.gz are written article by article and read lazily, defaults to json',
+    )
+    parser.add_argument(
+        '-n',
+        '--neighbors',
+        metavar='neighbors',
+        type=int,
+        required=False,
+        default=None,
+        help='Also run agglomerative clustering restricted to a k-nearest-neighbour graph with this many neighbours, which never builds the pairwise distance matrix',
+    )
+    parser.add_argument(
+        '-e',
+        '--experiment',
+        metavar='config',
+        type=str,
+        required=False,
+        default=None,
+        help='Run the clustering experiment grid described on a JSON config file instead of the default runs',
+    )
+    parser.add_argument(
+        '--report',
+        metavar='report',
+        type=str,
+        required=False,
+        default=None,
+        help='Name of the JSON file the experiment, assignment or benchmark report is written to, defaults to experiment_report, assign_report or benchmark_report',
+    )
+    parser.add_argument(
+        '--sizes',
+        metavar='sizes',
+        type=str,
+        required=False,
+        default='200,1000,5000',
+        help='Comma separated sizes of the synthetic corpora used on benchmark, defaults to 200,1000,5000',
+    )
+    parser.add_argument(
+        '--repeat',
+        metavar='repeat',
+        type=int,
+        required=False,
+        default=3,
+        help='Number of timed runs of each benchmark, defaults to 3',
+    )
+    parser.add_argument(
+        '--seed',
+        metavar='seed',
+        type=int,
+        required=False,
+        default=0,
+        help='Seed of the synthetic corpora used on benchmark, defaults to 0',
+    )
+    parser.add_argument(
+        '--baseline',
+        metavar='baseline',
+        type=str,
+        required=False,
+        default=None,
+        help='Name of an earlier benchmark report JSON file to compare the timings with',
+    )
+    parser.add_argument(
+        '--model',
+        metavar='model',
+        type=str,
+        required=False,
+        default='cluster_model',
+        help='Name of the folder the 4-Means model is saved to on cluster and read from on assign, defaults to cluster_model',
+    )
+    parser.add_argument(
+        '--dedup',
+        dest='dedup',
+        action='store_true',
+        help='Remove short boilerplate pages and near-duplicates before clustering or assigning',
+    )
+    parser.add_argument(
+        '-t',
+        '--threshold',
+        metavar='threshold',
+        type=float,
+        required=False,
+        default=0.8,
+        help='Estimated Jaccard similarity from which articles are removed as near-duplicates with --dedup, defaults to 0.8',
+    )
+    parser.add_argument(
+        '--min-words',
+        metavar='words',
+        type=int,
+        required=False,
+        default=50,
+        help='Articles with fewer words are removed as boilerplate with --dedup, defaults to 50',
+    )
+    parser.add_argument(
+        '-m',
+        '--metrics',
+        metavar='metrics',
+        type=str,
+        required=False,
+        default=None,
+        help='Record wall time, CPU time, memory peak and item count of every stage to <metrics>.json and <metrics>.prom',
+    )
+    parser.add_argument(
+        '--profile',
+        dest='profile',
+        action='store_true',
+        help='Write a cProfile dump of every stage to the profile folder',
+    )
+    parser.set_defaults(polite=False, cache=True, streaming=False, incremental=False, profile=False, dedup=False)
 
     parsed_args = parser.parse_args()
     cmd = parsed_args.command
 
-    if cmd == 'init':
-        init()
-    elif cmd == 'crawl':
-        crawl(parsed_args)
-    else:
-        cluster(parsed_args)
+    recorder = None
+
+    if parsed_args.metrics is not None or parsed_args.profile:
+        recorder = instrumentation.enable(
+            trace_memory=parsed_args.metrics is not None,
+            profile=parsed_args.profile,
+        )
+
+    try:
+        if cmd == 'init':
+            init()
+        elif cmd == 'crawl':
+            crawl(parsed_args)
+        elif cmd == 'assign':
+            assign(parsed_args)
+        elif cmd == 'benchmark':
+            run_benchmark(parsed_args)
+        else:
+            cluster(parsed_args)
+    finally:
+        if recorder is not None:
+            recorder.write(parsed_args.metrics)
+
+            for (stage, summary) in recorder.summary().items():
+                print(f'{stage}: {summary["spans"]} spans, {summary["items"]} items in {round(summary["wall"], 3)} seconds')
 
 def init() -> None:
     """Initalize sklearn by downloading required data
     """
+    from nltk import download, data
 
     nltk_path = path.join(getcwd(), 'venv', 'nltk_data')
     data.path.append(nltk_path)
@@ -69,6 +257,10 @@ def crawl(args: Namespace) -> None:
     Args:
         args (Namespace): Passed command line arguments
     """
+    from src import corpus, crawler
+    from src.crawl_store import CrawlStore
+    from src.fetcher import Fetcher
+
     polite = args.polite
     filename = args.filename
     limit = args.count
@@ -77,11 +269,56 @@ def crawl(args: Namespace) -> None:
 
     print(f'Crawling HackerNews for {limit} articles...')
 
-    crawling_result = crawler.crawl_hn_for_news(limit=limit, polite=polite)
+    store = None
+    previous = None
+    target = f'{getcwd()}/{filename}.{args.format}'
+
+    if args.incremental:
+        store = CrawlStore()
+
+        if not path.exists(target):
+            store.clear() # Nothing to extend, so every URL must be crawled again
+        elif args.format == 'json':
+            previous = crawler.CrawlingResult.load(name=filename)
+            print(f'Extending {len(previous.news)} previously crawled articles')
+    else:
+        # The file is replaced, so URLs marked as already on it must be crawled again
+        CrawlStore().clear()
+
+        if args.format != 'json' and path.exists(target):
+            remove(target)
+
+    fetcher = Fetcher(store=store)
 
-    crawling_result.write_result_to_file(name=filename)
+    if args.format == 'json':
+        crawling_result = crawler.crawl_hn_for_news(
+            limit=limit,
+            polite=polite,
+            fetcher=fetcher,
+            workers=args.workers,
+        )
 
-    print(f'Successfully written data to {filename}.json')
+        if previous is not None:
+            crawling_result = previous.extend(crawling_result)
+
+        crawling_result.write_result_to_file(name=filename)
+    else:
+        # Line-delimited corpus is appended to as soon as each article is parsed
+        with corpus.CorpusWriter(target, datetime.now()) as writer:
+            crawling_result = crawler.crawl_hn_for_news(
+                limit=limit,
+                polite=polite,
+                fetcher=fetcher,
+                workers=args.workers,
+                writer=writer,
+            )
+
+    failures = crawling_result.failures
+
+    if sum(failures.values()) > 0:
+        print(f'Skipped {failures["download"]} articles which failed to download, {failures["parse"]} pages which are not articles and {failures.get("disallowed", 0)} articles disallowed by robots.txt')
+
+    print(f'Successfully written data to {filename}.{args.format}')
     print(f'Finished crawling {limit} articles from HackerNews by {round(default_timer() - start_time, 3)} seconds')
 
 def cluster(args: Namespace) -> None:
@@ -90,93 +327,344 @@ def cluster(args: Namespace) -> None:
     Args:
         args (Namespace): Passed command line arguments
     """
+    from src import clustering, corpus
+    from src.feature_cache import FeatureCache
+    from src.model.news_corpus import NewsCorpus
+
     filename = args.filename
-    target = f'{getcwd()}/{filename}.json'
+    target = f'{getcwd()}/{filename}.{args.format}'
 
     has_crawled = path.exists(target)
 
     if has_crawled is False:
         print('Reference data not found, program will crawl HackerNews first.')
         crawl(args)
-    with open(target, 'r') as file:
-        crawling_result = load(file)
-        news = crawling_result['news']
 
-        fetched_at = crawling_result['fetched_at']
+    if args.streaming:
+        streaming_cluster(args, target)
+        return
+
+    if args.experiment is not None:
+        run_experiment(args, target)
+        return
+
+    reader = corpus.CorpusReader(target)
+    news = filter_news(args, NewsCorpus.from_news(reader))
+
+    print(f'Begin clustering with data from {reader.fetched_at}')
+
+    feature_cache = FeatureCache() if args.cache else None
+    clusterer = clustering.NewsClusterer(
+        news,
+        workers=args.workers,
+        cache=feature_cache,
+        components=args.components,
+    )
 
-        news = list(map(lambda x: namedtuple('News', x.keys())(*x.values()), news))
+    if clusterer.explained_variance is not None:
+        print(f'Reduced tf-idf matrix to {args.components} components, explaining {round(clusterer.explained_variance * 100, 2)}% of the variance')
 
-        print(f'Begin clustering with data from {fetched_at}')
+    document_count = len(news)
 
-        clusterer = clustering.NewsClusterer(news)
+    print('--- BEGIN CLUSTERING WITH 4 CLUSTERS --- ')
 
-        print('--- BEGIN CLUSTERING WITH 4 CLUSTERS --- ')
+    start_fc_four = default_timer()
 
-        start_fc_four = default_timer()
+    (flatLabelFour, fc_count) = clusterer.flat_clustering(4)
 
-        (flatLabelFour, fc_count) = clusterer.flat_clustering(4)
+    print(f'Finished clustering {document_count} documents with 4-Means in {round(default_timer() - start_fc_four, 3)} seconds')
 
-        print(f'Finished clustering 200 documents with 4-Means in {round(default_timer() - start_fc_four, 3)} seconds')
+    start_acs_four = default_timer() 
 
-        start_acs_four = default_timer() 
+    (hierSingleFour, acs_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.SINGLE)
 
-        (hierSingleFour, acs_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.SINGLE)
+    print(f'Finished clustering {document_count} documents with Agglomerative Single-Link Clustering with 4 clusters in {round(default_timer() - start_acs_four, 3)} seconds')
 
-        print(f'Finished clustering 200 documents with Agglomerative Single-Link Clustering with 4 clusters in {round(default_timer() - start_acs_four, 3)} seconds')
+    start_acc_four = default_timer() 
 
-        start_acc_four = default_timer() 
+    (hierCompleteFour, acc_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.COMPLETE)
 
-        (hierCompleteFour, acc_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.COMPLETE)
+    print(f'Finished clustering {document_count} documents with Agglomerative Complete-Link Clustering with 4 clusters in {round(default_timer() - start_acc_four, 3)} seconds')
 
-        print(f'Finished clustering 200 documents with Agglomerative Complete-Link Clustering with 4 clusters in {round(default_timer() - start_acc_four, 3)} seconds')
+    start_acw_four = default_timer()
 
-        start_acw_four = default_timer()
+    (hierWardFour, acw_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.WARD)
 
-        (hierWardFour, acw_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.WARD)
+    print(f'Finished clustering {document_count} documents with Agglomerative Ward-Link Clustering with 4 clusters in {round(default_timer() - start_acw_four, 3)} seconds')
 
-        print(f'Finished clustering 200 documents with Agglomerative Ward-Link Clustering with 4 clusters in {round(default_timer() - start_acw_four, 3)} seconds')
+    start_aca_four = default_timer()
 
-        start_aca_four = default_timer()
+    (hierAverageFour, aca_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.AVERAGE)
 
-        (hierAverageFour, aca_count) = clusterer.agglomerative_clustering(4, linkage=clustering.Linkage.AVERAGE)
+    print(f'Finished clustering {document_count} documents with Agglomerative Average-Link Clustering with 4 clusters in {round(default_timer() - start_aca_four, 3)} seconds')
 
-        print(f'Finished clustering 200 documents with Agglomerative Average-Link Clustering with 4 clusters in {round(default_timer() - start_aca_four, 3)} seconds')
+    print_silhouettes(clusterer, [
+        ('FC', flatLabelFour),
+        ('AC-S', hierSingleFour),
+        ('AC-C', hierCompleteFour),
+        ('AC-W', hierWardFour),
+        ('AC-A', hierAverageFour),
+    ])
 
-        print(f'Silhouette score of FC: {clusterer.evaluate_result(flatLabelFour, clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-S: {clusterer.evaluate_result(hierSingleFour,clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-C: {clusterer.evaluate_result(hierCompleteFour, clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-W: {clusterer.evaluate_result(hierWardFour, clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-A: {clusterer.evaluate_result(hierAverageFour, clustering.EvaluationMethod.SILHOUETTE)}')
+    if args.neighbors is not None:
+        graph_results = []
 
-        print('--- END CLUSTERING WITH 4 CLUSTERS ---')
+        for linkage in clustering.Linkage:
+            start_graph = default_timer()
 
-        clusterer.generate_wordcloud(flatLabelFour,fc_count,'4-fc','wc')
-        clusterer.generate_wordcloud(hierSingleFour, acs_count,'4-ac-s','wc')
-        clusterer.generate_wordcloud(hierCompleteFour,acc_count,'4-ac-c','wc')
-        clusterer.generate_wordcloud(hierWardFour, acw_count,'4-ac-w','wc')
-        clusterer.generate_wordcloud(hierAverageFour, aca_count,'4-ac-a','wc')
+            (labels, _) = clusterer.agglomerative_clustering(4, linkage=linkage, neighbors=args.neighbors)
+            graph_results.append((f'AC-{linkage.value[0].upper()} on {args.neighbors}-NN graph', labels))
 
-        print('--- BEGIN CLUSTERING WITH 2 CLUSTERS ---')
+            print(f'Finished clustering {document_count} documents with Agglomerative {linkage.value.capitalize()}-Link Clustering on {args.neighbors}-NN graph with 4 clusters in {round(default_timer() - start_graph, 3)} seconds')
+
+        print_silhouettes(clusterer, graph_results)
+
+    print('--- END CLUSTERING WITH 4 CLUSTERS ---')
+
+    wordclouds = [
+        (flatLabelFour, fc_count, '4-fc'),
+        (hierSingleFour, acs_count, '4-ac-s'),
+        (hierCompleteFour, acc_count, '4-ac-c'),
+        (hierWardFour, acw_count, '4-ac-w'),
+        (hierAverageFour, aca_count, '4-ac-a'),
+    ]
+
+    print('--- BEGIN CLUSTERING WITH 2 CLUSTERS ---')
+
+    (flatLabelTwo, fc_count) = clusterer.flat_clustering(2)
+    (hierSingleTwo, acs_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.SINGLE)
+    (hierCompleteTwo, acc_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.COMPLETE)
+    (hierWardTwo, acw_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.WARD)
+    (hierAverageTwo, aca_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.AVERAGE)
+
+    print_silhouettes(clusterer, [
+        ('FC', flatLabelTwo),
+        ('AC-S', hierSingleTwo),
+        ('AC-C', hierCompleteTwo),
+        ('AC-W', hierWardTwo),
+        ('AC-A', hierAverageTwo),
+    ])
+
+    wordclouds.extend([
+        (flatLabelTwo, fc_count, '2-fc'),
+        (hierSingleTwo, acs_count, '2-ac-s'),
+        (hierCompleteTwo, acc_count, '2-ac-c'),
+        (hierWardTwo, acw_count, '2-ac-w'),
+        (hierAverageTwo, aca_count, '2-ac-a'),
+    ])
+
+    print('--- END CLUSTERING WITH 2 CLUSTERS ---')
+
+    clusterer.build_model(flatLabelFour, 4, '4-fc').save(f'{getcwd()}/{args.model}')
+
+    print(f'Saved 4-Means model to {args.model} for assigning new articles')
+
+    clusterer.generate_wordclouds(wordclouds, 'wc', workers=args.workers)
+
+def assign(args: Namespace) -> None:
+    """Label newly crawled HackerNews articles with a saved cluster model,
+    without refitting
+
+    Args:
+        args (Namespace): Passed command line arguments
+    """
+    from src import corpus
+    from src.cluster_model import ClusterModel
+    from src.model.news_corpus import NewsCorpus
+
+    target = f'{getcwd()}/{args.filename}.{args.format}'
+    model = ClusterModel.load(f'{getcwd()}/{args.model}')
+    reader = corpus.CorpusReader(target)
+    news = filter_news(args, NewsCorpus.from_news(reader), 'assign_dedup_report')
+
+    print(f'Assigning {len(news)} articles from {reader.fetched_at} to {args.model} fitted at {model.fitted_at}')
+
+    start_time = default_timer()
+
+    (labels, distances, unknown_term_rate) = model.assign(news.contents, workers=args.workers)
+    drift = model.drift(labels, distances, unknown_term_rate)
+
+    print(f'Finished assigning {len(news)} articles in {round(default_timer() - start_time, 3)} seconds')
+
+    for (k, summary) in enumerate(model.summaries):
+        print(f'Cluster {k}: {int((labels == k).sum())} new articles, {summary.size} fitted ({", ".join(summary.top_terms[:5])})')
+
+    print(f'Drift: {round(drift.outlier_rate * 100, 2)}% outside cluster radius, {round(drift.unknown_term_rate * 100, 2)}% unknown terms, {round(drift.proportion_shift, 3)} shift of cluster proportions')
+
+    if drift.needs_refit:
+        print('New articles drifted away from the fitted clusters, run the cluster command to refit the model')
+
+    name = args.report or 'assign_report'
+
+    with open(f'{getcwd()}/{name}.json', 'w') as file:
+        dump({
+            'model': model.to_dict(),
+            'fetched_at': reader.fetched_at,
+            'drift': drift._asdict(),
+            'assignments': [
+                { 'title': news.titles[i], 'url': news.urls[i] or None, 'cluster': int(labels[i]), 'distance': float(distances[i]) }
+                for i in range(len(news))
+            ],
+        }, file, indent=4)
+
+    print(f'Successfully written assignment report to {name}.json')
+
+def filter_news(args: Namespace, news: 'NewsCorpus', name: str = 'dedup_report') -> 'NewsCorpus':
+    """Remove short boilerplate pages and near-duplicates before clustering,
+    when enabled with --dedup
+
+    Args:
+        args (Namespace): Passed command line arguments
+        news (NewsCorpus): Crawled news
+        name (str, optional): Name of the report listing removed news. Defaults to 'dedup_report'.
+
+    Returns:
+        NewsCorpus: News to be clustered
+    """
+    from src import dedup
+
+    if not args.dedup:
+        return news
+
+    (news, removed) = dedup.deduplicate(news, threshold=args.threshold, min_words=args.min_words)
+    write_dedup_report(removed, name)
+
+    return news
+
+def write_dedup_report(removed: List['Removal'], name: str = 'dedup_report') -> None:
+    """Summarize removed news and write them to a JSON file
+
+    Args:
+        removed (List[Removal]): Removed news
+        name (str, optional): File name. Defaults to 'dedup_report'.
+    """
+    short = sum(1 for removal in removed if removal.reason == 'short')
+
+    with open(f'{getcwd()}/{name}.json', 'w') as file:
+        dump([removal._asdict() for removal in removed], file, indent=4)
+
+    print(f'Removed {short} boilerplate pages and {len(removed) - short} near-duplicates, listed on {name}.json')
+
+def print_silhouettes(clusterer: 'NewsClusterer', results: List[Tuple[str, Any]]) -> None:
+    """Print silhouette score of many clustering results, sharing the
+    pairwise distances between them
+
+    Args:
+        clusterer (NewsClusterer): Clusterer which produced the results
+        results (List[Tuple[str, Any]]): Name and labels of each clustering result
+    """
+    from src.evaluation import EvaluationMethod
+
+    method = EvaluationMethod.SILHOUETTE
+    scores = clusterer.evaluate_results([labels for (_, labels) in results], [method])
+
+    for ((name, _), score) in zip(results, scores):
+        print(f'Silhouette score of {name}: {score[method]}')
+
+def run_experiment(args: Namespace, target: str) -> None:
+    """Run a clustering experiment grid and write its report
+
+    Args:
+        args (Namespace): Passed command line arguments
+        target (str): Path to the crawling result file
+    """
+    from src import corpus, experiment
+    from src.feature_cache import FeatureCache
+    from src.model.news_corpus import NewsCorpus
+
+    config = experiment.load_config(args.experiment)
+    reader = corpus.CorpusReader(target)
+
+    print(f'Running {len(config.experiments())} clustering experiments with data from {reader.fetched_at}')
+
+    report = experiment.run_experiments(
+        filter_news(args, NewsCorpus.from_news(reader)),
+        config,
+        workers=args.workers,
+        cache=FeatureCache() if args.cache else None,
+    )
+    report['fetched_at'] = reader.fetched_at
+
+    name = args.report or 'experiment_report'
+
+    with open(f'{getcwd()}/{name}.json', 'w') as file:
+        dump(report, file, indent=4)
+
+    for run in report['runs']:
+        scores = ', '.join(f'{metric}: {score}' for (metric, score) in run['scores'].items())
+        graph = '' if run['neighbors'] is None else f' on {run["neighbors"]}-NN graph'
+        print(f'{run["algorithm"]} {run["linkage"] or ""}{graph} with {run["cluster_count"]} clusters in {round(run["timings"]["fit"], 3)} seconds, {scores}')
+
+    print(f'Successfully written experiment report to {name}.json')
+
+def run_benchmark(args: Namespace) -> None:
+    """Benchmark the crawling and clustering steps on synthetic corpora and
+    write the timings
+
+    Args:
+        args (Namespace): Passed command line arguments
+    """
+    from src import benchmark
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    name = args.report or 'benchmark_report'
+
+    print(f'Benchmarking on synthetic corpora of {args.sizes} articles with seed {args.seed}')
+
+    report = benchmark.run_benchmarks(
+        sizes=sizes,
+        repeat=args.repeat,
+        seed=args.seed,
+        workers=args.workers,
+    )
+
+    with open(f'{getcwd()}/{name}.json', 'w') as file:
+        dump(report, file, indent=4)
+
+    if args.baseline is not None:
+        with open(f'{getcwd()}/{args.baseline}.json', 'r') as file:
+            baseline = load(file)
+
+        for result in benchmark.compare(baseline, report):
+            print(f'{result["benchmark"]} on {result["size"]} articles takes {round(result["ratio"], 3)}x the time of {args.baseline}')
+
+    print(f'Successfully written benchmark report to {name}.json')
+
+def streaming_cluster(args: Namespace, target: str) -> None:
+    """Cluster HackerNews articles in batches with Mini-Batch K-Means
+
+    Args:
+        args (Namespace): Passed command line arguments
+        target (str): Path to the crawling result file
+    """
+    from src import clustering, corpus, dedup
+
+    cluster_count = args.clusters
+
+    print(f'--- BEGIN STREAMING CLUSTERING WITH {cluster_count} CLUSTERS ---')
+
+    start_time = default_timer()
+
+    batches = corpus.iter_news(target)
+    removed = []
+
+    if args.dedup:
+        batches = dedup.deduplicate_batches(batches, removed, threshold=args.threshold, min_words=args.min_words)
+
+    (clusterer, labels, count) = clustering.NewsClusterer.streaming_clustering(
+        batches,
+        cluster_count,
+    )
 
-        (flatLabelTwo, fc_count) = clusterer.flat_clustering(2)
-        (hierSingleTwo, acs_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.SINGLE)
-        (hierCompleteTwo, acc_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.COMPLETE)
-        (hierWardTwo, acw_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.WARD)
-        (hierAverageTwo, aca_count) = clusterer.agglomerative_clustering(2, linkage=clustering.Linkage.AVERAGE)
+    if args.dedup:
+        write_dedup_report(removed)
 
-        print(f'Silhouette score of FC: {clusterer.evaluate_result(flatLabelTwo, clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-S: {clusterer.evaluate_result(hierSingleTwo,clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-C: {clusterer.evaluate_result(hierCompleteTwo, clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-W: {clusterer.evaluate_result(hierWardTwo, clustering.EvaluationMethod.SILHOUETTE)}')
-        print(f'Silhouette score of AC-A: {clusterer.evaluate_result(hierAverageTwo, clustering.EvaluationMethod.SILHOUETTE)}')
+    print(f'Finished clustering with Mini-Batch {count}-Means in {round(default_timer() - start_time, 3)} seconds')
+    print(f'Silhouette score of sampled MBFC: {clusterer.evaluate_result(labels, clustering.EvaluationMethod.SILHOUETTE)}')
 
-        clusterer.generate_wordcloud(flatLabelTwo,fc_count,'2-fc','wc')
-        clusterer.generate_wordcloud(hierSingleTwo, acs_count,'2-ac-s','wc')
-        clusterer.generate_wordcloud(hierCompleteTwo,acc_count,'2-ac-c','wc')
-        clusterer.generate_wordcloud(hierWardTwo, acw_count,'2-ac-w','wc')
-        clusterer.generate_wordcloud(hierAverageTwo, aca_count,'2-ac-a','wc')
+    clusterer.generate_wordcloud(labels, count, f'{count}-mbfc', 'wc')
 
-        print('--- END CLUSTERING WITH 2 CLUSTERS ---')
+    print(f'--- END STREAMING CLUSTERING WITH {cluster_count} CLUSTERS ---')
 
 if __name__ == "__main__":    
     main()
\ No newline at end of file
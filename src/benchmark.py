@@ -0,0 +1,242 @@
+import asyncio
+import platform
+import subprocess
+import sys
+from contextlib import redirect_stdout
+from os import cpu_count, devnull, path
+from tempfile import TemporaryDirectory
+from timeit import default_timer
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from src import crawler
+from src.clustering import EvaluationMethod, Linkage, NewsClusterer
+from src.evaluation import Evaluator
+from src.fetcher import USER_AGENT
+from src.hierarchy import DEFAULT_NEIGHBORS, HierarchyEngine
+from src.synthetic import generate_corpus, render_article, render_listing_page
+from src.tokenizer import _stem
+
+DEFAULT_SIZES = [200, 1000, 5000]
+MEMORY_BOUND_LIMIT = 5000
+ARTICLE_LIMIT = 2000
+STARTUP_COMMAND = [sys.executable, '-c', 'import main']
+
+_root = path.dirname(path.dirname(path.abspath(__file__)))
+
+class _CannedFetcher:
+    """Offline stand-in for `Fetcher`, serving canned pages by URL
+    """
+    def __init__(self, pages: Dict[str, str]) -> None:
+        self.pages = pages
+        self.user_agent = USER_AGENT
+        self.store = None
+
+    async def fetch(self, url: str) -> Optional[str]:
+        return self.pages.get(url)
+
+    async def fetch_all(self, urls: List[str]) -> AsyncIterator[Tuple[int, str, Optional[str]]]:
+        for (index, url) in enumerate(urls):
+            yield (index, url, self.pages.get(url))
+
+def _measure(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """Time a benchmark several times, running `setup` untimed before each run
+
+    Args:
+        func (Callable[[], Any]): Benchmarked function
+        repeat (int): Number of timed runs
+        setup (Callable[[], Any], optional): Function resetting state between runs. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: Duration of every run in seconds, the best and the mean one
+    """
+    runs = []
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start_time = default_timer()
+        func()
+        runs.append(default_timer() - start_time)
+
+    return {
+        'runs': runs,
+        'best': min(runs),
+        'mean': sum(runs) / len(runs),
+    }
+
+def _start_interpreter() -> None:
+    """Import the command line entry point on a fresh interpreter, so every
+    module it loads at startup is timed
+    """
+    subprocess.run(STARTUP_COMMAND, cwd=_root, check=True)
+
+def _quietly(func: Callable[..., Any], *args) -> Any:
+    """Call a function with its standard output discarded
+
+    Args:
+        func (Callable[..., Any]): Function to be called
+        *args: Arguments of the call
+
+    Returns:
+        Any: Return value of the call
+    """
+    with open(devnull, 'w') as null, redirect_stdout(null):
+        return func(*args)
+
+def run_benchmarks(
+    sizes: List[int] = DEFAULT_SIZES,
+    repeat: int = 3,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    memory_bound_limit: int = MEMORY_BOUND_LIMIT,
+    article_limit: int = ARTICLE_LIMIT,
+) -> Dict[str, Any]:
+    """Benchmark tokenizing, vectorizing, clustering, evaluation, word cloud
+    rendering, listing parsing and the crawl pipeline on seeded synthetic
+    corpora served from memory, without any network access.
+
+    Agglomerative clustering and exact silhouette need pairwise distances,
+    whose memory grows quadratically with the corpus, so they are skipped
+    above `memory_bound_limit` articles, unlike agglomerative clustering on
+    the k-nearest-neighbour graph. CLI startup doesn't depend on the
+    corpus, so it's recorded once with size 0.
+
+    Args:
+        sizes (List[int], optional): Corpus sizes. Defaults to 200, 1000 and 5000.
+        repeat (int, optional): Number of timed runs of each benchmark. Defaults to 3.
+        seed (int, optional): Corpus seed, equal seeds give comparable results. Defaults to 0.
+        workers (int, optional): Number of processes used to tokenize and parse. Defaults to serial vectorizing and one process per CPU on parsing.
+        memory_bound_limit (int, optional): Largest corpus on pairwise distance benchmarks. Defaults to 5000.
+        article_limit (int, optional): Largest number of article pages parsed per corpus. Defaults to 2000.
+
+    Returns:
+        Dict[str, Any]: Machine-readable report with the environment and the timings of every benchmark on every size
+    """
+    results = []
+
+    def record(name: str, size: int, items: int, func: Callable[[], Any], setup: Optional[Callable[[], Any]] = None, bounded: bool = True) -> None:
+        result = { 'benchmark': name, 'size': size, 'items': items }
+
+        if not bounded and size > memory_bound_limit:
+            result['skipped'] = f'more than {memory_bound_limit} articles'
+        else:
+            result.update(_measure(func, repeat, setup))
+            print(f'{name} on {size} articles: {round(result["best"], 4)} seconds')
+
+        results.append(result)
+
+    startup = { 'benchmark': 'startup', 'size': 0, 'items': 1, **_measure(_start_interpreter, repeat) }
+    results.append(startup)
+
+    print(f'startup: {round(startup["best"], 4)} seconds')
+
+    # Smaller corpora are prefixes of the largest one
+    corpus = generate_corpus(max(sizes), seed=seed)
+
+    for size in sorted(sizes):
+        news = corpus[:size]
+        clusterer = NewsClusterer(news, workers=workers)
+
+        record('tokenize', size, size, lambda: [clusterer._tokenize(item.contents) for item in news], setup=_stem.cache_clear)
+        record('tf_idf', size, size, lambda: clusterer._tf_idf(news), setup=_stem.cache_clear)
+        record('flat_clustering', size, size, lambda: clusterer.flat_clustering(4))
+
+        for linkage in Linkage:
+            record(
+                f'agglomerative_clustering.{linkage.value}',
+                size,
+                size,
+                lambda: clusterer.agglomerative_clustering(4, linkage=linkage),
+                setup=lambda: setattr(clusterer, 'hierarchy', HierarchyEngine(clusterer.features)),
+                bounded=False,
+            )
+            record(
+                f'agglomerative_clustering.{linkage.value}.knn',
+                size,
+                size,
+                lambda: clusterer.agglomerative_clustering(4, linkage=linkage, neighbors=DEFAULT_NEIGHBORS),
+                setup=lambda: setattr(clusterer, 'hierarchy', HierarchyEngine(clusterer.features)),
+            )
+
+        (labels, count) = clusterer.flat_clustering(4)
+
+        # Fresh evaluators, so silhouette pays for its pairwise distances on every run
+        for method in EvaluationMethod:
+            record(
+                f'evaluate_result.{method.name.lower()}',
+                size,
+                size,
+                lambda: clusterer.evaluate_result(labels, method),
+                setup=lambda: setattr(clusterer, 'evaluator', Evaluator(clusterer.features)),
+                bounded=method != EvaluationMethod.SILHOUETTE,
+            )
+
+        record('estimate_silhouette', size, min(size, 1000), lambda: clusterer.estimate_silhouette(labels, seed=seed))
+
+        with TemporaryDirectory() as folder:
+            record('generate_wordcloud', size, count, lambda: _quietly(clusterer.generate_wordcloud, labels, count, str(size), folder))
+
+        urls = [item.url for item in news]
+        listings = [render_listing_page(urls[i:i + 30], i // 30 + 1) for i in range(0, size, 30)]
+
+        record('parse_response_body', size, len(listings), lambda: [crawler._parse_response_body(body) for body in listings])
+
+        articles = news[:article_limit]
+        pages = { item.url: render_article(item) for item in articles }
+
+        for start in range(0, len(articles), 30):
+            page = start // 30 + 1
+            pages[f'{crawler.HN_BASE_URL}/news?p={page}'] = render_listing_page(urls[start:min(start + 30, len(articles))], page)
+
+        fetcher = _CannedFetcher(pages)
+
+        record(
+            'crawl_pipeline',
+            size,
+            len(articles),
+            lambda: asyncio.run(
+                crawler._CrawlPipeline(len(articles), False, crawler.HN_BASE_URL, fetcher, workers=workers).run()
+            ),
+        )
+
+    return {
+        'seed': seed,
+        'repeat': repeat,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': cpu_count(),
+            'workers': workers,
+        },
+        'results': results,
+    }
+
+def compare(baseline: Dict[str, Any], report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compare the best timings of two benchmark reports
+
+    Args:
+        baseline (Dict[str, Any]): Earlier benchmark report
+        report (Dict[str, Any]): Current benchmark report
+
+    Returns:
+        List[Dict[str, Any]]: Benchmark name, size and current to baseline ratio of every benchmark run on both reports
+    """
+    previous = {
+        (result['benchmark'], result['size']): result['best']
+        for result in baseline['results'] if 'best' in result
+    }
+
+    comparison = []
+
+    for result in report['results']:
+        key = (result['benchmark'], result['size'])
+
+        if 'best' in result and key in previous:
+            comparison.append({
+                'benchmark': result['benchmark'],
+                'size': result['size'],
+                'ratio': result['best'] / previous[key],
+            })
+
+    return comparison
@@ -0,0 +1,259 @@
+from datetime import datetime
+from json import dump, load
+from os import makedirs, path, replace
+from shutil import rmtree
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics import pairwise_distances
+from sklearn.preprocessing import normalize
+
+from src.tokenizer import pretokenized, tokenize_corpus
+
+OUTLIER_QUANTILE = 0.95
+MAX_OUTLIER_RATE = 0.2
+MAX_UNKNOWN_TERM_RATE = 0.3
+
+class ClusterSummary(NamedTuple):
+    """Summary of a fitted cluster
+    """
+    size: int
+    radius: float
+    mean_distance: float
+    top_terms: List[str]
+
+class Drift(NamedTuple):
+    """How far newly assigned articles are from the fitted clusters.
+
+    Without drift, about `1 - OUTLIER_QUANTILE` of the articles fall outside
+    the radius of their cluster. Reduced features hide terms missing from the
+    vocabulary, so those are counted separately.
+    """
+    outlier_rate: float
+    unknown_term_rate: float
+    proportion_shift: float
+    needs_refit: bool
+
+class ClusterModel:
+    """Fitted clustering which can label new articles without refitting.
+
+    Holds what is needed to vectorize new articles like the fitted corpus
+    (vocabulary, idf weights and LSA components), the centroid of every
+    cluster and a summary of each cluster. Saved as a directory of `.npy`
+    files and a `meta.json`.
+    """
+    def __init__(
+        self,
+        vocabulary: List[str],
+        idf: np.ndarray,
+        centroids: np.ndarray,
+        summaries: List[ClusterSummary],
+        components: Optional[np.ndarray] = None,
+        name: str = '',
+        fitted_at: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            vocabulary (List[str]): Terms ordered by tf-idf column
+            idf (np.ndarray): Idf weight of each term
+            centroids (np.ndarray): Centroid of each cluster on feature space
+            summaries (List[ClusterSummary]): Summary of each cluster
+            components (np.ndarray, optional): LSA components, if features were reduced. Defaults to None.
+            name (str, optional): Name of the clustering, e.g. `4-fc`. Defaults to ''.
+            fitted_at (str, optional): Fitting timestamp, in ISO format. Defaults to now.
+        """
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.centroids = centroids
+        self.summaries = summaries
+        self.components = components
+        self.name = name
+        self.fitted_at = fitted_at or datetime.now().isoformat()
+
+        self._vectorizer = None
+
+    @classmethod
+    def fit(
+        cls,
+        features: Any,
+        labels: Any,
+        vocabulary: List[str],
+        idf: np.ndarray,
+        top_terms: List[List[str]],
+        components: Optional[np.ndarray] = None,
+        name: str = '',
+    ) -> 'ClusterModel':
+        """Build a model from a clustering result
+
+        Args:
+            features (Any): Features of the clustered articles
+            labels (Any): Label of each article, from 0 until the number of clusters
+            vocabulary (List[str]): Terms ordered by tf-idf column
+            idf (np.ndarray): Idf weight of each term
+            top_terms (List[List[str]]): Heaviest terms of each cluster
+            components (np.ndarray, optional): LSA components, if features were reduced. Defaults to None.
+            name (str, optional): Name of the clustering, e.g. `4-fc`. Defaults to ''.
+
+        Returns:
+            ClusterModel: Fitted model
+        """
+        labels = np.asarray(labels)
+        count = len(top_terms)
+        membership = csr_matrix((np.ones(len(labels)), (np.arange(len(labels)), labels)), shape=(len(labels), count))
+        sizes = np.asarray(membership.sum(axis=0)).ravel()
+
+        sums = membership.T.dot(features)
+        sums = sums.toarray() if issparse(sums) else np.asarray(sums)
+        centroids = sums / np.maximum(sizes, 1)[:, None]
+
+        distances = pairwise_distances(features, centroids)[np.arange(len(labels)), labels]
+        summaries = []
+
+        for k in range(count):
+            member_distances = distances[labels == k]
+
+            summaries.append(ClusterSummary(
+                size=int(sizes[k]),
+                radius=float(np.quantile(member_distances, OUTLIER_QUANTILE)) if len(member_distances) > 0 else 0.0,
+                mean_distance=float(member_distances.mean()) if len(member_distances) > 0 else 0.0,
+                top_terms=top_terms[k],
+            ))
+
+        return cls(vocabulary, np.asarray(idf), centroids, summaries, components=components, name=name)
+
+    def save(self, directory: str) -> None:
+        """Write the model to a directory, replacing any previous model
+
+        Args:
+            directory (str): Model directory
+        """
+        staging = f'{directory}.tmp'
+
+        makedirs(staging, exist_ok=True)
+
+        np.save(path.join(staging, 'idf.npy'), self.idf)
+        np.save(path.join(staging, 'centroids.npy'), self.centroids)
+
+        if self.components is not None:
+            np.save(path.join(staging, 'components.npy'), self.components)
+
+        with open(path.join(staging, 'meta.json'), 'w') as file:
+            dump({
+                'name': self.name,
+                'fitted_at': self.fitted_at,
+                'vocabulary': self.vocabulary,
+                'summaries': [summary._asdict() for summary in self.summaries],
+            }, file, ensure_ascii=True)
+
+        rmtree(directory, ignore_errors=True)
+        replace(staging, directory)
+
+    @classmethod
+    def load(cls, directory: str) -> 'ClusterModel':
+        """Read a model written by `save()`
+
+        Args:
+            directory (str): Model directory
+
+        Returns:
+            ClusterModel: Fitted model
+        """
+        with open(path.join(directory, 'meta.json'), 'r') as file:
+            meta = load(file)
+
+        components_path = path.join(directory, 'components.npy')
+
+        return cls(
+            vocabulary=meta['vocabulary'],
+            idf=np.load(path.join(directory, 'idf.npy')),
+            centroids=np.load(path.join(directory, 'centroids.npy')),
+            summaries=[ClusterSummary(**summary) for summary in meta['summaries']],
+            components=np.load(components_path) if path.exists(components_path) else None,
+            name=meta['name'],
+            fitted_at=meta['fitted_at'],
+        )
+
+    def transform(self, tokens: List[List[str]]) -> Any:
+        """Vectorize tokenized articles on the fitted feature space, with the
+        same sublinear tf-idf weighting and normalization
+
+        Args:
+            tokens (List[List[str]]): Tokens of each article
+
+        Returns:
+            Any: Features of each article
+        """
+        if self._vectorizer is None:
+            self._vectorizer = CountVectorizer(analyzer=pretokenized, vocabulary=self.vocabulary)
+
+        counts = self._vectorizer.transform(tokens).astype(np.float64)
+        counts.data = np.log(counts.data) + 1
+
+        features = normalize(counts.multiply(self.idf).tocsr())
+
+        if self.components is None:
+            return features
+
+        return normalize(features.dot(self.components.T))
+
+    def assign(self, texts: List[str], workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Label articles by their nearest centroid
+
+        Args:
+            texts (List[str]): Article contents
+            workers (int, optional): Number of tokenizing processes. Tokenize on the current process if None. Defaults to None.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, float]: Label of each article, its distance to the centroid and the ratio of terms missing from the vocabulary
+        """
+        tokens = tokenize_corpus(texts, workers=workers)
+        distances = pairwise_distances(self.transform(tokens), self.centroids)
+        labels = distances.argmin(axis=1)
+
+        total = sum(len(words) for words in tokens)
+        known = set(self.vocabulary)
+        unknown = sum(1 for words in tokens for word in words if word not in known)
+
+        return (labels, distances[np.arange(len(labels)), labels], unknown / total if total > 0 else 0.0)
+
+    def drift(
+        self,
+        labels: np.ndarray,
+        distances: np.ndarray,
+        unknown_term_rate: float,
+        max_outlier_rate: float = MAX_OUTLIER_RATE,
+        max_unknown_term_rate: float = MAX_UNKNOWN_TERM_RATE,
+    ) -> Drift:
+        """Measure how far assigned articles are from the fitted clusters
+
+        Args:
+            labels (np.ndarray): Assigned label of each article
+            distances (np.ndarray): Distance of each article to its centroid
+            unknown_term_rate (float): Ratio of terms missing from the vocabulary
+            max_outlier_rate (float, optional): Outlier rate from which a refit is needed. Defaults to 0.2.
+            max_unknown_term_rate (float, optional): Unknown term rate from which a refit is needed. Defaults to 0.3.
+
+        Returns:
+            Drift: Outlier rate, unknown term rate, total variation distance between fitted and assigned cluster proportions and whether a refit is needed
+        """
+        radii = np.array([summary.radius for summary in self.summaries])
+        sizes = np.array([summary.size for summary in self.summaries], dtype=np.float64)
+
+        outlier_rate = float(np.mean(distances > radii[labels])) if len(labels) > 0 else 0.0
+        assigned = np.bincount(labels, minlength=len(sizes)) / max(len(labels), 1)
+        proportion_shift = float(np.abs(assigned - sizes / sizes.sum()).sum() / 2)
+
+        return Drift(
+            outlier_rate=outlier_rate,
+            unknown_term_rate=unknown_term_rate,
+            proportion_shift=proportion_shift,
+            needs_refit=outlier_rate > max_outlier_rate or unknown_term_rate > max_unknown_term_rate,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'fitted_at': self.fitted_at,
+            'summaries': [summary._asdict() for summary in self.summaries],
+        }
@@ -1,26 +1,30 @@
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
-from typing import Any, Tuple
-from nltk import word_tokenize
-from nltk.stem.porter import PorterStemmer
-from nltk.corpus import stopwords
+from os import path
+from random import Random
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+import numpy as np
 from scipy.sparse.csr import csr_matrix
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans, AgglomerativeClustering
-from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
-from re import search
+from sklearn import __version__ as sklearn_version
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import normalize
+from sklearn.decomposition import TruncatedSVD
 from typing import List
-import pandas as pd
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 
 from src.model.news import News
-
-class EvaluationMethod(Enum):
-    """List of allowed clustering evaluation methods
-    """
-    SILHOUETTE = 1
-    CALINSKI_HARABASZ = 2
-    DAVIES_BOULDIN = 3
+from src.model.news_corpus import NewsCorpus
+from src.tokenizer import pretokenized, tokenize, tokenize_corpus, tokenizer_identity
+from src.feature_cache import FeatureCache
+from src.cluster_model import ClusterModel
+from src.evaluation import EvaluationMethod, Evaluator, SilhouetteEstimate
+from src.hierarchy import HierarchyEngine
+from src.instrumentation import span
+from src.k_selection import DEFAULT_K_RANGE, KSelection, select_cluster_count
+
+VECTORIZER_SETTINGS = {
+    'sublinear_tf': True,
+}
 
 class Linkage(Enum):
     """List of allowed linkage for agglomerative clustering
@@ -30,14 +34,168 @@ class Linkage(Enum):
     AVERAGE = 'average'
     SINGLE = 'single'
 
+def _hash_features(texts: List[str], n_features: int) -> csr_matrix:
+    """Vectorize texts without a fitted vocabulary, using sublinear term
+    frequency and l2 normalization like the tf-idf matrix
+
+    Args:
+        texts (List[str]): Texts to be vectorized
+        n_features (int): Number of hashed features
+
+    Returns:
+        csr_matrix: Feature matrix
+    """
+    vectorizer = HashingVectorizer(
+        tokenizer=tokenize,
+        n_features=n_features,
+        alternate_sign=False,
+        norm=None,
+    )
+
+    features = vectorizer.transform(texts)
+    features.data = np.log(features.data) + 1
+
+    return normalize(features)
+
+def _partial_fit(model: MiniBatchKMeans, texts: List[str], n_features: int) -> None:
+    """Update a streaming model with one batch of texts
+
+    Args:
+        model (MiniBatchKMeans): Model to be updated
+        texts (List[str]): Texts of the batch
+        n_features (int): Number of hashed features
+    """
+    with span('vectorize', len(texts)):
+        features = _hash_features(texts, n_features)
+
+    with span('fit', len(texts)):
+        model.partial_fit(features)
+
+def _cache_settings() -> Dict[str, Any]:
+    """Settings identifying a cached tf-idf matrix: the vectorizer, its
+    version and settings, and the tokenizer feeding it
+
+    Returns:
+        Dict[str, Any]: JSON serializable settings
+    """
+    return {
+        'vectorizer': TfidfVectorizer.__name__,
+        'sklearn': sklearn_version,
+        'settings': VECTORIZER_SETTINGS,
+        'tokenizer': tokenizer_identity(),
+    }
+
+def _render_wordcloud(frequencies: Dict[str, float], filename: str) -> str:
+    """Render a word cloud picture straight to a file
+
+    Args:
+        frequencies (Dict[str, float]): Weight of each word
+        filename (str): Target picture file
+
+    Returns:
+        str: Target picture file
+    """
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(max_font_size=50, max_words=len(frequencies), background_color='white')
+    wordcloud.generate_from_frequencies(frequencies)
+    wordcloud.to_file(filename)
+
+    return filename
+
 class NewsClusterer:
     """Clusterer for HackerNews' news articles
     """
-    def __init__(self, news: List[News]) -> None:
+    def __init__(
+        self,
+        news: Union[List[News], NewsCorpus],
+        workers: Optional[int] = None,
+        cache: Optional[FeatureCache] = None,
+        components: Optional[int] = None,
+    ) -> None:
         if len(news) < 15:
             raise ValueError('The lowest possible news to be clustered is 15')
 
+        self.workers = workers
+        self.cache = cache
         self.tf_idf = self._tf_idf(news)
+        self.term_weights = self.tf_idf
+        self.features = self._reduce(self.tf_idf, components)
+        self.hierarchy = HierarchyEngine(self.features)
+        self.evaluator = Evaluator(self.features, self.hierarchy)
+
+    @classmethod
+    def streaming_clustering(
+        cls,
+        batches: Iterable[List[News]],
+        cluster_count: int,
+        sample_size: int = 1000,
+        n_features: int = 2 ** 18,
+        seed: Optional[int] = None,
+    ) -> Tuple['NewsClusterer', Any, int]:
+        """Cluster a stream of HackerNews' articles using Mini-Batch K-Means.
+        Articles are vectorized with a hashing vectorizer batch by batch, so
+        memory stays bounded regardless of the corpus size.
+
+        Args:
+            batches (Iterable[List[News]]): Batches of HN's articles
+            cluster_count (int): Number of desired cluster
+            sample_size (int, optional): Number of articles kept as a uniform sample for evaluation and word clouds. Defaults to 1000.
+            n_features (int, optional): Number of hashed features. Defaults to 2 ** 18.
+            seed (int, optional): Seed for sampling and K-Means initialization. Defaults to None.
+
+        Returns:
+            Tuple(NewsClusterer, Any, int): Clusterer over the sampled articles, labels for each sampled article and how much clusters is used
+        """
+        model = MiniBatchKMeans(n_clusters=cluster_count, random_state=seed)
+        rng = Random(seed)
+
+        sample = []
+        pending = []
+        seen = 0
+
+        for batch in batches:
+            for news in batch:
+                # Reservoir sampling, every article has the same chance to be kept
+                if len(sample) < sample_size:
+                    sample.append(news.contents)
+                else:
+                    index = rng.randrange(seen + 1)
+
+                    if index < sample_size:
+                        sample[index] = news.contents
+
+                seen += 1
+
+            pending.extend(map(lambda news: news.contents, batch))
+
+            # The first partial fit needs at least one article per cluster
+            if len(pending) >= cluster_count:
+                _partial_fit(model, pending, n_features)
+                pending = []
+
+        if len(sample) < 15:
+            raise ValueError('The lowest possible news to be clustered is 15')
+
+        if len(pending) > 0:
+            _partial_fit(model, pending, n_features)
+
+        clusterer = cls.__new__(cls)
+        clusterer.workers = None
+        clusterer.cache = None
+        # Hashed features have no vocabulary, so word clouds are weighted by the sample tf-idf
+        vectorizer = TfidfVectorizer(tokenizer=tokenize, **VECTORIZER_SETTINGS)
+
+        clusterer.texts = sample
+        clusterer.term_weights = vectorizer.fit_transform(sample)
+        clusterer.vocabulary = vectorizer.get_feature_names()
+        clusterer.idf = vectorizer.idf_
+        clusterer.tf_idf = _hash_features(sample, n_features)
+        clusterer.features = clusterer._reduce(clusterer.tf_idf, None)
+        clusterer.hierarchy = HierarchyEngine(clusterer.features)
+        clusterer.evaluator = Evaluator(clusterer.features, clusterer.hierarchy)
+
+        return (clusterer, model.predict(clusterer.tf_idf), cluster_count)
 
     def _tokenize(_, text: str) -> List[str]:
         """Generate tokens from a long text
@@ -48,60 +206,114 @@ class NewsClusterer:
         Returns:
             List[str]: List of tokens
         """
-        tokens = word_tokenize(text)
-        tokens = [token.lower() for token in tokens]
+        return tokenize(text)
 
-        stemmer = PorterStemmer()
-        tokens = [stemmer.stem(token) for token in tokens]
+    def _tf_idf(self, news: Union[List[News], NewsCorpus]) -> csr_matrix:
+        """Generate tf-idf matrix from list of news
 
-        tokens = list(filter(lambda token: token not in stopwords.words('english'), tokens))
-    
-        tokens = list(filter(lambda token: search("[^a-zA-Z-]+", token) is None, tokens))
+        Args:
+            news_list (Union[List[News], NewsCorpus]): List of news or a columnar corpus, whose contents are used without copying
 
-        return tokens
+        Returns:
+            csr_matrix: tf-idf matrix
+        """
+        if isinstance(news, NewsCorpus):
+            texts = news.contents
+        else:
+            texts = list(map(lambda news: news.contents, news))
 
-    def _tf_idf(self, news: List[News]) -> csr_matrix:
-        """Generate tf-idf matrix from list of news
+        self.texts = texts
+
+        key = None
+
+        if self.cache is not None:
+            key = self.cache.key(texts, _cache_settings())
+            cached = self.cache.load(key)
+
+            if cached is not None:
+                (tf_idf, self.vocabulary, self.idf) = cached
+
+                return tf_idf
+
+        # Tokenized separately from vectorizing to measure both stages, the
+        # analyzer only passes the tokens through
+        with span('tokenize', len(texts)):
+            tokens = tokenize_corpus(texts, workers=self.workers)
+
+        with span('vectorize', len(texts)):
+            vectorizer = TfidfVectorizer(analyzer=pretokenized, **VECTORIZER_SETTINGS)
+            tf_idf = vectorizer.fit_transform(tokens)
+
+        self.vocabulary = vectorizer.get_feature_names()
+        self.idf = vectorizer.idf_
+
+        if self.cache is not None:
+            self.cache.store(key, tf_idf, self.vocabulary, self.idf)
+
+        return tf_idf
+
+    def select_cluster_count(
+        self,
+        linkage: Optional[str] = None,
+        k_range: Iterable[int] = DEFAULT_K_RANGE,
+        patience: Optional[int] = None,
+        neighbors: Optional[int] = None,
+    ) -> KSelection:
+        """Score candidate cluster counts using silhouette method
 
         Args:
-            news_list (List[News]): List of news
+            linkage (str, optional): Linkage name for agglomerative clustering. Uses K-Means if None. Defaults to None.
+            k_range (Iterable[int], optional): Candidate cluster counts. Defaults to 2 until 14.
+            patience (int, optional): Stop once this many consecutive k fail to beat the best score. Defaults to None.
+            neighbors (int, optional): Cut the agglomerative tree built on the k-nearest-neighbour graph with this many neighbours, scoring with sampled silhouette so the pairwise distance matrix is never computed. Defaults to None.
 
         Returns:
-            csr_matrix: tf-idf matrix
+            KSelection: Best cluster count and the score curve
         """
-        vectorizer = TfidfVectorizer(
-            tokenizer=self._tokenize,
-            sublinear_tf=True,
+        tree = None if linkage is None else self.hierarchy.tree(linkage, neighbors)
+        graph = linkage is not None and neighbors is not None
+
+        return select_cluster_count(
+            self.features,
+            None if graph else self.hierarchy.distances,
+            tree=tree,
+            k_range=k_range,
+            workers=self.workers,
+            patience=patience,
         )
 
-        texts = list(map(lambda news: news.contents, news))
-        self.texts = texts
+    def _reduce(self, tf_idf: csr_matrix, components: Optional[int]) -> Any:
+        """Reduce tf-idf matrix dimension using latent semantic analysis
+
+        Args:
+            tf_idf (csr_matrix): tf-idf matrix
+            components (int, optional): Number of SVD components. Skip the reduction if None.
+
+        Returns:
+            Any: Normalized reduced matrix, or the tf-idf matrix itself when not reduced
+        """
+        if components is None:
+            self.explained_variance = None
+            self.svd = None
+
+            return tf_idf
 
-        return vectorizer.fit_transform(texts)    
+        with span('reduce', tf_idf.shape[0]):
+            svd = TruncatedSVD(n_components=components)
+            reduced = normalize(svd.fit_transform(tf_idf))
 
-    def _get_optimal_cluster_count(self,linkage=None) -> int:
+        self.explained_variance = svd.explained_variance_ratio_.sum()
+        self.svd = svd
+
+        return reduced
+
+    def _get_optimal_cluster_count(self,linkage=None, neighbors: Optional[int] = None) -> int:
         """Get optimum number of cluster using silhoutte method
 
         Returns:
             int: Optimum number of cluster
         """
-        K = range(2,15)
-        silhoutte_metric_score = []
-
-        if linkage is None:
-            for k in K:
-                cluster = KMeans(n_clusters=k).fit(self.tf_idf)
-                labels = cluster.labels_
-                silhoutte_metric_score.append(silhouette_score(self.tf_idf, labels, metric='euclidean'))
-        else:
-            for k in K:
-                cluster = AgglomerativeClustering(n_clusters=k,linkage=linkage).fit(self.tf_idf.toarray())
-                labels = cluster.labels_
-                silhoutte_metric_score.append(silhouette_score(self.tf_idf, labels, metric='euclidean'))
-
-        max_index = silhoutte_metric_score.index(max(silhoutte_metric_score))
-
-        return max_index + 2    
+        return self.select_cluster_count(linkage=linkage, neighbors=neighbors).best
 
     def flat_clustering(self, cluster_count = None) -> Tuple[Any, int]:
         """Cluster HackerNews' articles using K-Means, a flat clustering method
@@ -118,27 +330,29 @@ class NewsClusterer:
 
         model = KMeans(n_clusters=cluster_count)
 
-        model.fit(self.tf_idf)
+        with span('fit', self.features.shape[0]):
+            model.fit(self.features)
 
         return (model.labels_, cluster_count)
 
-    def agglomerative_clustering(self, cluster_count = None, linkage: Linkage = Linkage.SINGLE) -> Tuple[Any, int]:
+    def agglomerative_clustering(self, cluster_count = None, linkage: Linkage = Linkage.SINGLE, neighbors: Optional[int] = None) -> Tuple[Any, int]:
         """Cluster HackerNews' articles using agglomerative hierarchical clustering
 
         Args:
             news (List[News]): List of HN's articles
             clusters (int, optional): Number of desired cluster. Defaults to _elbow_method().
+            neighbors (int, optional): Only merge clusters connected on the k-nearest-neighbour graph with this many neighbours, without the pairwise distance matrix. Exact if None. Defaults to None.
 
         Returns:
             Tuple(Any, int): Labels for each news item and how much clusters is used
         """
         if cluster_count is None:
-            cluster_count = self._get_optimal_cluster_count(linkage=linkage.value)
+            cluster_count = self._get_optimal_cluster_count(linkage=linkage.value, neighbors=neighbors)
 
-        model = AgglomerativeClustering(n_clusters=cluster_count, affinity='euclidean', linkage=linkage.value)
-        model.fit(self.tf_idf.toarray())
+        with span('fit', self.features.shape[0]):
+            labels = self.hierarchy.cut(linkage.value, cluster_count, neighbors)
 
-        return (model.labels_, cluster_count)
+        return (labels, cluster_count)
 
 
     def evaluate_result(self, labels: Any, method: EvaluationMethod) -> float:
@@ -159,21 +373,85 @@ class NewsClusterer:
                 For Davies Bouldin score, the lower the better.
                 Will return `-1` if the evaluation method doesn't exist.
         """
-        switcher = {
-            1: silhouette_score,
-            2: calinski_harabasz_score,
-            3: davies_bouldin_score,
-        }
+        if not isinstance(method, EvaluationMethod):
+            return -1
 
-        func = switcher.get(method.value)
+        with span('evaluate', len(labels)):
+            return self.evaluator.score(labels, method)
 
-        if func is None:
-            return -1
-        elif method.value == 1:
-            return func(self.tf_idf, labels, metric='euclidean')
-        else:
-            return func(self.tf_idf.toarray(), labels)
+    def evaluate_results(self, labelings: List[Any], methods: Iterable[EvaluationMethod] = EvaluationMethod) -> List[Dict[EvaluationMethod, float]]:
+        """Evaluate many clustering results at once. Pairwise distances are
+        computed only once for every silhouette score.
+
+        Args:
+            labelings (List[Any]): Labels for each news item of each clustering result
+            methods (Iterable[EvaluationMethod], optional): Evaluation methods to be used. Defaults to every method.
+
+        Returns:
+            List[Dict[EvaluationMethod, float]]: Score of every method for each clustering result
+        """
+        with span('evaluate', len(labelings)):
+            return self.evaluator.score_many(labelings, methods)
+
+    def estimate_silhouette(self, labels: Any, sample_size: int = 1000, seed: Optional[int] = None, confidence: float = 0.95) -> SilhouetteEstimate:
+        """Estimate silhouette score from a sample of news, for corpora too
+        large for the exact score
+
+        Args:
+            labels (Any): Labels for each news item
+            sample_size (int, optional): Number of sampled news. Defaults to 1000.
+            seed (int, optional): Sampling seed. Defaults to None.
+            confidence (float, optional): Confidence level of the interval. Defaults to 0.95.
+
+        Returns:
+            SilhouetteEstimate: Estimated score and its confidence interval
+        """
+        with span('evaluate', len(labels)):
+            return self.evaluator.sampled_silhouette(labels, sample_size=sample_size, seed=seed, confidence=confidence)
+
+    def _cluster_frequencies(self, labels: np.ndarray, cluster: int, max_words: int) -> Dict[str, float]:
+        """Aggregate tf-idf weight of each term over the news of a cluster
+
+        Args:
+            labels (np.ndarray): Labels for each news item
+            cluster (int): Cluster label
+            max_words (int): Maximum number of terms to be kept
+
+        Returns:
+            Dict[str, float]: Weight of the heaviest terms of the cluster
+        """
+        weights = np.asarray(self.term_weights[labels == cluster].sum(axis=0)).ravel()
+        top = np.argsort(weights)[::-1][:max_words]
 
+        return { self.vocabulary[i]: float(weights[i]) for i in top if weights[i] > 0 }
+
+    def build_model(self, labels: Any, c_count: int, name: str = '') -> ClusterModel:
+        """Build a model of a clustering result, which labels new articles by
+        their nearest centroid without refitting
+
+        Args:
+            labels (Any): Labels for each news item
+            c_count (int): Number of clusters
+            name (str, optional): Name of the clustering result, e.g. `4-fc`. Defaults to ''.
+
+        Returns:
+            ClusterModel: Fitted model, to be saved with `save()`
+        """
+        if self.tf_idf.shape[1] != len(self.vocabulary):
+            raise ValueError('Hashed features of streaming clustering can not be modeled')
+
+        labels = np.asarray(labels)
+        top_terms = [list(self._cluster_frequencies(labels, k, 10).keys()) for k in range(c_count)]
+
+        return ClusterModel.fit(
+            self.features,
+            labels,
+            self.vocabulary,
+            self.idf,
+            top_terms,
+            components=None if self.svd is None else self.svd.components_,
+            name=name,
+        )
 
     def generate_wordcloud(self, labels: Any, c_count: int, add_str: str, folder: str):
         """Generate word cloud for each cluster
@@ -184,21 +462,39 @@ class NewsClusterer:
             add_str (str): Additional string to differentiate file names
             folder (str): Target folder to generate word cloud picture files
         """
-        result = { 'cluster': labels, 'tx': self.texts }
-        result = pd.DataFrame(result)
-
-        for k in range(0,c_count):
-            s = result[result.cluster==k]
-            text = s['tx'].str.cat(sep=' ')
-            text = text.lower()
-            text = ''.join([word for word in text.split()])
-            wordcloud = WordCloud(max_font_size=50, max_words=100, background_color='white').generate(text)
-            fig = plt.figure()
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis('off')
-            plt.savefig('wc/' + add_str + '-cluster' + str(k) + '.png'.format(folder))
-
-            print('Generated ' + 'wc/' + add_str + '-cluster' + str(k) + '.png')
-
-            plt.close(fig)
-            
+        self.generate_wordclouds([(labels, c_count, add_str)], folder, workers=1)
+
+    def generate_wordclouds(self, runs: List[Tuple[Any, int, str]], folder: str, workers: Optional[int] = None, max_words: int = 100):
+        """Generate word cloud for each cluster of many clustering results.
+        Words are weighted by the aggregated tf-idf of the cluster and every
+        picture is rendered in parallel.
+
+        Args:
+            runs (List[Tuple[Any, int, str]]): Labels, number of clusters and additional file name string of each clustering result
+            folder (str): Target folder to generate word cloud picture files
+            workers (int, optional): Number of rendering processes. Defaults to the number of CPUs.
+            max_words (int, optional): Maximum number of words on a picture. Defaults to 100.
+        """
+        jobs = []
+
+        for (labels, c_count, add_str) in runs:
+            labels = np.asarray(labels)
+
+            for k in range(0, c_count):
+                frequencies = self._cluster_frequencies(labels, k, max_words)
+
+                if len(frequencies) > 0:
+                    jobs.append((frequencies, path.join(folder, f'{add_str}-cluster{k}.png')))
+
+        if len(jobs) == 0:
+            return
+
+        with span('render', len(jobs)):
+            if workers == 1:
+                filenames = [_render_wordcloud(*job) for job in jobs]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    filenames = list(executor.map(_render_wordcloud, *zip(*jobs)))
+
+        for filename in filenames:
+            print(f'Generated {filename}')
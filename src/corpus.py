@@ -0,0 +1,298 @@
+import gzip
+from array import array
+from datetime import datetime
+from json import JSONDecoder, JSONDecodeError, dumps, loads
+from os import path
+from re import search
+from typing import BinaryIO, Iterator, List, TextIO
+
+from src.model.news import News
+
+_CHUNK_SIZE = 64 * 1024
+
+def _iter_json_array(file: TextIO, key: str) -> Iterator[dict]:
+    """Decode objects of a top-level JSON array one by one, without reading
+    the whole file into memory
+
+    Args:
+        file (TextIO): Opened JSON file
+        key (str): Key of the array on the top-level object
+
+    Yields:
+        dict: Decoded array items
+    """
+    decoder = JSONDecoder()
+    marker = f'"{key}"'
+    buffer = ''
+    index = -1
+
+    while index == -1:
+        chunk = file.read(_CHUNK_SIZE)
+
+        if not chunk:
+            return
+
+        buffer += chunk
+        index = buffer.find(marker)
+
+        if index == -1:
+            # Keep enough characters for a marker split across chunks
+            buffer = buffer[-len(marker):]
+
+    # The array may open on a later chunk than its key
+    start = index + len(marker)
+    index = buffer.find('[', start)
+
+    while index == -1:
+        chunk = file.read(_CHUNK_SIZE)
+
+        if not chunk:
+            return
+
+        buffer += chunk
+        index = buffer.find('[', start)
+
+    buffer = buffer[index + 1:]
+    index = 0
+    eof = False
+
+    while True:
+        while index < len(buffer) and buffer[index] in ' \t\r\n,':
+            index += 1
+
+        if index < len(buffer) and buffer[index] == ']':
+            return
+
+        try:
+            (item, index) = decoder.raw_decode(buffer, index)
+        except JSONDecodeError:
+            if eof:
+                raise
+
+            chunk = file.read(_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[index:] + chunk
+            index = 0
+            continue
+
+        yield item
+
+class CorpusWriter:
+    """Writer of line-delimited corpus files (`.jsonl`, or `.jsonl.gz` for
+    a compressed one).
+
+    The first line holds the crawl timestamp and every following line holds
+    one news. Records are appended as they are written, together with an
+    offset index on `<filename>.idx` for random access. The timestamp of the
+    latest crawl is also kept on `<filename>.meta`, as appending to a file
+    can't update its first line.
+    """
+    def __init__(self, filename: str, time: datetime) -> None:
+        """
+        Args:
+            filename (str): Path to the corpus file, appended to if it already exists
+            time (datetime): Crawl timestamp
+        """
+        self.filename = filename
+        self.time = time
+        self.offsets = _load_offsets(filename) if path.exists(filename) else array('q')
+        self.file = _open_corpus(filename, 'ab')
+
+        if len(self.offsets) == 0:
+            header = _encode({ 'fetched_at': time.isoformat() })
+
+            self.file.write(header)
+            self.offsets.append(len(header))
+
+    def write(self, news: News) -> None:
+        """Append a news to the corpus
+
+        Args:
+            news (News): News to be written
+        """
+        record = _encode(news.to_dict())
+
+        self.file.write(record)
+        self.offsets.append(self.offsets[-1] + len(record))
+
+    def close(self) -> None:
+        """Flush the corpus and its offset index
+        """
+        self.file.close()
+
+        with open(f'{self.filename}.idx', 'wb') as file:
+            self.offsets.tofile(file)
+
+        with open(f'{self.filename}.meta', 'wb') as file:
+            file.write(_encode({ 'fetched_at': self.time.isoformat() }))
+
+    def __enter__(self) -> 'CorpusWriter':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+class CorpusReader:
+    """Lazy reader of crawling result files, either line-delimited corpus
+    files or the legacy JSON document.
+
+    Line-delimited corpus files also support `len()` through their offset
+    index, and uncompressed ones random access by position. Seeking on a
+    gzip stream decompresses it from the start, so compressed files can only
+    be read in order.
+    """
+    def __init__(self, filename: str) -> None:
+        """
+        Args:
+            filename (str): Path to the corpus file
+        """
+        self.filename = filename
+        self.legacy = filename.endswith('.json')
+        self._offsets = None
+
+    @property
+    def fetched_at(self) -> str:
+        """Timestamp of the latest crawl, in ISO format
+        """
+        if self.legacy:
+            with open(self.filename, 'r') as file:
+                return search(r'"fetched_at":\s*"([^"]*)"', file.read(_CHUNK_SIZE)).group(1)
+
+        meta_path = f'{self.filename}.meta'
+
+        # Written after the corpus is closed, so an older one belongs to a replaced corpus
+        if path.exists(meta_path) and path.getmtime(meta_path) >= path.getmtime(self.filename):
+            with open(meta_path, 'rb') as file:
+                return loads(file.read())['fetched_at']
+
+        with _open_corpus(self.filename, 'rb') as file:
+            return loads(file.readline())['fetched_at']
+
+    @property
+    def offsets(self) -> array:
+        if self.legacy:
+            raise TypeError('Random access is only supported by line-delimited corpus files')
+
+        if self._offsets is None:
+            self._offsets = _load_offsets(self.filename)
+
+        return self._offsets
+
+    def __iter__(self) -> Iterator[News]:
+        if self.legacy:
+            with open(self.filename, 'r') as file:
+                for record in _iter_json_array(file, 'news'):
+                    yield News.from_dict(record)
+
+            return
+
+        with _open_corpus(self.filename, 'rb') as file:
+            file.readline() # Skip the header
+
+            for line in file:
+                yield News.from_dict(loads(line))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> News:
+        if self.filename.endswith('.gz'):
+            raise TypeError('Random access is only supported by uncompressed corpus files, iterate over compressed ones')
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError('News index out of range')
+
+        with _open_corpus(self.filename, 'rb') as file:
+            file.seek(self.offsets[index])
+
+            return News.from_dict(loads(file.readline()))
+
+def _encode(record: dict) -> bytes:
+    """Encode a record as one ASCII line
+
+    Args:
+        record (dict): Header or serialized news
+
+    Returns:
+        bytes: Encoded line, with its line break
+    """
+    return dumps(record, ensure_ascii=True).encode('ascii') + b'\n'
+
+def _open_corpus(filename: str, mode: str) -> BinaryIO:
+    """Open a corpus file, through gzip for `.gz` files
+
+    Args:
+        filename (str): Path to the corpus file
+        mode (str): Binary file mode
+
+    Returns:
+        BinaryIO: Opened uncompressed stream
+    """
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode)
+
+    return open(filename, mode)
+
+def _load_offsets(filename: str) -> array:
+    """Load the offset index of a corpus file, rebuilding it when missing or
+    outdated
+
+    Args:
+        filename (str): Path to the corpus file
+
+    Returns:
+        array: Offset of every record on the uncompressed stream, followed by the end offset
+    """
+    offsets = array('q')
+    index_path = f'{filename}.idx'
+
+    if path.exists(index_path) and path.getmtime(index_path) >= path.getmtime(filename):
+        with open(index_path, 'rb') as file:
+            offsets.frombytes(file.read())
+
+        return offsets
+
+    position = 0
+
+    with _open_corpus(filename, 'rb') as file:
+        for line in file:
+            position += len(line)
+            offsets.append(position)
+
+    return offsets
+
+def read_news(filename: str) -> Iterator[News]:
+    """Lazily read crawled news from a crawling result file
+
+    Args:
+        filename (str): Path to the crawling result file
+
+    Yields:
+        News: Crawled news
+    """
+    return iter(CorpusReader(filename))
+
+def iter_news(filename: str, batch_size: int = 256) -> Iterator[List[News]]:
+    """Read crawled news from a crawling result file in batches
+
+    Args:
+        filename (str): Path to the crawling result file
+        batch_size (int, optional): Number of news on each batch. Defaults to 256.
+
+    Yields:
+        List[News]: Batch of news
+    """
+    batch = []
+
+    for news in read_news(filename):
+        batch.append(news)
+
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+
+    if len(batch) > 0:
+        yield batch
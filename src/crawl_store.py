@@ -0,0 +1,143 @@
+import gzip
+from datetime import datetime
+from hashlib import sha1
+from json import dump, load
+from os import getcwd, makedirs, path, remove, replace
+from shutil import rmtree
+from typing import Dict, Optional
+
+class CrawlStore:
+    """Persistent index of crawled URLs, shared between crawls.
+
+    Records each URL's content hash, ETag and Last-Modified so pages can be
+    requested conditionally, keeps the bodies of pages which can be
+    revalidated, and remembers which URLs turned out to be articles.
+    """
+    def __init__(self, directory: str = path.join(getcwd(), '.crawl_store')) -> None:
+        """
+        Args:
+            directory (str, optional): Store directory. Defaults to `.crawl_store` on current directory.
+        """
+        self.directory = directory
+        self.index: Dict[str, dict] = {}
+
+        index_path = path.join(directory, 'index.json')
+
+        if path.exists(index_path):
+            with open(index_path, 'r') as file:
+                self.index = load(file)
+
+    def _body_path(self, url: str) -> str:
+        """Get the path of the stored body of a page
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            str: Path to the gzipped body, named by the URL hash
+        """
+        return path.join(self.directory, 'pages', f'{sha1(url.encode("utf-8")).hexdigest()}.html.gz')
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Get conditional request headers of a URL
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Dict[str, str]: `If-None-Match` and `If-Modified-Since` headers, if the page was stored
+        """
+        entry = self.index.get(url)
+
+        if entry is None or not path.exists(self._body_path(url)):
+            return {}
+
+        headers = {}
+
+        if entry.get('etag') is not None:
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified') is not None:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+    def body(self, url: str) -> Optional[str]:
+        """Get the stored body of a page
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Optional[str]: Page body. None if the page is not stored.
+        """
+        try:
+            with gzip.open(self._body_path(url), 'rt', encoding='utf-8') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def record(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Record a fetched page. The body is only kept when the page can be
+        revalidated later.
+
+        Args:
+            url (str): Page URL
+            body (str): Page body
+            etag (str, optional): `ETag` response header. Defaults to None.
+            last_modified (str, optional): `Last-Modified` response header. Defaults to None.
+        """
+        entry = self.index.setdefault(url, {})
+        entry['hash'] = sha1(body.encode('utf-8')).hexdigest()
+        entry['etag'] = etag
+        entry['last_modified'] = last_modified
+        entry['fetched_at'] = datetime.now().isoformat()
+
+        body_path = self._body_path(url)
+
+        if etag is None and last_modified is None:
+            if path.exists(body_path):
+                remove(body_path)
+            return
+
+        makedirs(path.dirname(body_path), exist_ok=True)
+
+        with gzip.open(body_path, 'wt', encoding='utf-8') as file:
+            file.write(body)
+
+    def mark_article(self, url: str, is_article: bool) -> None:
+        """Remember whether a URL is an article
+
+        Args:
+            url (str): Page URL
+            is_article (bool): True if the page was parsed as an article
+        """
+        self.index.setdefault(url, {})['article'] = is_article
+
+    def is_article(self, url: str) -> Optional[bool]:
+        """Determine whether a URL was seen as an article on previous crawls
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Optional[bool]: True if it was an article, False if it wasn't, None if never parsed
+        """
+        return self.index.get(url, {}).get('article')
+
+    def clear(self) -> None:
+        """Forget every recorded URL
+        """
+        self.index = {}
+        rmtree(self.directory, ignore_errors=True)
+
+    def save(self) -> None:
+        """Write the index to disk
+        """
+        makedirs(self.directory, exist_ok=True)
+
+        staging = path.join(self.directory, 'index.json.tmp')
+
+        with open(staging, 'w') as file:
+            dump(self.index, file, ensure_ascii=True)
+
+        replace(staging, path.join(self.directory, 'index.json'))
@@ -1,23 +1,51 @@
-import grequests
-import requests
-from urllib.robotparser import RobotFileParser
-from typing import List, Tuple
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime
-from os import getcwd
-from bs4 import BeautifulSoup
+from os import cpu_count, getcwd
 from math import ceil
-from random import randint
-from time import sleep
-from json import dump
-from newspaper.article import ArticleException
-from newspaper import Article, Config, news_pool
+from json import dump, load
+from re import compile
 
 from src.model.news import News
+from src.fetcher import Fetcher
+from src.corpus import CorpusWriter
+from src.instrumentation import span
+from src.politeness import Politeness
+
+# newspaper is only loaded by the processes parsing articles
+if TYPE_CHECKING:
+    from newspaper import Config
+
+HN_BASE_URL = "https://news.ycombinator.com"
+
+# Story links, and the rows holding their rank and score
+_STORY_LINKS = "//a[contains(concat(' ', normalize-space(@class), ' '), ' storylink ')]"
+_SCORES = "//span[starts-with(@id, 'score_')]"
+_leading_digits = compile(r'\s*(\d+)')
+
+class Story(NamedTuple):
+    """A story listed on HackerNews. Item id, rank and score are None when
+    the listing doesn't show them, e.g. score of job posts.
+    """
+    url: str
+    item_id: Optional[int]
+    rank: Optional[int]
+    score: Optional[int]
 
 class CrawlingResult:
-    def __init__(self, news: List[News], time: datetime) -> None:
+    def __init__(
+        self,
+        news: List[News],
+        time: datetime,
+        failures: Optional[Dict[str, int]] = None,
+        stories: Optional[List[Story]] = None,
+    ) -> None:
         self.news = news
         self.time = time
+        self.failures = failures or {}
+        self.stories = stories or []
 
     def write_result_to_file(self, dir = getcwd(), name = 'crawling_result') -> None:
         """Write crawling result to a JSON file
@@ -28,177 +56,667 @@ class CrawlingResult:
         with open(f'{dir}/{name}.json', 'w') as file:
             data = {
                 'fetched_at': self.time.isoformat(),
-                'news': list(map(lambda o: o.__dict__, self.news)),
+                'news': list(map(lambda o: o.to_dict(), self.news)),
             }
 
             dump(data, file, indent=4, ensure_ascii=True)
 
-def _parse_response_body(resp_body: str) -> List[str]:
-    """Extract news URLs from HackerNews body page
+    @classmethod
+    def load(cls, dir = getcwd(), name = 'crawling_result') -> 'CrawlingResult':
+        """Read crawling result from a JSON file
+
+        Args:
+            dir (str, optional): Directory to be read. Defaults to getcwd().
+            name (str, optional): File name. Defaults to 'crawling_result'.
+
+        Returns:
+            CrawlingResult: Previous crawling result
+        """
+        with open(f'{dir}/{name}.json', 'r') as file:
+            data = load(file)
+
+        return cls(
+            news=list(map(News.from_dict, data['news'])),
+            time=datetime.fromisoformat(data['fetched_at']),
+        )
+
+    def extend(self, other: 'CrawlingResult') -> 'CrawlingResult':
+        """Merge a newer crawling result into this one. News already on this
+        result are not added twice, matched by URL or, as results written
+        before URLs were kept have none, by title and contents.
+
+        Args:
+            other (CrawlingResult): Newer crawling result
+
+        Returns:
+            CrawlingResult: Merged crawling result, timestamped by the newer one
+        """
+        urls = set(news.url for news in self.news)
+        urls.discard(None)
+        texts = set((news.title, news.contents) for news in self.news)
+
+        news = self.news + [
+            news for news in other.news if news.url not in urls and (news.title, news.contents) not in texts
+        ]
+
+        return CrawlingResult(news=news, time=other.time, failures=other.failures, stories=other.stories)
+
+def _leading_int(text: Optional[str]) -> Optional[int]:
+    """Read the number a listing text starts with, e.g. `12.` for a rank or
+    `42 points` for a score
 
     Args:
-        resp_body (str): [description]
+        text (str, optional): Listing text
 
     Returns:
-        List[str]: [description]
+        Optional[int]: Leading number. None if the text doesn't start with one.
     """
-    base_url = "https://news.ycombinator.com"
-    urls = []
+    match = _leading_digits.match(text or '')
+
+    return int(match.group(1)) if match is not None else None
 
-    body_parser = BeautifulSoup(resp_body, 'html.parser')
-    titles = body_parser.select('.storylink')
+def _parse_listing(resp_body: str, base_url: str = HN_BASE_URL) -> List[Story]:
+    """Extract stories from HackerNews listing page with lxml, which parses
+    the page in C instead of Python
 
-    for news_title in titles:
-        url = news_title.get('href')
+    Args:
+        resp_body (str): HackerNews listing page
+        base_url (str, optional): Base URL for relative links. Defaults to HN_BASE_URL.
+
+    Returns:
+        List[Story]: Listed stories, except PDFs
+    """
+    from lxml import html
+
+    if resp_body.strip() == '':
+        return []
+
+    document = html.fromstring(resp_body)
+    scores = { span.get('id')[6:]: _leading_int(span.text) for span in document.xpath(_SCORES) }
+    stories = []
+
+    for link in document.xpath(_STORY_LINKS):
+        url = link.get('href')
+
+        if url is None:
+            continue
 
         if not url.startswith('http'):
             url = f'{base_url}/{url}'
-            
-        if not url.endswith('.pdf'):
-            urls.append(url)
 
-    return urls
+        if url.endswith('.pdf'):
+            continue
+
+        row = next(link.iterancestors('tr'), None)
+        item_id = None
+        rank = None
 
-def _get_news_metadata(urls: List[str]) -> List[News]:
-    """Get news' metadata from URL
+        if row is not None and row.get('id', '').isdigit():
+            item_id = int(row.get('id'))
+            ranks = row.xpath(".//span[@class='rank']/text()")
+            rank = _leading_int(ranks[0]) if len(ranks) > 0 else None
+
+        stories.append(Story(
+            url=url,
+            item_id=item_id,
+            rank=rank,
+            score=scores.get(str(item_id)),
+        ))
+
+    return stories
+
+def _parse_response_body(resp_body: str, base_url: str = HN_BASE_URL) -> List[str]:
+    """Extract news URLs from HackerNews body page
 
     Args:
-        urls (List[str]): List of news URL
+        resp_body (str): HackerNews listing page
+        base_url (str, optional): Base URL for relative links. Defaults to HN_BASE_URL.
 
     Returns:
-        List[News]: List of parsed article contents
+        List[str]: List of news URL
     """
+    return [story.url for story in _parse_listing(resp_body, base_url)]
+
+def _article_config(user_agent: str) -> 'Config':
+    """Create newspaper configuration for article parsing
+
+    Args:
+        user_agent (str): Browser user agent
+
+    Returns:
+        Config: newspaper configuration
+    """
+    from newspaper import Config
+
     config = Config()
-    config.browser_user_agent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.198 Safari/537.36"
+    config.browser_user_agent = user_agent
     config.fetch_images = False # DO NOT fetch the image
 
-    news_list = list(map(lambda url: Article(url=url, config=config), urls))
-    news_pool.set(news_list)
-    news_pool.join()
+    return config
 
-    result = []
+def _parse_article(url: str, html: str, config: 'Config') -> Optional[News]:
+    """Extract news' metadata from a downloaded article page
 
-    for news in news_list:
-        try:
-            news.parse()
+    Args:
+        url (str): Article URL
+        html (str): Article page
+        config (Config): newspaper configuration
+
+    Returns:
+        Optional[News]: Parsed article contents. None if the page isn't an article.
+    """
+    from newspaper import Article
+    from newspaper.article import ArticleException
+
+    article = Article(url=url, config=config)
+    article.download(input_html=html)
 
-            result.append(
-                News(
-                    authors=news.authors,
-                    title=news.title,
-                    published_at=news.publish_date,
-                    contents=news.text
-                )
-            )
-        except ArticleException: # Ignore non articles
-            pass
+    try:
+        article.parse()
+    except ArticleException: # Ignore non articles
+        return None
 
-    return result
+    return News(
+        authors=article.authors,
+        title=article.title,
+        published_at=article.publish_date,
+        contents=article.text,
+        url=url,
+    )
 
-def _fetch_news_sync(limit: int, page: int = 1) -> Tuple[List[str], int]:
-    """Crawl HackerNews website for fresh tech article links SYNCHRONOUSLY
+_worker_config = None
+
+def _parse_pages(pages: List[Tuple[int, str, str]], user_agent: str) -> List[Tuple[int, Optional[News]]]:
+    """Parse a chunk of downloaded article pages on a worker process
 
     Args:
-        limit (int): Limits how much articles should be fetched.
-        page (int, optional): Determine the starting page.
+        pages (List[Tuple[int, str, str]]): Index, URL and HTML of each page
+        user_agent (str): Browser user agent
 
     Returns:
-        Tuple(List[str], int): List of URLs and next page number to be fetched
+        List[Tuple[int, Optional[News]]]: Index and parsed contents of each page. Contents is None if the page isn't an article.
     """
-    base_url = "https://news.ycombinator.com"
-    delay = 0
-    pages = ceil(limit / 30)
+    global _worker_config
 
-    rp = RobotFileParser(url=f'{base_url}/robots.txt')
-    rp.read()
-    crawl_delay = rp.crawl_delay('*')
+    if _worker_config is None:
+        _worker_config = _article_config(user_agent)
 
-    if crawl_delay is not None:
-        delay = int(crawl_delay)
+    return [(index, _parse_article(url, html, _worker_config)) for (index, url, html) in pages]
 
-    resp_body = []
-    count = 0
+async def _fetch_news_sync(limit: int, politeness: Politeness, page: int = 1, base_url: str = HN_BASE_URL) -> Tuple[List[Story], int]:
+    """Crawl HackerNews website for fresh tech article links SEQUENTIALLY,
+    respecting robots.txt and its crawl delay
 
-    while count < pages:
-        resp = requests.get(f'{base_url}/news?p={page}')
-            
-        resp_body.append(resp.text)
-        count += 1
-        page += 1
+    Args:
+        limit (int): Limits how much articles should be fetched.
+        politeness (Politeness): Politeness manager used to download the pages
+        page (int, optional): Determine the starting page.
+        base_url (str, optional): HackerNews base URL. Defaults to HN_BASE_URL.
 
-        if pages - count > 1:
-            sleep(randint(delay, delay + 10)) # Simulate 'humans' access time
+    Returns:
+        Tuple(List[Story], int): Listed stories and next page number to be fetched. The next page is the first empty one when HackerNews runs out of stories.
+    """
+    pages = ceil(limit / 30)
+    stories = []
 
-    urls = []
+    for count in range(pages):
+        body = await politeness.fetch(f'{base_url}/news?p={page + count}')
+        found = _parse_listing(body or '', base_url)
 
-    for body in resp_body:
-        urls.extend(_parse_response_body(body))
+        # Every following page is empty too, don't wait for their crawl delay
+        if len(found) == 0:
+            return (stories, page + count)
+
+        stories.extend(found)
 
-    return (urls, page)
+    return (stories, page + pages)
 
-def _fetch_news_async(limit: int, page: int = 1) -> Tuple[List[str], int]:
+async def _fetch_news_async(limit: int, fetcher: Fetcher, page: int = 1, base_url: str = HN_BASE_URL) -> Tuple[List[Story], int]:
     """Crawl HackerNews website for fresh tech article links with paralel
     requests. Faster, but not polite at all
 
     Args:
         limit (int): Limits how much articles should be fetched.
+        fetcher (Fetcher): Fetcher used to download the pages
         page (int, optional): Determine the starting page.
+        base_url (str, optional): HackerNews base URL. Defaults to HN_BASE_URL.
 
     Returns:
-        Tuple(List[str], int): List of URLs and next page number to be fetched
+        Tuple(List[Story], int): Listed stories and next page number to be fetched
     """
-    base_url = "https://news.ycombinator.com"
     pages = ceil(limit / 30)
 
-    resp_body = []
-    reqs = []
-    count = 0
-
-    while count < pages:
-        reqs.append(f'{base_url}/news?p={page}')
-        count += 1
-        page += 1
+    reqs = [f'{base_url}/news?p={page + count}' for count in range(pages)]
+    resp_body = [''] * pages
 
-    req = (grequests.get(url) for url in reqs)
-        
-    for resp in grequests.imap(req):
-        resp_body.append(resp.text)
+    async for (index, _, body) in fetcher.fetch_all(reqs):
+        resp_body[index] = body or ''
 
-    urls = []
+    stories = []
 
     for body in resp_body:
-        urls.extend(_parse_response_body(body))
+        stories.extend(_parse_listing(body, base_url))
 
-    return (urls, page)
+    return (stories, page + pages)
 
-def crawl_hn_for_news(limit = 200, polite = True) -> CrawlingResult:
-    """Crawl HackerNews website for fresh tech articles
+class _CrawlPipeline:
+    """Staged crawl where listing pages, article downloads and article
+    parsing overlap, connected by bounded queues.
+
+    Listing pages are fetched ahead according to the observed article yield,
+    at most `max_pages` per round, so enough URLs are queued to reach the
+    limit without a sequential top-up.
+    On polite crawls, articles disallowed by robots.txt are skipped and the
+    downloads of a host waiting for its crawl delay don't hold back the other
+    hosts.
+    """
+    def __init__(
+        self,
+        limit: int,
+        polite: bool,
+        base_url: str,
+        fetcher: Fetcher,
+        workers: Optional[int] = None,
+        chunk_size: int = 8,
+        writer: Optional[CorpusWriter] = None,
+        downloaders: int = 16,
+        queue_size: int = 64,
+        expected_yield: float = 0.8,
+        max_pages: int = 4,
+    ) -> None:
+        self.limit = limit
+        self.polite = polite
+        self.base_url = base_url
+        self.fetcher = fetcher
+        self.workers = workers or cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.writer = writer
+        self.downloaders = downloaders
+        self.queue_size = queue_size
+        self.expected_yield = expected_yield
+        self.max_pages = max_pages
+
+        self.store = fetcher.store
+        self.politeness = Politeness(fetcher) if polite else None
+        self.queued = 0
+        self.processed = 0
+        self.skipped = 0
+        self.downloaded = 0
+        self.dropped = 0
+        self.finished = 0
+        self.articles = 0
+        self.parsed = {}
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.stories: List[Story] = []
+        self.failures = { 'download': 0, 'parse': 0, 'disallowed': 0 }
+
+    def _predicted_yield(self) -> float:
+        """Ratio of queued URLs which end up as parsed articles, estimated
+        per stage from the work each stage has finished. Pages still waiting
+        for their parse don't count as failures, although disallowed and
+        failed downloads are known long before them.
+
+        Returns:
+            float: Predicted article yield
+        """
+        reached = self.downloaded + self.dropped
+        download_rate = self.downloaded / reached if reached >= 10 else 1.0
+        parse_rate = self.articles / self.finished if self.finished >= 10 else self.expected_yield
+
+        return max(download_rate * parse_rate, 0.05)
+
+    def _collected(self) -> int:
+        """Number of articles parsed on this crawl or already crawled before
+        """
+        return len(self.parsed) + self.skipped
+
+    def _pages_needed(self) -> int:
+        """Number of listing pages to be fetched to reach the limit, given
+        the URLs still in flight
+
+        Returns:
+            int: Number of listing pages
+        """
+        rate = self._predicted_yield()
+        missing = self.limit - self._collected() - (self.queued - self.processed) * rate
+
+        if missing <= 0:
+            return 0
+
+        return ceil(missing / (30 * rate))
+
+    async def _list(self, urls: asyncio.Queue, progress: asyncio.Event) -> None:
+        """Listing stage: fetch listing pages while more URLs are needed to
+        reach the limit, and queue the URLs not crawled before
+
+        Args:
+            urls (asyncio.Queue): Queue of listed URLs and their listing position, closed with one None per downloader
+            progress (asyncio.Event): Set by the other stages whenever a URL is done with
+        """
+        page = 1
+        exhausted = False
+
+        while not exhausted:
+            pages = min(self._pages_needed(), self.max_pages)
+
+            if pages == 0:
+                await progress.wait()
+                progress.clear()
+                continue
+
+            with span('listing') as listing:
+                if self.politeness is not None:
+                    end = page + pages
+                    (found, page) = await _fetch_news_sync(pages * 30, self.politeness, page, self.base_url)
+                    exhausted = page < end
+                else:
+                    (found, page) = await _fetch_news_async(pages * 30, self.fetcher, page, self.base_url)
+
+                listing.items = len(found)
+
+            if len(found) == 0: # No more stories to be crawled
+                break
+
+            self.stories.extend(found)
+
+            for story in found:
+                url = story.url
+                seen = None if self.store is None else self.store.is_article(url)
+
+                # Articles from previous crawls are already on the corpus
+                if seen is True:
+                    self.skipped += 1
+                elif seen is None:
+                    await urls.put((self.queued, url))
+                    self.queued += 1
+
+            if self._collected() >= self.limit:
+                self.enough.set()
+
+        for _ in range(self.downloaders):
+            await urls.put(None)
+
+    async def _download_page(self, index: int, url: str, pages: asyncio.Queue) -> None:
+        """Download a page, waiting for the crawl delay of its host on polite
+        crawls
+
+        Args:
+            index (int): Listing position of the URL
+            url (str): Page URL
+            pages (asyncio.Queue): Queue the downloaded page is put on, with a None body if the download failed
+        """
+        if self.politeness is not None:
+            await self.politeness.wait(url)
+
+        with span('download', 1):
+            body = await self.fetcher.fetch(url)
+
+        await pages.put((index, url, body))
+
+    async def _download(self, urls: asyncio.Queue, pages: asyncio.Queue, progress: asyncio.Event) -> None:
+        """Download stage: fetch queued URLs, skipping the ones disallowed by
+        robots.txt on polite crawls
+
+        Args:
+            urls (asyncio.Queue): Queue of listed URLs, None once listing is over
+            pages (asyncio.Queue): Queue of downloaded pages, given a None once this downloader is over
+            progress (asyncio.Event): Set whenever a URL is done with
+        """
+        delayed = []
+
+        try:
+            while True:
+                item = await urls.get()
+
+                if item is None:
+                    await asyncio.gather(*delayed)
+                    await pages.put(None)
+                    return
+
+                (index, url) = item
+
+                if self.politeness is None:
+                    await self._download_page(index, url, pages)
+                    continue
+
+                if not await self.politeness.can_fetch(url):
+                    self.failures['disallowed'] += 1
+                    self.processed += 1
+                    self.dropped += 1
+                    progress.set()
+                elif (await self.politeness.policy(url)).bucket is not None:
+                    # Wait for the crawl delay aside, so other hosts keep downloading
+                    delayed.append(asyncio.ensure_future(self._download_page(index, url, pages)))
+                else:
+                    await self._download_page(index, url, pages)
+        finally:
+            for task in delayed:
+                task.cancel()
+
+    async def _parse_chunk(
+        self,
+        chunk: List[Tuple[int, str, str]],
+        slots: asyncio.Semaphore,
+        progress: asyncio.Event,
+    ) -> None:
+        """Parse a chunk of pages on the process pool, then collect its
+        articles until the limit is reached. A chunk whose worker fails is
+        counted as parse failures.
+
+        Args:
+            chunk (List[Tuple[int, str, str]]): Listing position, URL and HTML of each page
+            slots (asyncio.Semaphore): Free pool slots, released once the chunk is parsed
+            progress (asyncio.Event): Set once the chunk is done with
+        """
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+
+        try:
+            with span('parse', len(chunk)):
+                result = await loop.run_in_executor(pool, _parse_pages, chunk, self.fetcher.user_agent)
+        except Exception as error:
+            # A dead worker breaks its pool for good, so later chunks go to a
+            # new one. Only the first chunk noticing it replaces the pool.
+            if isinstance(error, BrokenProcessPool) and self.pool is pool:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+                pool.shutdown(wait=False)
+
+            # A crashed or misconfigured worker loses its chunk, not the crawl.
+            # The pages stay unrecorded so the next crawl parses them again.
+            self.failures['parse'] += len(chunk)
+            self.processed += len(chunk)
+            self.finished += len(chunk)
+            progress.set()
+
+            return
+        finally:
+            slots.release()
+
+        for ((index, news), (_, url, _)) in zip(result, chunk):
+            if news is None:
+                self.failures['parse'] += 1
+            else:
+                self.articles += 1
+
+            if news is None:
+                if self.store is not None:
+                    self.store.mark_article(url, False)
+            elif self._collected() < self.limit:
+                self.parsed[index] = news
+
+                if self.writer is not None:
+                    self.writer.write(news)
+
+                # Articles past the limit stay unmarked, so the next crawl collects them
+                if self.store is not None:
+                    self.store.mark_article(url, True)
+
+        self.processed += len(result)
+        self.finished += len(result)
+        progress.set()
+
+        if self._collected() >= self.limit:
+            self.enough.set()
+
+    async def _parse(self, pages: asyncio.Queue, progress: asyncio.Event) -> None:
+        """Parse stage: send downloaded pages to the parsing processes in
+        chunks, until every downloader is over or the limit is reached
+
+        Args:
+            pages (asyncio.Queue): Queue of downloaded pages, with one None per downloader
+            progress (asyncio.Event): Set whenever a URL is done with
+        """
+        slots = asyncio.Semaphore(self.workers)
+        enough_task = asyncio.ensure_future(self.enough.wait())
+        parsers = []
+        finished = 0
+
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        try:
+            while finished < self.downloaders and not self.enough.is_set():
+                page_task = asyncio.ensure_future(pages.get())
+                await asyncio.wait([page_task, enough_task], return_when=asyncio.FIRST_COMPLETED)
+
+                if not page_task.done():
+                    page_task.cancel()
+                    break
+
+                # Take whatever is already downloaded, up to a chunk
+                items = [page_task.result()]
+
+                while len(items) < self.chunk_size and not pages.empty():
+                    items.append(pages.get_nowait())
+
+                chunk = []
+
+                for item in items:
+                    if item is None:
+                        finished += 1
+                    elif item[2] is None:
+                        self.failures['download'] += 1
+                        self.processed += 1
+                        self.dropped += 1
+                    else:
+                        self.downloaded += 1
+                        chunk.append(item)
+
+                if len(chunk) > 0:
+                    await slots.acquire()
+                    parsers.append(asyncio.ensure_future(
+                        self._parse_chunk(chunk, slots, progress)
+                    ))
+                else:
+                    progress.set()
+
+            await asyncio.gather(*parsers)
+        finally:
+            enough_task.cancel()
+
+            for task in parsers:
+                task.cancel()
+
+            self.pool.shutdown()
+
+    async def run(self) -> List[News]:
+        """Crawl until the limit is reached or HackerNews runs out of stories
+
+        Returns:
+            List[News]: Parsed articles, in listing order
+        """
+        urls = asyncio.Queue(maxsize=self.queue_size)
+        pages = asyncio.Queue(maxsize=self.queue_size)
+        progress = asyncio.Event()
+        self.enough = asyncio.Event()
+
+        producers = [asyncio.ensure_future(self._list(urls, progress))]
+        producers.extend(
+            asyncio.ensure_future(self._download(urls, pages, progress)) for _ in range(self.downloaders)
+        )
+
+        try:
+            await self._parse(pages, progress)
+        finally:
+            for task in producers:
+                task.cancel()
+
+            await asyncio.gather(*producers, return_exceptions=True)
+
+        return [self.parsed[index] for index in sorted(self.parsed)]
+
+async def _crawl_hn_for_news(
+    limit: int,
+    polite: bool,
+    base_url: str,
+    fetcher: Fetcher,
+    workers: Optional[int],
+    chunk_size: int,
+    writer: Optional[CorpusWriter],
+) -> Tuple[List[News], Dict[str, int], List[Story]]:
+    """Run the crawl pipeline on an open fetcher, then save the crawl store
 
     Args:
-        limit (int, optional): Limits how much articles should be fetched. Defaults to 200.
-        polite (bool, optional): Determine if crawling should be done politely according to robots.txt. Defaults to True.
+        limit (int): Limits how much articles should be fetched
+        polite (bool): Determine if crawling should respect robots.txt and the crawl delay of every host
+        base_url (str): HackerNews base URL
+        fetcher (Fetcher): Fetcher used for every request, opened for the crawl
+        workers (int, optional): Number of article parsing processes, the number of CPUs if None
+        chunk_size (int): Maximum number of pages sent to a parsing process at once
+        writer (CorpusWriter, optional): Corpus each article is appended to as soon as it is parsed
 
     Returns:
-        CrawlingResult: Crawler results, with timestamp
+        Tuple[List[News], Dict[str, int], List[Story]]: Parsed articles, number of failures per stage and every listed story
     """
+    async with fetcher:
+        pipeline = _CrawlPipeline(
+            limit,
+            polite,
+            base_url,
+            fetcher,
+            workers=workers,
+            chunk_size=chunk_size,
+            writer=writer,
+        )
+        news = await pipeline.run()
+
+    if fetcher.store is not None:
+        fetcher.store.save()
+
+    return (news, pipeline.failures, pipeline.stories)
+
+def crawl_hn_for_news(
+    limit = 200,
+    polite = True,
+    base_url = HN_BASE_URL,
+    fetcher: Optional[Fetcher] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 8,
+    writer: Optional[CorpusWriter] = None,
+) -> CrawlingResult:
+    """Crawl HackerNews website for fresh tech articles
 
-    news_info = None
-
-    if polite:
-        news_info = _fetch_news_sync(limit)
-    else:
-        news_info = _fetch_news_async(limit)
+    Args:
+        limit (int, optional): Limits how much articles should be fetched. Defaults to 200.
+        polite (bool, optional): Determine if crawling should respect robots.txt and the crawl delay of every host. Defaults to True.
+        base_url (str, optional): HackerNews base URL, may point to a local server. Defaults to HN_BASE_URL.
+        fetcher (Fetcher, optional): Fetcher used for every request. Defaults to a new Fetcher.
+        workers (int, optional): Number of article parsing processes. Defaults to the number of CPUs.
+        chunk_size (int, optional): Maximum number of pages sent to a parsing process at once. Defaults to 8.
+        writer (CorpusWriter, optional): Corpus each article is appended to as soon as it is parsed. Defaults to None.
 
-    news = _get_news_metadata(news_info[0])
-    last_page = news_info[1]
+    Returns:
+        CrawlingResult: Crawler results, with timestamp and every listed story
+    """
+    if fetcher is None:
+        fetcher = Fetcher()
 
-    while len(news) < limit:
-        old_news = _fetch_news_sync(30, last_page)
-        news.extend(_get_news_metadata(old_news[0]))
-        
-        last_page = old_news[1]
+    (news, failures, stories) = asyncio.run(
+        _crawl_hn_for_news(limit, polite, base_url, fetcher, workers, chunk_size, writer)
+    )
 
     return CrawlingResult(
         news=news[0:limit],
         time=datetime.now(),
-    )
\ No newline at end of file
+        failures=failures,
+        stories=stories,
+    )
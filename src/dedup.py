@@ -0,0 +1,223 @@
+from re import compile
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+from zlib import crc32
+import numpy as np
+
+from src.instrumentation import span
+from src.model.news import News
+from src.model.news_corpus import NewsCorpus
+
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_MIN_WORDS = 50
+
+_PRIME = (1 << 31) - 1
+_word = compile('[a-z0-9]+')
+
+class Removal(NamedTuple):
+    """A news dropped before clustering
+    """
+    index: int
+    title: str
+    url: Optional[str]
+    reason: str
+    duplicate_of: Optional[int] = None
+    similarity: Optional[float] = None
+
+def _bands(num_perm: int, threshold: float, false_negative_weight: float = 0.9) -> Tuple[int, int]:
+    """Pick the number of LSH bands and rows per band minimizing the weighted
+    probability of missing near-duplicates and of comparing dissimilar texts.
+    Missing near-duplicates weighs more, since every candidate is verified.
+
+    Args:
+        num_perm (int): Signature length
+        threshold (float): Jaccard similarity threshold
+        false_negative_weight (float, optional): Weight of missed near-duplicates. Defaults to 0.9.
+
+    Returns:
+        Tuple[int, int]: Number of bands and rows per band
+    """
+    below = np.linspace(0, threshold, 100)
+    above = np.linspace(threshold, 1, 100)
+
+    def error(bands: int, rows: int) -> float:
+        false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+        false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+
+        return (1 - false_negative_weight) * false_positive + false_negative_weight * false_negative
+
+    candidates = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+
+    return min(candidates, key=lambda pair: error(*pair))
+
+class NearDuplicateFilter:
+    """Incremental filter of short boilerplate pages and near-duplicate
+    texts.
+
+    Each text is summarized by a MinHash signature of its word shingles and
+    indexed with locality-sensitive hashing, so a new text is only compared
+    with the texts sharing one of its bands instead of every text kept so far.
+    The first text of a group of near-duplicates is kept.
+    """
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        min_words: int = DEFAULT_MIN_WORDS,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 0,
+    ) -> None:
+        """
+        Args:
+            threshold (float, optional): Estimated Jaccard similarity from which texts are near-duplicates. Defaults to 0.8.
+            min_words (int, optional): Texts with fewer words are dropped as boilerplate. Defaults to 50.
+            num_perm (int, optional): Signature length, longer is more accurate and slower. Defaults to 128.
+            shingle_size (int, optional): Number of words in a shingle. Defaults to 5.
+            seed (int, optional): Seed of the hash permutations. Defaults to 0.
+        """
+        self.threshold = threshold
+        self.min_words = min_words
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+        (self.bands, self.rows) = _bands(num_perm, threshold)
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self.signatures: List[np.ndarray] = []
+        self.ids: List[int] = []
+
+    def signature(self, words: List[str]) -> np.ndarray:
+        """Compute the MinHash signature of a text
+
+        Args:
+            words (List[str]): Words of the text
+
+        Returns:
+            np.ndarray: Minimum of every hash permutation over the shingles
+        """
+        size = self.shingle_size
+        shingles = {' '.join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+        hashes = np.fromiter((crc32(shingle.encode()) & _PRIME for shingle in shingles), dtype=np.uint64, count=len(shingles))
+
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def check(self, index: int, text: str) -> Tuple[Optional[str], Optional[int], Optional[float]]:
+        """Check a text against the kept ones and keep it if it's neither
+        boilerplate nor a near-duplicate
+
+        Args:
+            index (int): Identifier of the text, reported on later duplicates
+            text (str): Text to be checked
+
+        Returns:
+            Tuple[Optional[str], Optional[int], Optional[float]]: Reason to drop the text (`short` or `duplicate`), the kept duplicate and its estimated similarity. Reason is None if the text is kept.
+        """
+        words = _word.findall(text.lower())
+
+        if len(words) < self.min_words:
+            return ('short', None, None)
+
+        signature = self.signature(words)
+        keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+        candidates = set()
+
+        for (bucket, key) in zip(self.buckets, keys):
+            candidates.update(bucket.get(key, ()))
+
+        best = None
+
+        for candidate in sorted(candidates):
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+
+        if best is not None:
+            return ('duplicate', self.ids[best[0]], best[1])
+
+        position = len(self.signatures)
+
+        self.signatures.append(signature)
+        self.ids.append(index)
+
+        for (bucket, key) in zip(self.buckets, keys):
+            bucket.setdefault(key, []).append(position)
+
+        return (None, None, None)
+
+def deduplicate(
+    news: Union[List[News], NewsCorpus],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_words: int = DEFAULT_MIN_WORDS,
+) -> Tuple[Union[List[News], NewsCorpus], List[Removal]]:
+    """Drop short boilerplate pages and near-duplicates before clustering
+
+    Args:
+        news (Union[List[News], NewsCorpus]): Crawled news
+        threshold (float, optional): Estimated Jaccard similarity from which news are near-duplicates. Defaults to 0.8.
+        min_words (int, optional): News with fewer words are dropped as boilerplate. Defaults to 50.
+
+    Returns:
+        Tuple[Union[List[News], NewsCorpus], List[Removal]]: Remaining news, of the same type as `news`, and every removed news
+    """
+    duplicate_filter = NearDuplicateFilter(threshold=threshold, min_words=min_words)
+    texts = news.contents if isinstance(news, NewsCorpus) else [item.contents for item in news]
+
+    kept = []
+    removed = []
+
+    with span('dedup', len(texts)):
+        for (index, text) in enumerate(texts):
+            (reason, duplicate_of, similarity) = duplicate_filter.check(index, text)
+
+            if reason is None:
+                kept.append(index)
+            else:
+                item = news[index]
+                removed.append(Removal(index, item.title, item.url, reason, duplicate_of, similarity))
+
+    if len(removed) == 0:
+        return (news, removed)
+
+    if isinstance(news, NewsCorpus):
+        return (NewsCorpus.from_news(news[index] for index in kept), removed)
+
+    return ([news[index] for index in kept], removed)
+
+def deduplicate_batches(
+    batches: Iterable[List[News]],
+    removed: List[Removal],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_words: int = DEFAULT_MIN_WORDS,
+) -> Iterator[List[News]]:
+    """Drop short boilerplate pages and near-duplicates from a stream of
+    news batches
+
+    Args:
+        batches (Iterable[List[News]]): Batches of crawled news
+        removed (List[Removal]): List every removed news is appended to, indexed by position on the stream
+        threshold (float, optional): Estimated Jaccard similarity from which news are near-duplicates. Defaults to 0.8.
+        min_words (int, optional): News with fewer words are dropped as boilerplate. Defaults to 50.
+
+    Yields:
+        List[News]: Batches of remaining news
+    """
+    duplicate_filter = NearDuplicateFilter(threshold=threshold, min_words=min_words)
+    index = 0
+
+    for batch in batches:
+        kept = []
+
+        for item in batch:
+            (reason, duplicate_of, similarity) = duplicate_filter.check(index, item.contents)
+
+            if reason is None:
+                kept.append(item)
+            else:
+                removed.append(Removal(index, item.title, item.url, reason, duplicate_of, similarity))
+
+            index += 1
+
+        if len(kept) > 0:
+            yield kept
@@ -0,0 +1,333 @@
+from enum import Enum
+from random import Random
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+from scipy.sparse import csr_matrix, hstack, issparse
+from sklearn.metrics import pairwise_distances
+
+from src.hierarchy import HierarchyEngine
+
+class EvaluationMethod(Enum):
+    """List of allowed clustering evaluation methods
+    """
+    SILHOUETTE = 1
+    CALINSKI_HARABASZ = 2
+    DAVIES_BOULDIN = 3
+
+class SilhouetteEstimate(NamedTuple):
+    """Silhouette score estimated from a sample of documents, with its
+    confidence interval
+    """
+    score: float
+    low: float
+    high: float
+    sample_size: int
+
+def _encode(labels: Any, n_samples: int) -> csr_matrix:
+    """One-hot encode labels, validating the number of clusters like
+    scikit-learn does
+
+    Args:
+        labels (Any): Label of each document
+        n_samples (int): Number of documents
+
+    Returns:
+        csr_matrix: Membership matrix, one row per document and one column per cluster
+    """
+    (_, codes) = np.unique(np.asarray(labels), return_inverse=True)
+    cluster_count = codes.max() + 1
+
+    if not 1 < cluster_count < n_samples:
+        raise ValueError(f'Number of labels is {cluster_count}. Valid values are 2 to n_samples - 1 (inclusive)')
+
+    return csr_matrix((np.ones(n_samples), (np.arange(n_samples), codes)), shape=(n_samples, cluster_count))
+
+def _silhouette_samples(cluster_sums: np.ndarray, own: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Silhouette of documents from the sum of their distances to every cluster
+
+    Args:
+        cluster_sums (np.ndarray): Sum of distances from each document to the documents of each cluster
+        own (np.ndarray): Cluster of each document
+        sizes (np.ndarray): Number of documents on each cluster
+
+    Returns:
+        np.ndarray: Silhouette of each document, 0 for documents alone on their cluster
+    """
+    rows = np.arange(len(own))
+    own_sizes = sizes[own]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        intra = cluster_sums[rows, own] / (own_sizes - 1)
+        means = cluster_sums / sizes
+        means[rows, own] = np.inf
+        inter = means.min(axis=1)
+
+        result = (inter - intra) / np.maximum(intra, inter)
+
+    result[own_sizes == 1] = 0
+
+    return np.nan_to_num(result)
+
+def silhouette_from_distances(distances: np.ndarray, labels: Any) -> float:
+    """Compute silhouette score from a square distance matrix, with one
+    matrix product instead of a pass per cluster
+
+    Args:
+        distances (np.ndarray): Square distance matrix between documents
+        labels (Any): Label of each document
+
+    Returns:
+        float: Silhouette score
+    """
+    membership = _encode(labels, distances.shape[0])
+    sizes = np.asarray(membership.sum(axis=0)).ravel()
+    cluster_sums = np.asarray(membership.T.dot(distances.T).T)
+
+    return float(_silhouette_samples(cluster_sums, membership.indices, sizes).mean())
+
+class Evaluator:
+    """Scorer of many labelings of the same documents.
+
+    Pairwise distances are computed once and shared by every silhouette,
+    while Calinski-Harabasz and Davies-Bouldin only need the centroid of each
+    cluster, computed with sparse products instead of densifying features.
+    """
+    def __init__(self, features: Any, hierarchy: Optional[HierarchyEngine] = None) -> None:
+        """
+        Args:
+            features (Any): Sparse or dense feature matrix, one row per document
+            hierarchy (HierarchyEngine, optional): Engine holding the pairwise distances of `features`. Defaults to a new one.
+        """
+        self.features = features
+        self.hierarchy = hierarchy or HierarchyEngine(features)
+
+        if issparse(features):
+            self.squared_norms = np.asarray(features.multiply(features).sum(axis=1)).ravel()
+        else:
+            self.squared_norms = np.einsum('ij,ij->i', features, features)
+
+    def _centroids(self, membership: csr_matrix, sizes: np.ndarray) -> np.ndarray:
+        """Compute the centroid of every cluster with one sparse product
+
+        Args:
+            membership (csr_matrix): Membership matrix, one row per document and one column per cluster
+            sizes (np.ndarray): Number of documents on each cluster
+
+        Returns:
+            np.ndarray: Dense centroids, one row per cluster
+        """
+        sums = membership.T.dot(self.features)
+
+        if issparse(sums):
+            sums = sums.toarray()
+
+        return np.asarray(sums) / sizes[:, None]
+
+    def _calinski_harabasz(self, sizes: np.ndarray, centroids: np.ndarray) -> float:
+        """Compute Calinski-Harabasz score from the clusters' centroids
+
+        Args:
+            sizes (np.ndarray): Number of documents on each cluster
+            centroids (np.ndarray): Centroid of each cluster
+
+        Returns:
+            float: Calinski-Harabasz score
+        """
+        n_samples = self.features.shape[0]
+        mean = sizes.dot(centroids) / n_samples
+
+        # Within dispersion is the total squared norm minus what the centroids explain
+        extra = float(sizes.dot(((centroids - mean) ** 2).sum(axis=1)))
+        intra = float(self.squared_norms.sum() - sizes.dot((centroids ** 2).sum(axis=1)))
+        cluster_count = len(sizes)
+
+        if intra <= 0:
+            return 1.0
+
+        return extra * (n_samples - cluster_count) / (intra * (cluster_count - 1))
+
+    def _davies_bouldin(self, own: np.ndarray, sizes: np.ndarray, centroids: np.ndarray, products: np.ndarray) -> float:
+        """Compute Davies-Bouldin score from the clusters' centroids
+
+        Args:
+            own (np.ndarray): Cluster of each document
+            sizes (np.ndarray): Number of documents on each cluster
+            centroids (np.ndarray): Centroid of each cluster
+            products (np.ndarray): Dot product of every document with every centroid
+
+        Returns:
+            float: Davies-Bouldin score
+        """
+        n_samples = self.features.shape[0]
+        squared = self.squared_norms - 2 * products[np.arange(n_samples), own] + (centroids ** 2).sum(axis=1)[own]
+        intra = np.bincount(own, weights=np.sqrt(np.maximum(squared, 0))) / sizes
+
+        centroid_distances = pairwise_distances(centroids)
+
+        if np.allclose(intra, 0) or np.allclose(centroid_distances, 0):
+            return 0.0
+
+        centroid_distances[centroid_distances == 0] = np.inf
+        combined = intra[:, None] + intra
+
+        return float(np.mean(np.max(combined / centroid_distances, axis=1)))
+
+    def silhouette(self, labels: Any) -> float:
+        """Compute silhouette score on the shared distance matrix
+
+        Args:
+            labels (Any): Label of each document
+
+        Returns:
+            float: Silhouette score
+        """
+        return silhouette_from_distances(self.hierarchy.distances, labels)
+
+    def calinski_harabasz(self, labels: Any) -> float:
+        """Compute Calinski-Harabasz score without densifying features
+
+        Args:
+            labels (Any): Label of each document
+
+        Returns:
+            float: Calinski-Harabasz score
+        """
+        membership = _encode(labels, self.features.shape[0])
+        sizes = np.asarray(membership.sum(axis=0)).ravel()
+
+        return self._calinski_harabasz(sizes, self._centroids(membership, sizes))
+
+    def davies_bouldin(self, labels: Any) -> float:
+        """Compute Davies-Bouldin score without densifying features
+
+        Args:
+            labels (Any): Label of each document
+
+        Returns:
+            float: Davies-Bouldin score
+        """
+        membership = _encode(labels, self.features.shape[0])
+        sizes = np.asarray(membership.sum(axis=0)).ravel()
+        centroids = self._centroids(membership, sizes)
+        products = np.asarray(self.features.dot(centroids.T))
+
+        return self._davies_bouldin(membership.indices, sizes, centroids, products)
+
+    def score(self, labels: Any, method: EvaluationMethod) -> float:
+        """Score a labeling with an internal criteria
+
+        Args:
+            labels (Any): Label of each document
+            method (EvaluationMethod): Evaluation method
+
+        Returns:
+            float: Score of the labeling
+        """
+        switcher = {
+            EvaluationMethod.SILHOUETTE: self.silhouette,
+            EvaluationMethod.CALINSKI_HARABASZ: self.calinski_harabasz,
+            EvaluationMethod.DAVIES_BOULDIN: self.davies_bouldin,
+        }
+
+        return switcher[method](labels)
+
+    def score_many(self, labelings: Iterable[Any], methods: Iterable[EvaluationMethod] = EvaluationMethod) -> List[Dict[EvaluationMethod, float]]:
+        """Score many labelings with many internal criteria. Memberships of
+        every labeling are stacked side by side, so the distance matrix, the
+        features and the centroids each go through a single product for the
+        whole batch.
+
+        Args:
+            labelings (Iterable[Any]): Labels of each clustering result
+            methods (Iterable[EvaluationMethod], optional): Evaluation methods. Defaults to every method.
+
+        Returns:
+            List[Dict[EvaluationMethod, float]]: Score of every method for each labeling
+        """
+        methods = list(methods)
+        n_samples = self.features.shape[0]
+        memberships = [_encode(labels, n_samples) for labels in labelings]
+        results = [{} for _ in memberships]
+
+        if len(memberships) == 0:
+            return results
+
+        stacked = hstack(memberships, format='csr')
+        sizes = np.asarray(stacked.sum(axis=0)).ravel()
+        bounds = np.cumsum([0] + [membership.shape[1] for membership in memberships])
+        groups = [slice(bounds[i], bounds[i + 1]) for i in range(len(memberships))]
+
+        if EvaluationMethod.SILHOUETTE in methods:
+            cluster_sums = np.asarray(stacked.T.dot(self.hierarchy.distances.T).T)
+
+            for (result, membership, group) in zip(results, memberships, groups):
+                samples = _silhouette_samples(cluster_sums[:, group], membership.indices, sizes[group])
+                result[EvaluationMethod.SILHOUETTE] = float(samples.mean())
+
+        if EvaluationMethod.CALINSKI_HARABASZ in methods or EvaluationMethod.DAVIES_BOULDIN in methods:
+            centroids = self._centroids(stacked, sizes)
+
+            if EvaluationMethod.DAVIES_BOULDIN in methods:
+                products = np.asarray(self.features.dot(centroids.T))
+
+            for (result, membership, group) in zip(results, memberships, groups):
+                if EvaluationMethod.CALINSKI_HARABASZ in methods:
+                    result[EvaluationMethod.CALINSKI_HARABASZ] = self._calinski_harabasz(sizes[group], centroids[group])
+                if EvaluationMethod.DAVIES_BOULDIN in methods:
+                    result[EvaluationMethod.DAVIES_BOULDIN] = self._davies_bouldin(
+                        membership.indices, sizes[group], centroids[group], products[:, group]
+                    )
+
+        # Keep the order of the requested methods
+        return [{ method: result[method] for method in methods } for result in results]
+
+    def sampled_silhouette(
+        self,
+        labels: Any,
+        sample_size: int = 1000,
+        seed: Optional[int] = None,
+        confidence: float = 0.95,
+        chunk_size: int = 256,
+    ) -> SilhouetteEstimate:
+        """Estimate silhouette score from a uniform sample of documents. Each
+        sampled document is scored against the whole corpus, so it only takes
+        O(sample_size * n) distances and the estimate is unbiased.
+
+        Args:
+            labels (Any): Label of each document
+            sample_size (int, optional): Number of sampled documents. Defaults to 1000.
+            seed (int, optional): Sampling seed. Defaults to None.
+            confidence (float, optional): Confidence level of the interval. Defaults to 0.95.
+            chunk_size (int, optional): Number of sampled documents whose distances are kept in memory at once. Defaults to 256.
+
+        Returns:
+            SilhouetteEstimate: Estimated score and its confidence interval
+        """
+        n_samples = self.features.shape[0]
+        membership = _encode(labels, n_samples)
+        sizes = np.asarray(membership.sum(axis=0)).ravel()
+        own = membership.indices
+
+        sample_size = min(sample_size, n_samples)
+        sample = np.array(sorted(Random(seed).sample(range(n_samples), sample_size)))
+        values = []
+
+        for start in range(0, sample_size, chunk_size):
+            rows = sample[start:start + chunk_size]
+            distances = pairwise_distances(self.features[rows], self.features, metric='euclidean')
+            cluster_sums = np.asarray(membership.T.dot(distances.T).T)
+            values.append(_silhouette_samples(cluster_sums, own[rows], sizes))
+
+        values = np.concatenate(values)
+        score = float(values.mean())
+
+        if sample_size == n_samples or sample_size < 2:
+            return SilhouetteEstimate(score, score, score, sample_size)
+
+        from scipy.stats import norm
+
+        # Normal approximation, with finite population correction
+        error = values.std(ddof=1) / np.sqrt(sample_size) * np.sqrt((n_samples - sample_size) / (n_samples - 1))
+        margin = float(norm.ppf(0.5 + confidence / 2) * error)
+
+        return SilhouetteEstimate(score, score - margin, score + margin, sample_size)
@@ -0,0 +1,256 @@
+from concurrent.futures import ProcessPoolExecutor
+from json import load
+from multiprocessing.shared_memory import SharedMemory
+from time import process_time
+from timeit import default_timer
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from src.clustering import EvaluationMethod, Linkage, NewsClusterer
+from src.feature_cache import FeatureCache
+from src.k_selection import SharedArray, attach_array, share_array
+from src.model.news import News
+from src.model.news_corpus import NewsCorpus
+
+ALGORITHMS = ['kmeans', 'agglomerative']
+
+class Experiment(NamedTuple):
+    """A single clustering run of an experiment grid
+    """
+    algorithm: str
+    linkage: Optional[str]
+    cluster_count: Optional[int]
+    neighbors: Optional[int] = None
+
+class ExperimentConfig(NamedTuple):
+    """Declarative experiment grid.
+
+    Every algorithm is run with every cluster count (None picks it with the
+    silhouette method), agglomerative clustering once per linkage and
+    neighbour count (None is the exact mode, a number restricts merges to the
+    k-nearest-neighbour graph), and every run is scored with every metric.
+    """
+    algorithms: List[str]
+    linkages: List[str]
+    cluster_counts: List[Optional[int]]
+    metrics: List[str]
+    components: Optional[int] = None
+    wordcloud: Optional[str] = None
+    neighbors: List[Optional[int]] = [None]
+
+    def experiments(self) -> List[Experiment]:
+        """Expand the grid into single runs
+
+        Returns:
+            List[Experiment]: Clustering runs
+        """
+        result = []
+
+        for algorithm in self.algorithms:
+            agglomerative = algorithm == 'agglomerative'
+
+            for linkage in self.linkages if agglomerative else [None]:
+                for neighbors in self.neighbors if agglomerative else [None]:
+                    for cluster_count in self.cluster_counts:
+                        result.append(Experiment(algorithm, linkage, cluster_count, neighbors))
+
+        return result
+
+def load_config(filename: str) -> ExperimentConfig:
+    """Read an experiment grid from a JSON file, e.g.
+    `{"algorithms": ["kmeans", "agglomerative"], "linkages": ["ward"], "cluster_counts": [2, 4], "metrics": ["silhouette"], "neighbors": [null, 10]}`
+
+    Args:
+        filename (str): Path to the config file
+
+    Returns:
+        ExperimentConfig: Experiment grid
+    """
+    with open(filename, 'r') as file:
+        data = load(file)
+
+    config = ExperimentConfig(
+        algorithms=data.get('algorithms', ALGORITHMS),
+        linkages=data.get('linkages', [linkage.value for linkage in Linkage]),
+        cluster_counts=data.get('cluster_counts', [None]),
+        metrics=data.get('metrics', [EvaluationMethod.SILHOUETTE.name.lower()]),
+        components=data.get('components'),
+        wordcloud=data.get('wordcloud'),
+        neighbors=data.get('neighbors', [None]),
+    )
+
+    for algorithm in config.algorithms:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f'Unknown clustering algorithm: {algorithm}')
+
+    # Fail before any clustering on a misspelled linkage or metric
+    for linkage in config.linkages:
+        Linkage(linkage)
+    for metric in config.metrics:
+        EvaluationMethod[metric.upper()]
+
+    for neighbors in config.neighbors:
+        if neighbors is not None and neighbors < 1:
+            raise ValueError(f'Number of neighbors must be positive: {neighbors}')
+
+    return config
+
+_clusterer: Optional[NewsClusterer] = None
+_memory: Optional[SharedMemory] = None
+
+def _share(clusterer: NewsClusterer, distances: Optional[SharedArray] = None) -> None:
+    """Keep the clusterer shared by every run on the worker process. The
+    distance matrix is mapped from shared memory instead of being pickled
+    once per worker.
+
+    Args:
+        clusterer (NewsClusterer): Clusterer holding the features and merge trees, without its distance matrix
+        distances (SharedArray, optional): Shared memory name, shape and dtype of the distance matrix. Defaults to None.
+    """
+    global _clusterer, _memory
+
+    if distances is not None:
+        (_memory, clusterer.hierarchy._distances) = attach_array(distances)
+
+    _clusterer = clusterer
+
+def _run(experiment: Experiment) -> Dict[str, Any]:
+    """Run a single clustering on the shared clusterer
+
+    Args:
+        experiment (Experiment): Clustering run
+
+    Returns:
+        Dict[str, Any]: Report of the run, scored later with every other run
+    """
+    start_time = default_timer()
+    start_cpu = process_time()
+
+    if experiment.algorithm == 'kmeans':
+        (labels, count) = _clusterer.flat_clustering(experiment.cluster_count)
+    else:
+        (labels, count) = _clusterer.agglomerative_clustering(
+            experiment.cluster_count,
+            linkage=Linkage(experiment.linkage),
+            neighbors=experiment.neighbors,
+        )
+
+    return {
+        **experiment._asdict(),
+        'cluster_count': int(count),
+        'labels': [int(label) for label in labels],
+        'timings': {
+            'fit': default_timer() - start_time,
+            'fit_cpu': process_time() - start_cpu,
+        },
+    }
+
+def run_experiments(
+    news: Union[List[News], NewsCorpus],
+    config: ExperimentConfig,
+    workers: Optional[int] = None,
+    cache: Optional[FeatureCache] = None,
+) -> Dict[str, Any]:
+    """Run every clustering of an experiment grid on shared features
+
+    Args:
+        news (Union[List[News], NewsCorpus]): News to be clustered
+        config (ExperimentConfig): Experiment grid
+        workers (int, optional): Number of processes running the clusterings. Defaults to the number of CPUs.
+        cache (FeatureCache, optional): Feature cache for the tf-idf matrix. Defaults to None.
+
+    Returns:
+        Dict[str, Any]: Machine-readable report with labels, scores and timings of every run
+    """
+    start_time = default_timer()
+
+    clusterer = NewsClusterer(news, workers=workers, cache=cache, components=config.components)
+
+    # Build what every run shares before handing the clusterer to the workers
+    silhouette = EvaluationMethod.SILHOUETTE in [EvaluationMethod[metric.upper()] for metric in config.metrics]
+
+    # Selecting k on the k-nearest-neighbour graph doesn't need the distances
+    selection = any(
+        experiment.cluster_count is None and experiment.neighbors is None for experiment in config.experiments()
+    )
+
+    if selection or silhouette:
+        clusterer.hierarchy.distances
+
+    if 'agglomerative' in config.algorithms:
+        for linkage in set(config.linkages):
+            for neighbors in set(config.neighbors):
+                clusterer.hierarchy.tree(linkage, neighbors)
+
+    feature_time = default_timer() - start_time
+    experiments = config.experiments()
+
+    start_time = default_timer()
+
+    if workers == 1:
+        _share(clusterer)
+        runs = [_run(experiment) for experiment in experiments]
+    else:
+        distances = clusterer.hierarchy._distances
+        memory = None
+        shared = None
+
+        if distances is not None:
+            (memory, shared) = share_array(distances)
+
+        # Runs already take every worker, so selections inside them stay serial
+        clusterer.hierarchy._distances = None
+        clusterer.workers = None
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_share, initargs=(clusterer, shared)) as executor:
+                runs = list(executor.map(_run, experiments))
+        finally:
+            clusterer.hierarchy._distances = distances
+            clusterer.workers = workers
+
+            if memory is not None:
+                memory.close()
+                memory.unlink()
+
+    run_time = default_timer() - start_time
+
+    # Every run is scored in one batch, sharing the distances and the centroid products
+    start_time = default_timer()
+    methods = [EvaluationMethod[metric.upper()] for metric in config.metrics]
+    scores = clusterer.evaluate_results([run['labels'] for run in runs], methods)
+    evaluate_time = default_timer() - start_time
+
+    for (run, score) in zip(runs, scores):
+        run['scores'] = { metric: float(score[method]) for (metric, method) in zip(config.metrics, methods) }
+
+    if config.wordcloud is not None:
+        clusterer.generate_wordclouds(
+            [(run['labels'], run['cluster_count'], _run_name(run)) for run in runs],
+            config.wordcloud,
+            workers=workers,
+        )
+
+    return {
+        'documents': clusterer.tf_idf.shape[0],
+        'terms': clusterer.tf_idf.shape[1],
+        'explained_variance': None if clusterer.explained_variance is None else float(clusterer.explained_variance),
+        'config': config._asdict(),
+        'timings': {
+            'features': feature_time,
+            'runs': run_time,
+            'evaluate': evaluate_time,
+        },
+        'runs': runs,
+    }
+
+def _run_name(run: Dict[str, Any]) -> str:
+    """Name a run like the word cloud files of the cluster command, e.g. `4-ac-w`
+    or `4-ac-w-10nn` on the k-nearest-neighbour graph
+    """
+    if run['algorithm'] == 'kmeans':
+        return f'{run["cluster_count"]}-fc'
+
+    if run['neighbors'] is not None:
+        return f'{run["cluster_count"]}-ac-{run["linkage"][0]}-{run["neighbors"]}nn'
+
+    return f'{run["cluster_count"]}-ac-{run["linkage"][0]}'
@@ -0,0 +1,150 @@
+from hashlib import sha256
+from json import dump, dumps, load
+from os import getcwd, listdir, makedirs, path, replace, utime
+from shutil import rmtree
+from time import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+
+FeatureSet = Tuple[csr_matrix, List[str], np.ndarray]
+
+class FeatureCache:
+    """On-disk store for fitted tf-idf features, keyed by the content of the
+    corpus and the vectorizer settings.
+
+    Every entry is a directory holding the CSR arrays and idf weights as
+    `.npy` files, which are memory-mapped on load, and the vocabulary as JSON.
+    """
+    def __init__(
+        self,
+        directory: str = path.join(getcwd(), '.feature_cache'),
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: Optional[float] = 7 * 24 * 60 * 60,
+    ) -> None:
+        """
+        Args:
+            directory (str, optional): Cache directory. Defaults to `.feature_cache` on current directory.
+            max_bytes (int, optional): Total size of cached entries before the least recently used are evicted. Defaults to 512 MiB.
+            max_age (float, optional): Seconds since last use before an entry is evicted, never if None. Defaults to 7 days.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def key(self, texts: List[str], settings: Dict[str, Any]) -> str:
+        """Compute the cache key of a corpus
+
+        Args:
+            texts (List[str]): Documents to be vectorized
+            settings (Dict[str, Any]): JSON serializable vectorizer settings
+
+        Returns:
+            str: Hex digest identifying the corpus and settings
+        """
+        digest = sha256(dumps(settings, sort_keys=True).encode('utf-8'))
+
+        for text in texts:
+            encoded = text.encode('utf-8')
+            digest.update(len(encoded).to_bytes(8, 'little'))
+            digest.update(encoded)
+
+        return digest.hexdigest()
+
+    def load(self, key: str) -> Optional[FeatureSet]:
+        """Load a cached tf-idf matrix
+
+        Args:
+            key (str): Cache key from `key()`
+
+        Returns:
+            Optional[FeatureSet]: tf-idf matrix, vocabulary ordered by column and idf weights. None on cache miss.
+        """
+        target = path.join(self.directory, key)
+
+        if not path.isdir(target):
+            return None
+
+        try:
+            with open(path.join(target, 'meta.json'), 'r') as file:
+                meta = load(file)
+
+            arrays = {
+                name: np.load(path.join(target, f'{name}.npy'), mmap_mode='r')
+                for name in ['data', 'indices', 'indptr', 'idf']
+            }
+
+            matrix = csr_matrix(
+                (arrays['data'], arrays['indices'], arrays['indptr']),
+                shape=tuple(meta['shape']),
+            )
+            vocabulary = meta['vocabulary']
+        except (OSError, ValueError, KeyError, TypeError):
+            # Corrupt, truncated or written by an older version, so rebuilt as a miss
+            rmtree(target, ignore_errors=True)
+            return None
+
+        utime(target) # Mark as recently used
+
+        return (matrix, vocabulary, arrays['idf'])
+
+    def store(self, key: str, matrix: csr_matrix, vocabulary: List[str], idf: np.ndarray) -> None:
+        """Save a tf-idf matrix to the cache, then evict old entries
+
+        Args:
+            key (str): Cache key from `key()`
+            matrix (csr_matrix): tf-idf matrix
+            vocabulary (List[str]): Terms ordered by matrix column
+            idf (np.ndarray): Idf weight of each term
+        """
+        target = path.join(self.directory, key)
+        staging = f'{target}.tmp'
+
+        makedirs(staging, exist_ok=True)
+
+        np.save(path.join(staging, 'data.npy'), matrix.data)
+        np.save(path.join(staging, 'indices.npy'), matrix.indices)
+        np.save(path.join(staging, 'indptr.npy'), matrix.indptr)
+        np.save(path.join(staging, 'idf.npy'), idf)
+
+        with open(path.join(staging, 'meta.json'), 'w') as file:
+            dump({ 'shape': list(matrix.shape), 'vocabulary': vocabulary }, file, ensure_ascii=True)
+
+        rmtree(target, ignore_errors=True)
+        replace(staging, target)
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove entries older than `max_age`, then the least recently used
+        ones until the cache fits in `max_bytes`
+        """
+        if not path.isdir(self.directory):
+            return
+
+        entries = []
+        now = time()
+
+        for name in listdir(self.directory):
+            target = path.join(self.directory, name)
+
+            if not path.isdir(target) or name.endswith('.tmp'):
+                continue
+
+            last_used = path.getmtime(target)
+
+            if self.max_age is not None and now - last_used > self.max_age:
+                rmtree(target, ignore_errors=True)
+                continue
+
+            size = sum(path.getsize(path.join(target, file)) for file in listdir(target))
+            entries.append((last_used, size, target))
+
+        entries.sort(reverse=True)
+        total = 0
+
+        for (_, size, target) in entries:
+            total += size
+
+            if total > self.max_bytes:
+                rmtree(target, ignore_errors=True)
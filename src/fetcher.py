@@ -0,0 +1,142 @@
+import asyncio
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+from typing import AsyncIterator, List, Optional, Tuple
+
+from src.crawl_store import CrawlStore
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.198 Safari/537.36"
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+class Fetcher:
+    """Asynchronous HTTP fetcher with a shared connection pool, global and
+    per-host concurrency limits, timeouts and retries with exponential backoff.
+
+    Must be used as an async context manager, e.g.
+    `async with Fetcher() as fetcher: body = await fetcher.fetch(url)`
+    """
+    def __init__(
+        self,
+        concurrency: int = 32,
+        per_host: int = 4,
+        timeout: float = 15.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        user_agent: str = USER_AGENT,
+        store: Optional[CrawlStore] = None,
+    ) -> None:
+        """
+        Args:
+            concurrency (int, optional): Maximum number of simultaneous connections. Defaults to 32.
+            per_host (int, optional): Maximum number of simultaneous connections to a single host. Defaults to 4.
+            timeout (float, optional): Total timeout of a single request in seconds. Defaults to 15.0.
+            retries (int, optional): Number of retries after a failed request. Defaults to 3.
+            backoff (float, optional): Delay before the first retry in seconds, doubled on every retry. Defaults to 0.5.
+            user_agent (str, optional): User agent sent on every request. Defaults to USER_AGENT.
+            store (CrawlStore, optional): Store used to revalidate and record fetched pages. Defaults to None.
+        """
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.user_agent = user_agent
+        self.store = store
+        self.session = None
+
+    async def __aenter__(self) -> 'Fetcher':
+        self.session = ClientSession(
+            connector=TCPConnector(limit=self.concurrency, limit_per_host=self.per_host),
+            timeout=ClientTimeout(total=self.timeout),
+            headers={ 'User-Agent': self.user_agent },
+        )
+
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.session.close()
+        self.session = None
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """Fetch a page
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Optional[str]: Response body. None if the request keeps failing or the page doesn't exist.
+        """
+        (_, body) = await self.fetch_response(url)
+
+        return body
+
+    async def fetch_response(self, url: str) -> Tuple[Optional[int], Optional[str]]:
+        """Fetch a page, keeping the status code of the last response
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Tuple(Optional[int], Optional[str]): Status code, None if the last attempt got no response, and response body, None unless the request succeeded
+        """
+        headers = {} if self.store is None else self.store.validators(url)
+        status = None
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.session.get(url, headers=headers) as resp:
+                    status = resp.status
+
+                    if resp.status == 304:
+                        return (status, self.store.body(url))
+
+                    if resp.status == 429 or resp.status >= 500:
+                        raise _RetryableStatus(resp.status)
+
+                    if resp.status >= 400:
+                        return (status, None)
+
+                    body = await resp.text(errors='replace')
+
+                    if self.store is not None:
+                        self.store.record(url, body, resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+
+                    return (status, body)
+            except _RetryableStatus:
+                pass
+            except (ClientError, asyncio.TimeoutError, UnicodeDecodeError):
+                status = None
+
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+        return (status, None)
+
+    async def _fetch_indexed(self, index: int, url: str) -> Tuple[int, str, Optional[str]]:
+        """Fetch a page, keeping its position on the requested URLs
+
+        Args:
+            index (int): Position of the URL
+            url (str): Page URL
+
+        Returns:
+            Tuple[int, str, Optional[str]]: Position, URL and response body of the page
+        """
+        return (index, url, await self.fetch(url))
+
+    async def fetch_all(self, urls: List[str]) -> AsyncIterator[Tuple[int, str, Optional[str]]]:
+        """Fetch pages concurrently, yielding each page as soon as it arrives
+
+        Args:
+            urls (List[str]): Page URLs
+
+        Yields:
+            Tuple(int, str, Optional[str]): Position of the URL in `urls`, the URL and its response body
+        """
+        tasks = [self._fetch_indexed(index, url) for (index, url) in enumerate(urls)]
+
+        for task in asyncio.as_completed(tasks):
+            yield await task
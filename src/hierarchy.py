@@ -0,0 +1,312 @@
+from heapq import heapify, heappop, heappush
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from scipy.cluster.hierarchy import linkage as build_linkage
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial.distance import squareform
+from sklearn.metrics import pairwise_distances
+from sklearn.neighbors import NearestNeighbors
+
+DEFAULT_NEIGHBORS = 10
+
+def knn_graph(features: Any, neighbors: int = DEFAULT_NEIGHBORS) -> csr_matrix:
+    """Build the k-nearest-neighbour graph of documents by cosine similarity,
+    computed on the sparse rows in chunks without a square distance matrix
+
+    Args:
+        features (Any): Sparse or dense l2 normalized feature matrix, one row per document
+        neighbors (int, optional): Number of neighbours of each document. Defaults to 10.
+
+    Returns:
+        csr_matrix: Directed graph weighted by the euclidean distance between documents, `sqrt(2 * cosine distance)` on normalized rows
+    """
+    count = features.shape[0]
+    neighbors = min(neighbors, count - 1)
+
+    model = NearestNeighbors(n_neighbors=neighbors, metric='cosine', algorithm='brute').fit(features)
+    (distances, indices) = model.kneighbors()
+
+    # Built by hand, so zero distances between duplicates stay as edges
+    return csr_matrix(
+        (np.sqrt(np.maximum(2 * distances, 0)).ravel(), indices.ravel(), np.arange(0, count * neighbors + 1, neighbors)),
+        shape=(count, count),
+    )
+
+# Sparse vectors as column indices and their values, much cheaper to handle
+# one at a time than scipy's sparse matrices
+_SparseVector = Tuple[np.ndarray, np.ndarray]
+
+def _sparse_dot(x: _SparseVector, y: _SparseVector) -> float:
+    """Dot product of two sparse vectors with sorted column indices, looking
+    up the columns of the shorter one on the longer one
+    """
+    if len(x[0]) > len(y[0]):
+        (x, y) = (y, x)
+
+    if len(x[0]) == 0:
+        return 0.0
+
+    positions = np.minimum(np.searchsorted(y[0], x[0]), len(y[0]) - 1)
+    found = y[0][positions] == x[0]
+
+    return float(x[1][found].dot(y[1][positions[found]]))
+
+def _sparse_add(x: _SparseVector, y: _SparseVector) -> _SparseVector:
+    """Sum of two sparse vectors with sorted column indices
+    """
+    columns = np.union1d(x[0], y[0])
+    values = np.zeros(len(columns))
+    values[np.searchsorted(columns, x[0])] += x[1]
+    values[np.searchsorted(columns, y[0])] += y[1]
+
+    return (columns, values)
+
+def graph_linkage(graph: csr_matrix, method: str, features: Any) -> np.ndarray:
+    """Agglomerate documents merging only clusters connected on a graph,
+    always picking the closest connected pair from a heap. Every merge only
+    updates the edges of the merged clusters, so the whole tree takes about
+    O(E log E) for E edges instead of O(n^2) distances.
+
+    Distances to a merged cluster follow the Lance-Williams updates of
+    `scipy.cluster.hierarchy.linkage` over the edges present on the graph.
+    Ward needs the distance to both merged clusters, so a missing one is
+    computed from the cluster centroids, and may come out below the previous
+    merge. Connected components of the graph are joined last, by the same
+    linkage over their centroids.
+
+    Args:
+        graph (csr_matrix): Graph weighted by the distance between documents, each edge used both ways
+        method (str): Linkage name, as in `Linkage` values
+        features (Any): Feature matrix, one row per document
+
+    Returns:
+        np.ndarray: Merge tree in SciPy's linkage matrix format
+    """
+    count = graph.shape[0]
+    edges: List[Optional[Dict[int, float]]] = [{} for _ in range(count)]
+
+    coordinates = graph.tocoo()
+
+    for (row, column, distance) in zip(coordinates.row.tolist(), coordinates.col.tolist(), coordinates.data.tolist()):
+        if row != column:
+            edges[row][column] = edges[column][row] = distance
+
+    heap = [(distance, a, b) for (a, neighbours) in enumerate(edges) for (b, distance) in neighbours.items() if a < b]
+    heapify(heap)
+
+    # Clusters live on slots, the larger merged cluster keeping its slot
+    ids = list(range(count))
+    sizes = [1] * count
+    tree = []
+
+    # Ward keeps the sum of the rows of every cluster and its squared norm
+    sums: List[Optional[_SparseVector]] = []
+    squared_norms: List[float] = []
+
+    if method == 'ward':
+        rows = csr_matrix(features)
+
+        if not rows.has_sorted_indices:
+            rows = rows.sorted_indices()
+
+        for slot in range(count):
+            (start, end) = (rows.indptr[slot], rows.indptr[slot + 1])
+            sums.append((rows.indices[start:end], rows.data[start:end]))
+            squared_norms.append(float(rows.data[start:end].dot(rows.data[start:end])))
+
+    def centroid_distance(a: int, b: int) -> float:
+        (size_a, size_b) = (sizes[a], sizes[b])
+        product = _sparse_dot(sums[a], sums[b])
+        squared = squared_norms[a] / size_a ** 2 + squared_norms[b] / size_b ** 2 - 2 * product / (size_a * size_b)
+
+        return float(np.sqrt(2 * size_a * size_b / (size_a + size_b) * max(squared, 0)))
+
+    def merge(a: int, b: int, height: float) -> None:
+        (size_a, size_b) = (sizes[a], sizes[b])
+
+        if size_a < size_b:
+            (a, b) = (b, a)
+            (size_a, size_b) = (size_b, size_a)
+
+        tree.append([min(ids[a], ids[b]), max(ids[a], ids[b]), height, size_a + size_b])
+
+        (large, small) = (edges[a], edges[b])
+        large.pop(b, None)
+        small.pop(a, None)
+
+        if method == 'ward':
+            total = size_a + size_b
+
+            for other in set(large) | set(small):
+                (to_a, to_b) = (large.get(other), small.get(other))
+                size_other = sizes[other]
+
+                if to_a is None:
+                    to_a = centroid_distance(a, other)
+                if to_b is None:
+                    to_b = centroid_distance(b, other)
+
+                squared = ((size_a + size_other) * to_a ** 2 + (size_b + size_other) * to_b ** 2 - size_other * height ** 2) / (total + size_other)
+                large[other] = float(np.sqrt(max(squared, 0)))
+        else:
+            for (other, to_b) in small.items():
+                to_a = large.get(other)
+
+                if to_a is None:
+                    large[other] = to_b
+                elif method == 'single':
+                    large[other] = min(to_a, to_b)
+                elif method == 'complete':
+                    large[other] = max(to_a, to_b)
+                else:
+                    large[other] = (size_a * to_a + size_b * to_b) / (size_a + size_b)
+
+        changed = large if method == 'ward' else small
+
+        for other in changed:
+            neighbours = edges[other]
+            neighbours.pop(b, None)
+            neighbours[a] = large[other]
+
+            heappush(heap, (large[other], min(a, other), max(a, other)))
+
+        if method == 'ward':
+            sums[a] = _sparse_add(sums[a], sums[b])
+            squared_norms[a] = float(sums[a][1].dot(sums[a][1]))
+            sums[b] = None
+
+        edges[b] = None
+        sizes[a] = size_a + size_b
+        ids[a] = count + len(tree) - 1
+
+    while len(heap) > 0:
+        (distance, a, b) = heappop(heap)
+
+        # Skip edges of merged clusters and outdated distances
+        if edges[a] is None or edges[b] is None or edges[a].get(b) != distance:
+            continue
+
+        merge(a, b, distance)
+
+    # A slot always holds the document it started with
+    roots = [slot for slot in range(count) if edges[slot] is not None]
+
+    if len(roots) > 1:
+        (_, components) = connected_components(graph, directed=False)
+        weights = 1 / np.bincount(components)[components]
+        centroids = csr_matrix((weights, (components, np.arange(count)))).dot(features)[components[roots]]
+
+        height = max((row[2] for row in tree), default=0.0)
+        joined = list(roots)
+
+        # Component trees are built on centroids, so they're stacked above the graph tree
+        for (first, second, distance, _) in build_linkage(pairwise_distances(centroids)[np.triu_indices(len(roots), 1)], method=method):
+            (a, b) = (joined[int(first)], joined[int(second)])
+            merge(a, b, height + distance)
+            joined.append(a if edges[a] is not None else b)
+
+    return np.array(tree, dtype=np.float64).reshape(-1, 4)
+
+def cut(tree: np.ndarray, cluster_count: int) -> np.ndarray:
+    """Label documents by applying the first merges of a tree until
+    `cluster_count` clusters are left. Unlike SciPy's `cut_tree`, it stays
+    exact on trees whose heights aren't monotonic.
+
+    Args:
+        tree (np.ndarray): Merge tree in SciPy's linkage matrix format
+        cluster_count (int): Number of desired cluster
+
+    Returns:
+        np.ndarray: Label of each document, numbered by first appearance
+    """
+    count = len(tree) + 1
+    parents = np.arange(2 * count - 1)
+
+    for (step, (a, b, _, _)) in enumerate(tree[:count - cluster_count]):
+        parents[int(a)] = parents[int(b)] = count + step
+
+    # Merged clusters have larger ids than their children, so roots are found top down
+    for node in range(2 * count - 2, -1, -1):
+        parents[node] = parents[parents[node]]
+
+    (_, first, labels) = np.unique(parents[:count], return_index=True, return_inverse=True)
+
+    return np.argsort(np.argsort(first))[labels]
+
+class HierarchyEngine:
+    """Agglomerative clustering engine which computes pairwise distances once
+    per corpus and the merge tree once per linkage, then answers labels for
+    any number of clusters by cutting the cached tree.
+
+    Trees may also be built on a k-nearest-neighbour graph, which restricts
+    merges to neighbouring documents and never computes the square distance
+    matrix, so large corpora fit in memory.
+    """
+    def __init__(self, features: Any) -> None:
+        """
+        Args:
+            features (Any): Sparse or dense feature matrix, one row per document
+        """
+        self.features = features
+        self._distances = None
+        self._graphs: Dict[int, csr_matrix] = {}
+        self._trees: Dict[Tuple[str, Optional[int]], np.ndarray] = {}
+
+    @property
+    def distances(self) -> np.ndarray:
+        """Square euclidean distance matrix between documents, computed on
+        first access
+        """
+        if self._distances is None:
+            self._distances = pairwise_distances(self.features, metric='euclidean')
+
+        return self._distances
+
+    def graph(self, neighbors: int = DEFAULT_NEIGHBORS) -> csr_matrix:
+        """Get the k-nearest-neighbour graph of documents
+
+        Args:
+            neighbors (int, optional): Number of neighbours of each document. Defaults to 10.
+
+        Returns:
+            csr_matrix: Directed graph weighted by the euclidean distance between documents
+        """
+        if neighbors not in self._graphs:
+            self._graphs[neighbors] = knn_graph(self.features, neighbors)
+
+        return self._graphs[neighbors]
+
+    def tree(self, linkage: str, neighbors: Optional[int] = None) -> np.ndarray:
+        """Get the full merge tree of a linkage
+
+        Args:
+            linkage (str): Linkage name, as in `Linkage` values
+            neighbors (int, optional): Only merge clusters connected on the k-nearest-neighbour graph with this many neighbours. Exact if None. Defaults to None.
+
+        Returns:
+            np.ndarray: Merge tree in SciPy's linkage matrix format
+        """
+        key = (linkage, neighbors)
+
+        if key not in self._trees:
+            if neighbors is None:
+                condensed = squareform(self.distances, checks=False)
+                self._trees[key] = build_linkage(condensed, method=linkage)
+            else:
+                self._trees[key] = graph_linkage(self.graph(neighbors), linkage, self.features)
+
+        return self._trees[key]
+
+    def cut(self, linkage: str, cluster_count: int, neighbors: Optional[int] = None) -> np.ndarray:
+        """Label documents by cutting a merge tree into clusters
+
+        Args:
+            linkage (str): Linkage name, as in `Linkage` values
+            cluster_count (int): Number of desired cluster
+            neighbors (int, optional): Cut the tree built on the k-nearest-neighbour graph with this many neighbours. Exact if None. Defaults to None.
+
+        Returns:
+            np.ndarray: Label of each document
+        """
+        return cut(self.tree(linkage, neighbors), cluster_count)
@@ -0,0 +1,242 @@
+import tracemalloc
+from contextlib import contextmanager
+from cProfile import Profile
+from json import dump
+from os import makedirs, path
+from time import process_time
+from timeit import default_timer
+from typing import Any, Dict, Iterator, List, Optional
+
+METRIC_PREFIX = 'hackerbits_stage'
+
+class Span:
+    """Measurements of a single run of a named stage.
+
+    `items` may be updated while the span is open, e.g. once the number of
+    parsed articles is known.
+    """
+    __slots__ = ('name', 'items', 'wall', 'cpu', 'peak_memory', '_start_memory', '_peak')
+
+    def __init__(self, name: str, items: int = 0) -> None:
+        self.name = name
+        self.items = items
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_memory = None
+        self._start_memory = 0
+        self._peak = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'items': self.items,
+            'wall': self.wall,
+            'cpu': self.cpu,
+            'peak_memory': self.peak_memory,
+        }
+
+class Instrumentation:
+    """Recorder of named spans with wall time, CPU time, traced memory peak
+    and item count of every stage, optionally with a cProfile dump per stage.
+
+    Only the current process is measured, work done on process pools only
+    shows up as wall time. Spans may nest or overlap, like the concurrent
+    stages of a crawl, in which case each of them counts the CPU time of the
+    whole process. Profilers can't overlap, so a span starting while another
+    one is profiled is profiled as part of it.
+    """
+    def __init__(self, trace_memory: bool = True, profile: bool = False) -> None:
+        """
+        Args:
+            trace_memory (bool, optional): Trace the memory peak of every span with tracemalloc, which slows allocations down. Defaults to True.
+            profile (bool, optional): Profile every stage with cProfile. Defaults to False.
+        """
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.spans: List[Span] = []
+        self.profiles: Dict[str, Profile] = {}
+
+        self._open: List[Span] = []
+        self._profiled: Optional[Span] = None
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _update_peaks(self) -> int:
+        """Fold the traced memory peak since the last span boundary into
+        every open span, so each span keeps its own peak
+
+        Returns:
+            int: Currently traced memory
+        """
+        (current, peak) = tracemalloc.get_traced_memory()
+
+        for span in self._open:
+            span._peak = max(span._peak, peak)
+
+        # Python < 3.9 can't reset the peak, so it stays process-wide
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+        return current
+
+    @contextmanager
+    def span(self, name: str, items: int = 0) -> Iterator[Span]:
+        """Measure a stage
+
+        Args:
+            name (str): Stage name, e.g. `tokenize`
+            items (int, optional): Number of processed items. Defaults to 0.
+
+        Yields:
+            Span: Open span
+        """
+        span = Span(name, items)
+
+        if self.trace_memory:
+            span._start_memory = self._update_peaks()
+
+        self._open.append(span)
+
+        if self.profile and self._profiled is None:
+            self._profiled = span
+            self.profiles.setdefault(name, Profile()).enable()
+
+        start_time = default_timer()
+        start_cpu = process_time()
+
+        try:
+            yield span
+        finally:
+            span.wall = default_timer() - start_time
+            span.cpu = process_time() - start_cpu
+
+            if self._profiled is span:
+                self.profiles[name].disable()
+                self._profiled = None
+
+            if self.trace_memory:
+                self._update_peaks()
+                span.peak_memory = max(span._peak - span._start_memory, 0)
+
+            self._open.remove(span)
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate spans by stage name
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Number of spans, total wall time, CPU time and items, and the largest memory peak of each stage
+        """
+        result = {}
+
+        for span in self.spans:
+            stage = result.setdefault(span.name, {
+                'spans': 0,
+                'items': 0,
+                'wall': 0.0,
+                'cpu': 0.0,
+                'peak_memory': None,
+            })
+
+            stage['spans'] += 1
+            stage['items'] += span.items
+            stage['wall'] += span.wall
+            stage['cpu'] += span.cpu
+
+            if span.peak_memory is not None:
+                stage['peak_memory'] = max(stage['peak_memory'] or 0, span.peak_memory)
+
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'stages': self.summary(),
+            'spans': [span.to_dict() for span in self.spans],
+        }
+
+    def to_prometheus(self) -> str:
+        """Export the stage summary in Prometheus text exposition format,
+        e.g. for the node exporter textfile collector
+
+        Returns:
+            str: Prometheus metrics
+        """
+        metrics = [
+            ('wall_seconds', 'wall', 'Wall time spent on the stage'),
+            ('cpu_seconds', 'cpu', 'CPU time of the main process spent on the stage'),
+            ('peak_memory_bytes', 'peak_memory', 'Largest traced memory peak of the stage'),
+            ('items', 'items', 'Number of items processed by the stage'),
+            ('spans', 'spans', 'Number of times the stage ran'),
+        ]
+
+        summary = self.summary()
+        lines = []
+
+        for (metric, key, description) in metrics:
+            lines.append(f'# HELP {METRIC_PREFIX}_{metric} {description}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{metric} gauge')
+
+            for (name, stage) in summary.items():
+                if stage[key] is not None:
+                    lines.append(f'{METRIC_PREFIX}_{metric}{{stage="{name}"}} {stage[key]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, name: Optional[str] = None, profile_dir: str = 'profile') -> None:
+        """Write the measurements to `<name>.json` and `<name>.prom`, and
+        every stage profile to `<profile_dir>/<stage>.prof`
+
+        Args:
+            name (str, optional): Name of the metric files, skipped if None. Defaults to None.
+            profile_dir (str, optional): Folder of the profile dumps. Defaults to 'profile'.
+        """
+        if name is not None:
+            with open(f'{name}.json', 'w') as file:
+                dump(self.to_dict(), file, indent=4)
+
+            with open(f'{name}.prom', 'w') as file:
+                file.write(self.to_prometheus())
+
+        if len(self.profiles) > 0:
+            makedirs(profile_dir, exist_ok=True)
+
+            for (stage, profile) in self.profiles.items():
+                profile.dump_stats(path.join(profile_dir, f'{stage}.prof'))
+
+_instrumentation: Optional[Instrumentation] = None
+
+def enable(trace_memory: bool = True, profile: bool = False) -> Instrumentation:
+    """Start recording spans of every stage on this process
+
+    Args:
+        trace_memory (bool, optional): Trace the memory peak of every span. Defaults to True.
+        profile (bool, optional): Profile every stage with cProfile. Defaults to False.
+
+    Returns:
+        Instrumentation: Active recorder
+    """
+    global _instrumentation
+
+    _instrumentation = Instrumentation(trace_memory=trace_memory, profile=profile)
+
+    return _instrumentation
+
+@contextmanager
+def span(name: str, items: int = 0) -> Iterator[Span]:
+    """Measure a stage on the active recorder, only counting its items when
+    instrumentation isn't enabled
+
+    Args:
+        name (str): Stage name, e.g. `tokenize`
+        items (int, optional): Number of processed items. Defaults to 0.
+
+    Yields:
+        Span: Open span
+    """
+    if _instrumentation is None:
+        yield Span(name, items)
+        return
+
+    with _instrumentation.span(name, items) as result:
+        yield result
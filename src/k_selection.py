@@ -0,0 +1,179 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+import numpy as np
+from sklearn.cluster import KMeans
+
+from src.evaluation import Evaluator, silhouette_from_distances
+from src.hierarchy import cut
+
+DEFAULT_K_RANGE = range(2, 15)
+SAMPLE_SIZE = 1000
+
+class KSelection(NamedTuple):
+    """Result of a cluster count selection
+    """
+    best: int
+    scores: Dict[int, float]
+
+_shared = {}
+
+SharedArray = Tuple[str, Tuple[int, ...], str]
+
+def share_array(array: np.ndarray) -> Tuple[SharedMemory, SharedArray]:
+    """Copy an array to a new shared memory block, to be mapped by worker
+    processes instead of pickled once per worker. The caller closes and
+    unlinks the block once the workers are done.
+
+    Args:
+        array (np.ndarray): Array to be shared
+
+    Returns:
+        Tuple[SharedMemory, SharedArray]: Shared memory block, and its name, shape and dtype
+    """
+    memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[:] = array
+
+    return (memory, (memory.name, array.shape, array.dtype.str))
+
+def attach_array(shared: SharedArray) -> Tuple[SharedMemory, np.ndarray]:
+    """Map an array shared by `share_array`
+
+    Args:
+        shared (SharedArray): Shared memory name, shape and dtype
+
+    Returns:
+        Tuple[SharedMemory, np.ndarray]: Mapping, which must outlive the array, and the array viewing it
+    """
+    (name, shape, dtype) = shared
+    memory = SharedMemory(name=name)
+
+    return (memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+
+def _share(features: Any, distances: Optional[SharedArray], tree: Optional[np.ndarray]) -> None:
+    """Keep the shared inputs of a selection on the worker process. The
+    distance matrix is mapped from shared memory instead of being pickled
+    once per worker.
+
+    Args:
+        features (Any): Feature matrix, one row per document
+        distances (SharedArray, optional): Shared memory name, shape and dtype of the square distance matrix. None to estimate silhouette from a sample.
+        tree (np.ndarray, optional): Merge tree for agglomerative clustering, None for K-Means
+    """
+    _shared['features'] = features
+    _shared['distances'] = None
+    _shared['tree'] = tree
+
+    if distances is not None:
+        (_shared['memory'], _shared['distances']) = attach_array(distances)
+
+def _score(k: int, features: Any, distances: Optional[np.ndarray], tree: Optional[np.ndarray]) -> float:
+    """Compute silhouette score of a clustering with `k` clusters
+
+    Args:
+        k (int): Number of clusters
+        features (Any): Feature matrix, one row per document
+        distances (np.ndarray, optional): Square distance matrix between documents. Estimate silhouette from the same sample of documents for every k if None.
+        tree (np.ndarray, optional): Merge tree for agglomerative clustering, None for K-Means
+
+    Returns:
+        float: Silhouette score
+    """
+    if tree is None:
+        labels = KMeans(n_clusters=k).fit(features).labels_
+    else:
+        labels = cut(tree, k)
+
+    if distances is None:
+        return Evaluator(features).sampled_silhouette(labels, sample_size=SAMPLE_SIZE, seed=0).score
+
+    return silhouette_from_distances(distances, labels)
+
+def _score_shared(k: int) -> float:
+    """Compute silhouette score of a clustering with `k` clusters on the
+    inputs shared with the worker process
+
+    Args:
+        k (int): Number of clusters
+
+    Returns:
+        float: Silhouette score
+    """
+    return _score(k, _shared['features'], _shared['distances'], _shared['tree'])
+
+def _has_peaked(scores: Dict[int, float], patience: Optional[int]) -> bool:
+    """Determine if the best score was followed by `patience` worse scores
+
+    Args:
+        scores (Dict[int, float]): Scores computed so far, in ascending k
+        patience (int, optional): Number of non-improving k before stopping. Never stop if None.
+
+    Returns:
+        bool: True if the selection can stop
+    """
+    if patience is None or len(scores) == 0:
+        return False
+
+    ks = list(scores.keys())
+    best = max(ks, key=lambda k: scores[k])
+
+    return len(ks) - 1 - ks.index(best) >= patience
+
+def select_cluster_count(
+    features: Any,
+    distances: Optional[np.ndarray],
+    tree: Optional[np.ndarray] = None,
+    k_range: Iterable[int] = DEFAULT_K_RANGE,
+    workers: Optional[int] = None,
+    patience: Optional[int] = None,
+) -> KSelection:
+    """Get optimum number of cluster using silhouette method
+
+    Args:
+        features (Any): Feature matrix, one row per document
+        distances (np.ndarray, optional): Square euclidean distance matrix between documents. If None, silhouette is estimated from a sample of documents without the matrix.
+        tree (np.ndarray, optional): Merge tree to be cut for agglomerative clustering. Uses K-Means if None. Defaults to None.
+        k_range (Iterable[int], optional): Candidate cluster counts. Defaults to 2 until 14.
+        workers (int, optional): Number of worker processes. Score on the current process if None or 1. Defaults to None.
+        patience (int, optional): Stop once this many consecutive k fail to beat the best score. Defaults to None.
+
+    Returns:
+        KSelection: Best cluster count and the score of every evaluated k
+    """
+    ks = sorted(k_range)
+    scores = {}
+
+    if workers is None or workers <= 1:
+        for k in ks:
+            scores[k] = _score(k, features, distances, tree)
+
+            if _has_peaked(scores, patience):
+                break
+    else:
+        memory = None
+        shared = None
+
+        if distances is not None:
+            (memory, shared) = share_array(distances)
+
+        try:
+            # Score one batch per worker round, so early stopping wastes at most a round
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_share,
+                initargs=(features, shared, tree),
+            ) as executor:
+                for start in range(0, len(ks), workers):
+                    batch = ks[start:start + workers]
+                    scores.update(zip(batch, executor.map(_score_shared, batch)))
+
+                    if _has_peaked(scores, patience):
+                        break
+        finally:
+            if memory is not None:
+                memory.close()
+                memory.unlink()
+
+    best = max(scores.keys(), key=lambda k: scores[k])
+
+    return KSelection(best=best, scores=scores)
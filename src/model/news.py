@@ -1,11 +1,53 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 class News:
-    def __init__(self, authors: List[str], title: str, published_at: datetime, contents: str) -> None:
+    __slots__ = ('authors', 'title', 'contents', 'published_at', 'url')
+
+    def __init__(self, authors: List[str], title: str, published_at: datetime, contents: str, url: Optional[str] = None) -> None:
         self.authors = authors
         self.title = title
         self.contents = contents
+        self.published_at = None if published_at is None else published_at.isoformat()
+        self.url = url
+
+    def to_dict(self) -> dict:
+        """Serialize the news, omitting empty publish date and URL
+
+        Returns:
+            dict: Serialized news
+        """
+        data = {
+            'authors': self.authors,
+            'title': self.title,
+            'contents': self.contents,
+        }
+
+        if self.published_at is not None:
+            data['published_at'] = self.published_at
+        if self.url is not None:
+            data['url'] = self.url
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'News':
+        """Restore a news from its serialized form
+
+        Args:
+            data (dict): Serialized news, as written on crawling result
+
+        Returns:
+            News: Restored news
+        """
+        news = cls(
+            authors=data['authors'],
+            title=data['title'],
+            published_at=None,
+            contents=data['contents'],
+            url=data.get('url'),
+        )
+
+        news.published_at = data.get('published_at')
 
-        if published_at is not None:
-            self.published_at = published_at.isoformat()
\ No newline at end of file
+        return news
@@ -0,0 +1,207 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+from sys import intern
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from src.model.news import News
+
+NO_DATE = np.iinfo(np.int64).min
+NO_OFFSET = np.iinfo(np.int32).min
+
+_EPOCH = datetime(1970, 1, 1)
+
+class TextColumn(Sequence):
+    """Read-only sequence of texts stored as one contiguous string and the
+    offset of each text
+    """
+    __slots__ = ('buffer', 'offsets')
+
+    def __init__(self, buffer: str, offsets: array) -> None:
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if index < 0 or index >= len(self):
+            raise IndexError('Text index out of range')
+
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        buffer = self.buffer
+        offsets = self.offsets
+
+        for i in range(len(offsets) - 1):
+            yield buffer[offsets[i]:offsets[i + 1]]
+
+class _TextColumnBuilder:
+    def __init__(self) -> None:
+        self.parts = []
+        self.offsets = array('q', [0])
+
+    def append(self, text: str) -> None:
+        self.parts.append(text)
+        self.offsets.append(self.offsets[-1] + len(text))
+
+    def build(self) -> TextColumn:
+        return TextColumn(''.join(self.parts), self.offsets)
+
+def _to_epoch(published_at: Optional[str]) -> Tuple[int, int]:
+    """Convert an ISO date to microseconds since epoch and its UTC offset in
+    seconds. Naive dates are taken as UTC and have `NO_OFFSET`.
+    """
+    if published_at is None:
+        return (NO_DATE, NO_OFFSET)
+
+    date = datetime.fromisoformat(published_at)
+    offset = NO_OFFSET
+
+    if date.tzinfo is not None:
+        offset = int(date.utcoffset().total_seconds())
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+
+    delta = date - _EPOCH
+
+    # Integer arithmetic, as float seconds can't hold every microsecond
+    return ((delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds, offset)
+
+def _from_epoch(epoch: int, offset: int) -> Optional[datetime]:
+    """Convert microseconds since epoch back to a date, in its original UTC
+    offset
+
+    Args:
+        epoch (int): Microseconds since epoch, `NO_DATE` when unknown
+        offset (int): UTC offset in seconds, `NO_OFFSET` for naive dates
+
+    Returns:
+        Optional[datetime]: Publish date. None when unknown.
+    """
+    if epoch == NO_DATE:
+        return None
+
+    date = _EPOCH + timedelta(microseconds=int(epoch))
+
+    if offset == NO_OFFSET:
+        return date
+
+    zone = timezone(timedelta(seconds=int(offset)))
+
+    return date.replace(tzinfo=timezone.utc).astimezone(zone)
+
+class NewsCorpus:
+    """Columnar collection of news.
+
+    Titles, contents and URLs are kept in contiguous text columns, author
+    names are interned into a single table and publish dates are kept as an
+    int64 array of microseconds since epoch (`NO_DATE` when unknown) along with
+    their UTC offsets.
+    """
+    def __init__(
+        self,
+        titles: TextColumn,
+        contents: TextColumn,
+        urls: TextColumn,
+        author_table: List[str],
+        author_ids: np.ndarray,
+        author_offsets: np.ndarray,
+        published_at: np.ndarray,
+        published_offset: np.ndarray,
+    ) -> None:
+        self.titles = titles
+        self.contents = contents
+        self.urls = urls
+        self.author_table = author_table
+        self.author_ids = author_ids
+        self.author_offsets = author_offsets
+        self.published_at = published_at
+        self.published_offset = published_offset
+
+    @classmethod
+    def from_news(cls, news: Iterable[News]) -> 'NewsCorpus':
+        """Build a corpus from news, consuming them one by one
+
+        Args:
+            news (Iterable[News]): News, may be a lazy reader
+
+        Returns:
+            NewsCorpus: Columnar corpus
+        """
+        titles = _TextColumnBuilder()
+        contents = _TextColumnBuilder()
+        urls = _TextColumnBuilder()
+
+        author_table = []
+        author_index: Dict[str, int] = {}
+        author_ids = array('q')
+        author_offsets = array('q', [0])
+        published_at = array('q')
+        published_offset = array('i')
+
+        for item in news:
+            titles.append(item.title)
+            contents.append(item.contents)
+            urls.append(item.url or '')
+
+            for author in item.authors:
+                if author not in author_index:
+                    author_index[author] = len(author_table)
+                    author_table.append(intern(author))
+
+                author_ids.append(author_index[author])
+
+            author_offsets.append(len(author_ids))
+            (epoch, offset) = _to_epoch(item.published_at)
+            published_at.append(epoch)
+            published_offset.append(offset)
+
+        return cls(
+            titles=titles.build(),
+            contents=contents.build(),
+            urls=urls.build(),
+            author_table=author_table,
+            author_ids=np.frombuffer(author_ids, dtype=np.int64),
+            author_offsets=np.frombuffer(author_offsets, dtype=np.int64),
+            published_at=np.frombuffer(published_at, dtype=np.int64),
+            published_offset=np.frombuffer(published_offset, dtype=np.int32),
+        )
+
+    def authors(self, index: int) -> List[str]:
+        """Get author names of a news
+
+        Args:
+            index (int): Position of the news
+
+        Returns:
+            List[str]: Author names
+        """
+        ids = self.author_ids[self.author_offsets[index]:self.author_offsets[index + 1]]
+
+        return [self.author_table[i] for i in ids]
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    def __getitem__(self, index: int) -> News:
+        if index < 0:
+            index += len(self)
+
+        return News(
+            authors=self.authors(index),
+            title=self.titles[index],
+            published_at=_from_epoch(self.published_at[index], self.published_offset[index]),
+            contents=self.contents[index],
+            url=self.urls[index] or None,
+        )
+
+    def __iter__(self) -> Iterator[News]:
+        for index in range(len(self)):
+            yield self[index]
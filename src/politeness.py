@@ -0,0 +1,212 @@
+import asyncio
+from time import monotonic
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from src.fetcher import Fetcher
+
+ROBOTS_TTL = 24 * 60 * 60
+ROBOTS_RETRY = 10 * 60
+
+class TokenBucket:
+    """Rate limiter refilled with `rate` tokens per second, up to `capacity`.
+
+    Tokens may be borrowed, so concurrent callers are served in the order
+    they asked instead of racing for the next token.
+    """
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """
+        Args:
+            rate (float): Number of tokens added per second
+            capacity (float, optional): Maximum number of stored tokens, i.e. the allowed burst. Defaults to 1.0.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+
+    def reserve(self) -> float:
+        """Take a token, borrowing it if the bucket is empty
+
+        Returns:
+            float: Seconds to wait before the token may be used
+        """
+        now = monotonic()
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        return max(-self.tokens / self.rate, 0.0)
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it
+        """
+        delay = self.reserve()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class HostPolicy(NamedTuple):
+    """Cached robots.txt rules of a single host
+    """
+    robots: RobotFileParser
+    delay: float
+    bucket: Optional[TokenBucket]
+    expires_at: float
+
+class Politeness:
+    """Per-host politeness manager for polite crawls.
+
+    The robots.txt of every host is downloaded once and cached for `ttl`
+    seconds. Requests to a host are spaced by its crawl delay (or request
+    rate) through a token bucket of that host, so requests to different hosts
+    never wait for each other.
+
+    Like `RobotFileParser.read`, a robots.txt answered with 401 or 403
+    disallows the whole host and any other client error allows it. An
+    unreachable robots.txt (server errors, 429 or timeouts) keeps the rules
+    cached before, or disallows the host if there are none, until it's
+    retried `retry` seconds later.
+    """
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        ttl: float = ROBOTS_TTL,
+        default_delay: float = 0.0,
+        retry: float = ROBOTS_RETRY,
+    ) -> None:
+        """
+        Args:
+            fetcher (Fetcher): Fetcher used to download robots.txt and the pages
+            ttl (float, optional): Seconds a robots.txt is cached for. Defaults to a day.
+            default_delay (float, optional): Seconds between requests to hosts without crawl delay. Defaults to 0.0.
+            retry (float, optional): Seconds before an unreachable robots.txt is downloaded again. Defaults to 10 minutes.
+        """
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.default_delay = default_delay
+        self.retry = retry
+        self.policies: Dict[str, HostPolicy] = {}
+
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _download_policy(self, host: str) -> Optional[HostPolicy]:
+        """Download and parse the robots.txt of a host. A robots.txt
+        answered with 401 or 403 disallows everything, while a missing one
+        allows everything.
+
+        Args:
+            host (str): Scheme and network location, e.g. `https://news.ycombinator.com`
+
+        Returns:
+            Optional[HostPolicy]: Rules of the host. None if robots.txt is unreachable.
+        """
+        (status, body) = await self.fetcher.fetch_response(f'{host}/robots.txt')
+        robots = RobotFileParser(url=f'{host}/robots.txt')
+        delay = self.default_delay
+
+        if status in (401, 403):
+            robots.disallow_all = True
+        elif status is not None and 400 <= status < 500 and status != 429:
+            robots.allow_all = True
+        elif body is None:
+            return None
+        else:
+            robots.parse(body.splitlines())
+
+            crawl_delay = robots.crawl_delay(self.fetcher.user_agent)
+            request_rate = robots.request_rate(self.fetcher.user_agent)
+
+            if crawl_delay is not None:
+                delay = float(crawl_delay)
+            elif request_rate is not None and request_rate.requests > 0:
+                delay = request_rate.seconds / request_rate.requests
+
+        return HostPolicy(
+            robots=robots,
+            delay=delay,
+            bucket=TokenBucket(1 / delay) if delay > 0 else None,
+            expires_at=monotonic() + self.ttl,
+        )
+
+    async def policy(self, url: str) -> HostPolicy:
+        """Get the cached rules of the host of a URL, downloading them once
+        even if many requests to the host are waiting for them
+
+        Args:
+            url (str): Any URL on the host
+
+        Returns:
+            HostPolicy: Rules of the host
+        """
+        parts = urlsplit(url)
+        host = f'{parts.scheme}://{parts.netloc}'
+        policy = self.policies.get(host)
+
+        if policy is not None and policy.expires_at > monotonic():
+            return policy
+
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            policy = self.policies.get(host)
+
+            if policy is None or policy.expires_at <= monotonic():
+                refreshed = await self._download_policy(host)
+
+                if refreshed is None and policy is not None:
+                    # Keep the previous rules until robots.txt is reachable again
+                    refreshed = policy._replace(expires_at=monotonic() + self.retry)
+                elif refreshed is None:
+                    robots = RobotFileParser(url=f'{host}/robots.txt')
+                    robots.disallow_all = True
+
+                    refreshed = HostPolicy(robots=robots, delay=self.default_delay, bucket=None, expires_at=monotonic() + self.retry)
+                elif policy is not None and policy.delay == refreshed.delay:
+                    # Keep pacing with the previous bucket if the delay didn't change
+                    refreshed = refreshed._replace(bucket=policy.bucket)
+
+                policy = self.policies[host] = refreshed
+
+        return policy
+
+    async def can_fetch(self, url: str) -> bool:
+        """Determine if robots.txt allows fetching a URL
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            bool: True if the page may be fetched
+        """
+        policy = await self.policy(url)
+
+        return policy.robots.can_fetch(self.fetcher.user_agent, url)
+
+    async def wait(self, url: str) -> None:
+        """Wait for the crawl delay of the host of a URL
+
+        Args:
+            url (str): Page URL
+        """
+        policy = await self.policy(url)
+
+        if policy.bucket is not None:
+            await policy.bucket.acquire()
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """Fetch a page once robots.txt allows it and the host's crawl
+        delay has passed
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Optional[str]: Response body. None if the page is disallowed, the request keeps failing or the page doesn't exist.
+        """
+        if not await self.can_fetch(url):
+            return None
+
+        await self.wait(url)
+
+        return await self.fetcher.fetch(url)
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta
+from html import escape
+from itertools import accumulate
+from random import Random
+from typing import List
+
+from src.model.news import News
+
+_SYLLABLES = [
+    'ba', 'be', 'bi', 'bo', 'ca', 'ce', 'co', 'da', 'de', 'di', 'do', 'fa', 'fe', 'ga', 'ge', 'go',
+    'ka', 'ke', 'ki', 'la', 'le', 'li', 'lo', 'ma', 'me', 'mi', 'mo', 'na', 'ne', 'ni', 'no', 'pa',
+    'pe', 'pi', 'po', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'si', 'so', 'ta', 'te', 'ti', 'to', 'va',
+    've', 'vi', 'za', 'ze', 'zi', 'zo', 'tion', 'ment', 'ing', 'er', 'ly', 'ous',
+]
+
+_FILLERS = ['the', 'a', 'of', 'and', 'to', 'in', 'is', 'that', 'for', 'with', 'on', 'as', 'it', 'by']
+
+_BOILERPLATE = (
+    'Are you a robot?',
+    'Why did this happen?\n\nPlease make sure your browser supports JavaScript and cookies and that '
+    'you are not blocking them from loading. For more information you can review our Terms of Service '
+    'and Cookie Policy.',
+)
+
+AUTHORS = 500
+
+def _vocabulary(rng: Random, size: int) -> List[str]:
+    """Generate distinct made-up words from random syllables
+
+    Args:
+        rng (Random): Seeded random generator
+        size (int): Number of words
+
+    Returns:
+        List[str]: Sorted words
+    """
+    words = set()
+
+    while len(words) < size:
+        words.add(''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+
+    return sorted(words)
+
+def generate_corpus(
+    count: int,
+    seed: int = 0,
+    topics: int = 8,
+    vocabulary: int = 5000,
+    mean_words: int = 600,
+    boilerplate_rate: float = 0.02,
+) -> List[News]:
+    """Generate a reproducible HackerNews-like corpus. Every article mostly
+    draws words from one topic, whose word frequencies follow Zipf's law,
+    and a few are bot-wall boilerplate like the ones found on real crawls.
+    A corpus is always a prefix of a larger corpus generated with the same
+    seed and settings.
+
+    Args:
+        count (int): Number of articles
+        seed (int, optional): Random seed, equal seeds generate equal corpora. Defaults to 0.
+        topics (int, optional): Number of topics. Defaults to 8.
+        vocabulary (int, optional): Number of distinct content words. Defaults to 5000.
+        mean_words (int, optional): Average article length in words. Defaults to 600.
+        boilerplate_rate (float, optional): Ratio of boilerplate pages. Defaults to 0.02.
+
+    Returns:
+        List[News]: Generated articles
+    """
+    rng = Random(seed)
+    words = _vocabulary(rng, vocabulary)
+    zipf = list(accumulate(1 / rank for rank in range(1, vocabulary + 1)))
+
+    topic_words = []
+
+    for _ in range(topics):
+        shuffled = words[:]
+        rng.shuffle(shuffled)
+        topic_words.append(shuffled)
+
+    # Fixed pools keep a smaller corpus a prefix of a larger one with the same seed
+    authors = [f'{rng.choice(words).capitalize()} {rng.choice(words).capitalize()}' for _ in range(AUTHORS)]
+    start = datetime(2021, 1, 1)
+    result = []
+
+    for index in range(count):
+        published_at = start + timedelta(seconds=rng.randrange(365 * 24 * 60 * 60))
+        url = f'https://example.com/{index}'
+
+        if rng.random() < boilerplate_rate:
+            result.append(News(authors=[], title=_BOILERPLATE[0], published_at=published_at, contents=_BOILERPLATE[1], url=url))
+            continue
+
+        topic = rng.randrange(topics)
+        length = max(int(rng.lognormvariate(0, 0.5) * mean_words), 20)
+
+        # Mostly topical words, with some noise from other topics and stopwords
+        sources = [topic_words[topic] if rng.random() < 0.8 else rng.choice(topic_words) for _ in range(length)]
+        drawn = rng.choices(range(vocabulary), cum_weights=zipf, k=length)
+        tokens = [
+            rng.choice(_FILLERS) if rng.random() < 0.3 else source[rank]
+            for (source, rank) in zip(sources, drawn)
+        ]
+
+        sentences = []
+        position = 0
+
+        while position < len(tokens):
+            size = rng.randint(8, 20)
+            sentence = ' '.join(tokens[position:position + size])
+            sentences.append(sentence[0].upper() + sentence[1:] + '.')
+            position += size
+
+        paragraphs = [' '.join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+        title = ' '.join(word.capitalize() for word in rng.sample(topic_words[topic][:50], 5))
+
+        result.append(
+            News(
+                authors=rng.sample(authors, rng.randint(0, 2)),
+                title=title,
+                published_at=published_at,
+                contents='\n\n'.join(paragraphs),
+                url=url,
+            )
+        )
+
+    return result
+
+def render_listing_page(urls: List[str], page: int = 1) -> str:
+    """Render a HackerNews-like listing page linking to `urls`
+
+    Args:
+        urls (List[str]): Story URLs, 30 per page on HackerNews
+        page (int, optional): Page number, used for ranks and item ids. Defaults to 1.
+
+    Returns:
+        str: Listing page HTML
+    """
+    rows = []
+
+    for (position, url) in enumerate(urls):
+        rank = (page - 1) * 30 + position + 1
+        item = 25000000 + rank
+
+        rows.append(
+            f'<tr class="athing" id="{item}">'
+            f'<td align="right" valign="top" class="title"><span class="rank">{rank}.</span></td>'
+            f'<td class="title"><a href="{escape(url)}" class="storylink">Story {rank}</a></td></tr>'
+            f'<tr><td colspan="2"></td><td class="subtext">'
+            f'<span class="score" id="score_{item}">{300 - rank} points</span></td></tr>'
+            '<tr class="spacer" style="height:5px"></tr>'
+        )
+
+    return (
+        '<html lang="en"><head><title>Hacker News</title></head><body><center>'
+        '<table id="hnmain"><tr><td><table class="itemlist">'
+        f'{"".join(rows)}'
+        '</table></td></tr></table></center></body></html>'
+    )
+
+def render_article(news: News) -> str:
+    """Render a news as a plain article page
+
+    Args:
+        news (News): Article to be rendered
+
+    Returns:
+        str: Article page HTML
+    """
+    paragraphs = ''.join(f'<p>{escape(paragraph)}</p>' for paragraph in news.contents.split('\n\n'))
+    authors = ''.join(f'<meta name="author" content="{escape(author)}">' for author in news.authors)
+    published = '' if news.published_at is None else f'<meta property="article:published_time" content="{news.published_at}">'
+
+    return (
+        f'<html><head><title>{escape(news.title)}</title>{authors}{published}</head>'
+        f'<body><article><h1>{escape(news.title)}</h1>{paragraphs}</article></body></html>'
+    )
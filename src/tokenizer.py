@@ -0,0 +1,146 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from re import compile
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+STEM_CACHE_SIZE = 2 ** 16
+DEFAULT_CHUNK_SIZE = 32
+
+# Bump on any change to the tokens produced, so cached features are rebuilt
+TOKENIZER_VERSION = 1
+
+_non_word = compile("[^a-zA-Z-]+")
+_stopwords: Optional[FrozenSet[str]] = None
+
+# NLTK takes seconds to import, so it's loaded on the first tokenized text
+_stemmer = None
+word_tokenize: Optional[Callable[[str], List[str]]] = None
+
+def _load_nltk() -> None:
+    """Import NLTK's word tokenizer and Porter stemmer on first use
+    """
+    global _stemmer, word_tokenize
+
+    from nltk import word_tokenize as nltk_word_tokenize
+    from nltk.stem.porter import PorterStemmer
+
+    _stemmer = PorterStemmer()
+    word_tokenize = nltk_word_tokenize
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def _stem(token: str) -> str:
+    """Stem a single token, memoized across documents
+
+    Args:
+        token (str): Lowercased token
+
+    Returns:
+        str: Stemmed token
+    """
+    return _stemmer.stem(token)
+
+def _get_stopwords() -> FrozenSet[str]:
+    """Load english stopwords once per process
+
+    Returns:
+        FrozenSet[str]: Set of english stopwords
+    """
+    global _stopwords
+
+    if _stopwords is None:
+        from nltk.corpus import stopwords
+
+        _stopwords = frozenset(stopwords.words('english'))
+
+    return _stopwords
+
+def tokenizer_identity() -> Dict[str, Any]:
+    """Describe what the produced tokens depend on, without loading NLTK
+
+    Returns:
+        Dict[str, Any]: JSON serializable tokenizer version, token filter and NLTK version
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        nltk_version = version('nltk')
+    except PackageNotFoundError:
+        nltk_version = None
+
+    return {
+        'version': TOKENIZER_VERSION,
+        'non_word': _non_word.pattern,
+        'stemmer': 'porter',
+        'stopwords': 'english',
+        'nltk': nltk_version,
+    }
+
+def tokenize(text: str) -> List[str]:
+    """Generate tokens from a long text
+
+    Args:
+        text (str): Text to be processed.
+
+    Returns:
+        List[str]: List of tokens
+    """
+    if word_tokenize is None:
+        _load_nltk()
+
+    stop = _get_stopwords()
+    tokens = []
+
+    for token in word_tokenize(text):
+        token = _stem(token.lower())
+
+        if token not in stop and _non_word.search(token) is None:
+            tokens.append(token)
+
+    return tokens
+
+def pretokenized(tokens: List[str]) -> List[str]:
+    """Analyzer for vectorizers fed with the output of `tokenize_corpus`,
+    passing the tokens through
+
+    Args:
+        tokens (List[str]): Tokens of a text
+
+    Returns:
+        List[str]: The same tokens
+    """
+    return tokens
+
+def _tokenize_chunk(texts: List[str]) -> List[List[str]]:
+    """Tokenize a chunk of texts in a worker process
+
+    Args:
+        texts (List[str]): Texts to be processed
+
+    Returns:
+        List[List[str]]: Tokens of each text
+    """
+    return [tokenize(text.lower()) for text in texts]
+
+def tokenize_corpus(texts: List[str], workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[List[str]]:
+    """Tokenize a list of texts the same way `TfidfVectorizer` would do with
+    `tokenize` as its tokenizer, optionally in parallel chunks.
+
+    Args:
+        texts (List[str]): Texts to be processed
+        workers (int, optional): Number of worker processes. Tokenize on the current process if None or 1. Defaults to None.
+        chunk_size (int, optional): Number of texts sent to a worker at once. Defaults to DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        List[List[str]]: Tokens of each text, in the same order as `texts`
+    """
+    if workers is None or workers <= 1:
+        return _tokenize_chunk(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    result = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for tokens in executor.map(_tokenize_chunk, chunks):
+            result.extend(tokens)
+
+    return result
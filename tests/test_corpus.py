@@ -0,0 +1,49 @@
+from datetime import datetime
+from os import path, utime
+
+from src.corpus import CorpusReader, CorpusWriter, _encode
+from src.model.news import News
+
+def _news(number: int) -> News:
+    return News(authors=[], title=f'Story {number}', published_at=None, contents=f'Contents {number}', url=f'https://example.com/{number}')
+
+def test_appending_keeps_the_latest_crawl_time(tmpdir):
+    filename = str(tmpdir.join('corpus.jsonl'))
+
+    with CorpusWriter(filename, datetime(2021, 1, 1)) as writer:
+        writer.write(_news(0))
+        writer.write(_news(1))
+
+    with CorpusWriter(filename, datetime(2021, 2, 1)) as writer:
+        writer.write(_news(2))
+
+    reader = CorpusReader(filename)
+
+    assert reader.fetched_at == '2021-02-01T00:00:00'
+    assert [news.title for news in reader] == ['Story 0', 'Story 1', 'Story 2']
+    assert [reader[i].title for i in range(len(reader))] == ['Story 0', 'Story 1', 'Story 2']
+
+def test_appending_rebuilds_an_outdated_index(tmpdir):
+    filename = str(tmpdir.join('corpus.jsonl'))
+
+    with CorpusWriter(filename, datetime(2021, 1, 1)) as writer:
+        writer.write(_news(0))
+
+    # A crawl stopped before closing its writer leaves the index behind
+    with open(filename, 'ab') as file:
+        file.write(_encode(_news(1).to_dict()))
+
+    mtime = path.getmtime(filename)
+    utime(f'{filename}.idx', (mtime - 10, mtime - 10))
+    utime(f'{filename}.meta', (mtime - 10, mtime - 10))
+
+    assert CorpusReader(filename).fetched_at == '2021-01-01T00:00:00'
+
+    with CorpusWriter(filename, datetime(2021, 2, 1)) as writer:
+        writer.write(_news(2))
+
+    reader = CorpusReader(filename)
+
+    assert len(reader) == 3
+    assert [reader[i].title for i in range(3)] == ['Story 0', 'Story 1', 'Story 2']
+    assert reader.fetched_at == '2021-02-01T00:00:00'
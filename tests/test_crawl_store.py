@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from src.crawl_store import CrawlStore
+from src.crawler import CrawlingResult
+from src.model.news import News
+
+def _news(number: int, url: bool = True) -> News:
+    return News(
+        authors=[],
+        title=f'Story {number}',
+        published_at=None,
+        contents=f'Contents {number}',
+        url=f'https://example.com/{number}' if url else None,
+    )
+
+def test_store_keeps_revalidatable_pages_across_instances(tmpdir):
+    store = CrawlStore(str(tmpdir))
+    store.record('https://example.com/etag', 'tagged', etag='"v1"')
+    store.record('https://example.com/plain', 'untagged')
+    store.mark_article('https://example.com/etag', True)
+    store.mark_article('https://example.com/plain', False)
+    store.save()
+
+    reloaded = CrawlStore(str(tmpdir))
+
+    assert reloaded.validators('https://example.com/etag') == { 'If-None-Match': '"v1"' }
+    assert reloaded.body('https://example.com/etag') == 'tagged'
+    assert reloaded.validators('https://example.com/plain') == {}
+    assert reloaded.body('https://example.com/plain') is None
+    assert reloaded.is_article('https://example.com/etag') is True
+    assert reloaded.is_article('https://example.com/plain') is False
+    assert reloaded.is_article('https://example.com/other') is None
+
+def test_cleared_store_forgets_every_url(tmpdir):
+    store = CrawlStore(str(tmpdir))
+    store.record('https://example.com/etag', 'tagged', etag='"v1"')
+    store.mark_article('https://example.com/etag', True)
+    store.save()
+
+    CrawlStore(str(tmpdir)).clear()
+    reloaded = CrawlStore(str(tmpdir))
+
+    assert reloaded.is_article('https://example.com/etag') is None
+    assert reloaded.validators('https://example.com/etag') == {}
+
+def test_extend_skips_news_already_on_the_result():
+    previous = CrawlingResult([_news(0), _news(1)], datetime(2021, 1, 1))
+    newer = CrawlingResult([_news(1), _news(2)], datetime(2021, 2, 1))
+
+    merged = previous.extend(newer)
+
+    assert [news.title for news in merged.news] == ['Story 0', 'Story 1', 'Story 2']
+    assert merged.time == datetime(2021, 2, 1)
+
+def test_extend_matches_news_written_without_url_by_their_text():
+    previous = CrawlingResult([_news(0, url=False), _news(1, url=False)], datetime(2021, 1, 1))
+    newer = CrawlingResult([_news(1), _news(2)], datetime(2021, 2, 1))
+
+    merged = previous.extend(newer)
+
+    assert [news.title for news in merged.news] == ['Story 0', 'Story 1', 'Story 2']
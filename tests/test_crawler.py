@@ -0,0 +1,153 @@
+import asyncio
+from os import _exit
+from random import Random
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.crawl_store import CrawlStore
+from src.crawler import _crawl_hn_for_news, _fetch_news_sync, _parse_pages
+from src.fetcher import Fetcher
+from src.politeness import Politeness
+
+_WORDS = 'alpha beta gamma delta epsilon server python cluster news article token vector'.split()
+
+def _article(item_id: int) -> str:
+    rng = Random(item_id)
+    paragraphs = ''.join(
+        '<p>' + ' '.join(rng.choice(_WORDS) for _ in range(60)) + '.</p>' for _ in range(5)
+    )
+
+    return f'<html><head><title>Story {item_id}</title></head><body><article><h1>Story {item_id}</h1>{paragraphs}</article></body></html>'
+
+def _hn_app(pages: int, robots: str, hits: dict) -> web.Application:
+    """Stub HackerNews with `pages` listing pages of 30 stories, every story
+    linking to an article on the stub itself
+    """
+    hits['news'] = 0
+
+    async def robots_txt(_):
+        return web.Response(text=robots)
+
+    async def listing(request):
+        hits['news'] += 1
+        page = int(request.query.get('p', '1'))
+        rows = ''
+
+        if page <= pages:
+            rows = ''.join(
+                f'<tr class="athing" id="{page * 100 + i}"><td><span class="rank">{(page - 1) * 30 + i + 1}.</span>'
+                f'<a href="{request.url.origin()}/a/{page * 100 + i}" class="storylink">Story</a></td></tr>'
+                for i in range(30)
+            )
+
+        return web.Response(text=f'<html><table>{rows}</table></html>', content_type='text/html')
+
+    async def article(request):
+        return web.Response(text=_article(int(request.match_info['id'])), content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/robots.txt', robots_txt)
+    app.router.add_get('/news', listing)
+    app.router.add_get('/a/{id}', article)
+
+    return app
+
+def _on_first_page(url: str) -> bool:
+    return int(url.rsplit('/', 1)[1]) < 200
+
+def _parse_or_crash(pages, user_agent):
+    """Parse worker crashing on any chunk holding a story of the first page
+    """
+    if any(_on_first_page(url) for (_, url, _) in pages):
+        raise ImportError('newspaper')
+
+    return _parse_pages(pages, user_agent)
+
+def _parse_or_die(pages, user_agent):
+    """Parse worker dying, like on a segfault, on any chunk holding a story
+    of the first page
+    """
+    if any(_on_first_page(url) for (_, url, _) in pages):
+        _exit(1)
+
+    return _parse_pages(pages, user_agent)
+
+def _run(app: web.Application, scenario):
+    async def main():
+        async with TestServer(app) as server:
+            return await scenario(str(server.make_url('')).rstrip('/'))
+
+    return asyncio.run(main())
+
+def test_polite_listing_stops_at_the_first_empty_page():
+    hits = {}
+
+    async def scenario(base_url):
+        async with Fetcher() as fetcher:
+            return await _fetch_news_sync(300, Politeness(fetcher), 1, base_url)
+
+    (stories, page) = _run(_hn_app(4, 'User-agent: *\nAllow: /\n', hits), scenario)
+
+    assert len(stories) == 120
+    assert page == 5
+    assert hits['news'] == 5
+
+def test_polite_crawl_lists_only_the_pages_it_needs():
+    hits = {}
+
+    async def scenario(base_url):
+        return await _crawl_hn_for_news(40, True, base_url, Fetcher(), 2, 8, None)
+
+    (news, failures, _) = _run(_hn_app(4, 'User-agent: *\nDisallow: /a/1\n', hits), scenario)
+
+    assert len(news) == 40
+    assert failures['disallowed'] == 30
+    assert hits['news'] <= 5
+
+def test_crawl_survives_a_crashing_parse_worker(monkeypatch):
+    monkeypatch.setattr('src.crawler._parse_pages', _parse_or_crash)
+    hits = {}
+
+    async def scenario(base_url):
+        return await _crawl_hn_for_news(40, False, base_url, Fetcher(), 2, 8, None)
+
+    (news, failures, _) = _run(_hn_app(4, 'User-agent: *\nAllow: /\n', hits), scenario)
+
+    assert len(news) == 40
+    assert failures['parse'] >= 30
+    assert not any(_on_first_page(item.url) for item in news)
+
+def test_incremental_crawl_collects_articles_past_the_previous_limit(tmpdir):
+    hits = {}
+    app = _hn_app(4, 'User-agent: *\nAllow: /\n', hits)
+
+    async def scenario(base_url):
+        first = await _crawl_hn_for_news(20, False, base_url, Fetcher(store=CrawlStore(str(tmpdir))), 2, 8, None)
+        store = CrawlStore(str(tmpdir))
+        marked = [url for (url, entry) in store.index.items() if entry.get('article')]
+        second = await _crawl_hn_for_news(40, False, base_url, Fetcher(store=store), 2, 8, None)
+
+        return (first[0], marked, second[0])
+
+    (first, marked, second) = _run(app, scenario)
+    first_urls = set(news.url for news in first)
+    second_urls = set(news.url for news in second)
+
+    assert len(first) == 20
+    assert set(marked) == first_urls
+    assert len(second) == 20
+    assert first_urls.isdisjoint(second_urls)
+
+def test_crawl_replaces_a_pool_broken_by_a_dead_worker(monkeypatch):
+    monkeypatch.setattr('src.crawler._parse_pages', _parse_or_die)
+    hits = {}
+
+    async def scenario(base_url):
+        return await _crawl_hn_for_news(40, False, base_url, Fetcher(), 2, 8, None)
+
+    (news, failures, _) = _run(_hn_app(20, 'User-agent: *\nAllow: /\n', hits), scenario)
+
+    assert len(news) == 40
+    assert failures['parse'] >= 30
+    assert not any(_on_first_page(item.url) for item in news)
@@ -0,0 +1,26 @@
+import numpy as np
+from scipy.sparse import random as sparse_random
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_score
+from sklearn.preprocessing import normalize
+
+from src.evaluation import EvaluationMethod, Evaluator
+
+def test_batched_scores_match_scikit_learn():
+    features = normalize(sparse_random(120, 400, density=0.05, random_state=0, format='csr'))
+    rng = np.random.default_rng(0)
+    labelings = [rng.integers(0, cluster_count, 120) * 3 for cluster_count in (2, 4, 7)]
+
+    scores = Evaluator(features).score_many(labelings)
+
+    for (labels, score) in zip(labelings, scores):
+        assert np.isclose(score[EvaluationMethod.SILHOUETTE], silhouette_score(features, labels))
+        assert np.isclose(score[EvaluationMethod.CALINSKI_HARABASZ], calinski_harabasz_score(features.toarray(), labels))
+        assert np.isclose(score[EvaluationMethod.DAVIES_BOULDIN], davies_bouldin_score(features.toarray(), labels))
+
+def test_batched_scores_only_hold_the_requested_methods():
+    features = normalize(sparse_random(50, 100, density=0.1, random_state=1, format='csr'))
+    labels = np.arange(50) % 3
+
+    (score,) = Evaluator(features).score_many([labels], [EvaluationMethod.DAVIES_BOULDIN])
+
+    assert list(score) == [EvaluationMethod.DAVIES_BOULDIN]
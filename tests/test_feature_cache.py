@@ -0,0 +1,57 @@
+from json import dump
+from os import path
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src import tokenizer
+from src.clustering import _cache_settings
+from src.feature_cache import FeatureCache
+
+def _store(cache: FeatureCache) -> str:
+    key = cache.key(['first text', 'second text'], { 'max_df': 1.0 })
+    matrix = csr_matrix(np.array([[0.5, 0.0], [0.0, 1.0]]))
+    cache.store(key, matrix, ['first', 'second'], np.ones(2))
+
+    return key
+
+def test_meta_without_an_expected_key_is_a_miss(tmpdir):
+    cache = FeatureCache(str(tmpdir))
+    key = _store(cache)
+
+    with open(path.join(str(tmpdir), key, 'meta.json'), 'w') as file:
+        dump({ 'shape': [2, 2] }, file)
+
+    assert cache.load(key) is None
+    assert not path.exists(path.join(str(tmpdir), key))
+
+def test_truncated_array_is_a_miss(tmpdir):
+    cache = FeatureCache(str(tmpdir))
+    key = _store(cache)
+    data = path.join(str(tmpdir), key, 'data.npy')
+
+    with open(data, 'rb') as file:
+        content = file.read()
+    with open(data, 'wb') as file:
+        file.write(content[:len(content) - 8])
+
+    assert cache.load(key) is None
+
+def test_stored_features_load_back(tmpdir):
+    cache = FeatureCache(str(tmpdir))
+    key = _store(cache)
+
+    (matrix, vocabulary, idf) = cache.load(key)
+
+    assert np.allclose(matrix.toarray(), [[0.5, 0.0], [0.0, 1.0]])
+    assert vocabulary == ['first', 'second']
+    assert np.allclose(idf, 1)
+
+def test_tokenizer_changes_invalidate_cached_features(tmpdir, monkeypatch):
+    cache = FeatureCache(str(tmpdir))
+    texts = ['first text', 'second text']
+    key = cache.key(texts, _cache_settings())
+
+    monkeypatch.setattr(tokenizer, 'TOKENIZER_VERSION', tokenizer.TOKENIZER_VERSION + 1)
+
+    assert cache.key(texts, _cache_settings()) != key
@@ -0,0 +1,170 @@
+import asyncio
+from time import monotonic
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.crawl_store import CrawlStore
+from src.fetcher import Fetcher
+
+def _run(app: web.Application, scenario):
+    """Run a scenario against a stub HTTP server serving `app`
+    """
+    async def main():
+        async with TestServer(app) as server:
+            return await scenario(server)
+
+    return asyncio.run(main())
+
+def _flaky_app(status: int, failures: int, state: dict) -> web.Application:
+    """Stub answering `status` to the first `failures` requests, counting
+    them on `state['attempts']`
+    """
+    state['attempts'] = 0
+
+    async def handler(_):
+        state['attempts'] += 1
+
+        if state['attempts'] <= failures:
+            return web.Response(status=status)
+
+        return web.Response(text='recovered')
+
+    app = web.Application()
+    app.router.add_get('/page', handler)
+
+    return app
+
+def test_retries_server_errors_with_backoff():
+    state = {}
+    app = _flaky_app(503, 2, state)
+
+    async def scenario(server):
+        async with Fetcher(retries=3, backoff=0.05) as fetcher:
+            start = monotonic()
+            body = await fetcher.fetch(str(server.make_url('/page')))
+
+            return (body, monotonic() - start)
+
+    (body, elapsed) = _run(app, scenario)
+
+    assert body == 'recovered'
+    assert state['attempts'] == 3
+    assert elapsed >= 0.05 + 0.1
+
+def test_retries_rate_limited_requests():
+    state = {}
+    app = _flaky_app(429, 1, state)
+
+    async def scenario(server):
+        async with Fetcher(retries=3, backoff=0.01) as fetcher:
+            return await fetcher.fetch(str(server.make_url('/page')))
+
+    assert _run(app, scenario) == 'recovered'
+    assert state['attempts'] == 2
+
+def test_gives_up_after_the_last_retry():
+    state = {}
+    app = _flaky_app(500, 10, state)
+
+    async def scenario(server):
+        async with Fetcher(retries=2, backoff=0.01) as fetcher:
+            return await fetcher.fetch(str(server.make_url('/page')))
+
+    assert _run(app, scenario) is None
+    assert state['attempts'] == 3
+
+def test_missing_page_is_not_retried():
+    state = {}
+    app = _flaky_app(404, 10, state)
+
+    async def scenario(server):
+        async with Fetcher(retries=3, backoff=0.01) as fetcher:
+            return await fetcher.fetch(str(server.make_url('/page')))
+
+    assert _run(app, scenario) is None
+    assert state['attempts'] == 1
+
+def test_limits_connections_per_host():
+    app = web.Application()
+    state = { 'active': 0, 'peak': 0 }
+
+    async def handler(request):
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(0.05)
+        state['active'] -= 1
+
+        return web.Response(text=request.match_info['id'])
+
+    app.router.add_get('/page/{id}', handler)
+
+    async def scenario(server):
+        urls = [str(server.make_url(f'/page/{i}')) for i in range(12)]
+
+        async with Fetcher(concurrency=32, per_host=3) as fetcher:
+            return [item async for item in fetcher.fetch_all(urls)]
+
+    results = _run(app, scenario)
+
+    assert len(results) == 12
+    assert state['peak'] == 3
+
+def test_fetch_all_yields_indexes_of_requested_urls():
+    app = web.Application()
+
+    async def handler(request):
+        index = int(request.match_info['id'])
+
+        # Later URLs answer first
+        await asyncio.sleep(0.02 * (5 - index))
+
+        return web.Response(text=f'body {index}')
+
+    app.router.add_get('/page/{id}', handler)
+
+    async def scenario(server):
+        urls = [str(server.make_url(f'/page/{i}')) for i in range(6)]
+
+        async with Fetcher(per_host=6) as fetcher:
+            return (urls, [item async for item in fetcher.fetch_all(urls)])
+
+    (urls, results) = _run(app, scenario)
+
+    assert [index for (index, _, _) in results] == [5, 4, 3, 2, 1, 0]
+
+    for (index, url, body) in results:
+        assert url == urls[index]
+        assert body == f'body {index}'
+
+def test_revalidates_stored_pages(tmpdir):
+    app = web.Application()
+    state = { 'sent': 0, 'revalidated': 0 }
+
+    async def handler(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            state['revalidated'] += 1
+            return web.Response(status=304)
+
+        state['sent'] += 1
+        return web.Response(text='stored body', headers={ 'ETag': '"v1"' })
+
+    app.router.add_get('/page', handler)
+
+    async def scenario(server):
+        url = str(server.make_url('/page'))
+        store = CrawlStore(str(tmpdir))
+
+        async with Fetcher(store=store) as fetcher:
+            first = await fetcher.fetch(url)
+
+        store.save()
+
+        # A later crawl loads the store from disk
+        async with Fetcher(store=CrawlStore(str(tmpdir))) as fetcher:
+            second = await fetcher.fetch(url)
+
+        return (first, second)
+
+    assert _run(app, scenario) == ('stored body', 'stored body')
+    assert state == { 'sent': 1, 'revalidated': 1 }
@@ -0,0 +1,15 @@
+import numpy as np
+from scipy.cluster.hierarchy import linkage
+from scipy.sparse import random as sparse_random
+from sklearn.preprocessing import normalize
+
+from src.hierarchy import graph_linkage, knn_graph
+
+def test_ward_on_a_complete_graph_matches_scipy_on_sparse_rows():
+    features = normalize(sparse_random(60, 5000, density=0.01, random_state=0, format='csr'))
+
+    tree = graph_linkage(knn_graph(features, 59), 'ward', features)
+    expected = linkage(features.toarray(), method='ward')
+
+    assert np.allclose(tree[:, 2], expected[:, 2])
+    assert np.array_equal(tree[:, 3], expected[:, 3])
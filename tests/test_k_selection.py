@@ -0,0 +1,37 @@
+import numpy as np
+from sklearn.datasets import make_blobs
+from sklearn.preprocessing import normalize
+
+from src.hierarchy import HierarchyEngine
+from src.k_selection import select_cluster_count
+
+def _blobs() -> np.ndarray:
+    (features, _) = make_blobs(n_samples=300, centers=4, n_features=8, cluster_std=0.5, random_state=0)
+
+    return normalize(features)
+
+def test_graph_selection_never_computes_pairwise_distances():
+    engine = HierarchyEngine(_blobs())
+    selection = select_cluster_count(engine.features, None, tree=engine.tree('average', 10), k_range=range(2, 8))
+
+    assert engine._distances is None
+    assert selection.best == 4
+
+def test_graph_selection_scores_match_on_worker_processes():
+    engine = HierarchyEngine(_blobs())
+    tree = engine.tree('ward', 10)
+
+    serial = select_cluster_count(engine.features, None, tree=tree, k_range=range(2, 8))
+    parallel = select_cluster_count(engine.features, None, tree=tree, k_range=range(2, 8), workers=2)
+
+    assert serial == parallel
+
+def test_shared_distances_give_the_serial_scores():
+    engine = HierarchyEngine(_blobs())
+    tree = engine.tree('average')
+
+    serial = select_cluster_count(engine.features, engine.distances, tree=tree, k_range=range(2, 8))
+    parallel = select_cluster_count(engine.features, engine.distances, tree=tree, k_range=range(2, 8), workers=3)
+
+    assert serial.best == parallel.best == 4
+    assert np.allclose([serial.scores[k] for k in serial.scores], [parallel.scores[k] for k in serial.scores])
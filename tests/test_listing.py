@@ -0,0 +1,81 @@
+import asyncio
+from os import path
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from bs4 import BeautifulSoup
+
+from src.crawler import HN_BASE_URL, Story, _fetch_news_async, _parse_listing, _parse_response_body
+from src.fetcher import Fetcher
+from src.synthetic import render_listing_page
+
+_fixture = path.join(path.dirname(path.abspath(__file__)), 'fixtures', 'hn_listing.html')
+
+def _load_fixture() -> str:
+    with open(_fixture, 'r') as file:
+        return file.read()
+
+def _parse_with_bs4(resp_body: str) -> list:
+    """Listing parser used before lxml, kept as the reference output
+    """
+    urls = []
+
+    for news_title in BeautifulSoup(resp_body, 'html.parser').select('.storylink'):
+        url = news_title.get('href')
+
+        if not url.startswith('http'):
+            url = f'{HN_BASE_URL}/{url}'
+
+        if not url.endswith('.pdf'):
+            urls.append(url)
+
+    return urls
+
+def test_listing_urls_match_the_bs4_parser():
+    body = _load_fixture()
+
+    assert _parse_response_body(body) == _parse_with_bs4(body)
+
+def test_synthetic_listing_urls_match_the_bs4_parser():
+    body = render_listing_page([f'https://example.com/{i}' for i in range(30)] + ['item?id=1', 'https://example.com/a.pdf'], 2)
+
+    assert _parse_response_body(body) == _parse_with_bs4(body)
+
+def test_listing_keeps_rank_score_and_item_id():
+    assert _parse_listing(_load_fixture()) == [
+        Story(url='https://www.sqlite.org/howtocorrupt.html', item_id=25866233, rank=1, score=412),
+        Story(url=f'{HN_BASE_URL}/item?id=25867417', item_id=25867417, rank=2, score=97),
+        Story(url='https://jobs.lever.co/example/3a1f', item_id=25865094, rank=3, score=None),
+        Story(url='https://github.com/example/tiny-lisp', item_id=25866951, rank=5, score=1),
+        Story(url='https://www.bbc.com/news/technology-55742211?utm_source=hn&ref=front', item_id=25863385, rank=6, score=1024),
+    ]
+
+def test_relative_links_use_the_base_url():
+    stories = _parse_listing(_load_fixture(), 'http://127.0.0.1:8080')
+
+    assert stories[1].url == 'http://127.0.0.1:8080/item?id=25867417'
+
+def test_empty_listing_has_no_stories():
+    assert _parse_listing('') == []
+    assert _parse_listing('<html><table class="itemlist"></table></html>') == []
+
+def test_listing_pages_are_parsed_from_a_stub_server():
+    async def listing(request):
+        body = _load_fixture() if request.query.get('p') == '1' else '<html></html>'
+
+        return web.Response(text=body, content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/news', listing)
+
+    async def main():
+        async with TestServer(app) as server, Fetcher() as fetcher:
+            base_url = str(server.make_url('')).rstrip('/')
+
+            return (base_url, await _fetch_news_async(60, fetcher, 1, base_url))
+
+    (base_url, (stories, page)) = asyncio.run(main())
+
+    assert page == 3
+    assert [story.rank for story in stories] == [1, 2, 3, 5, 6]
+    assert stories[1].url == f'{base_url}/item?id=25867417'
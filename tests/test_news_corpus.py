@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta, timezone
+
+from src.model.news import News
+from src.model.news_corpus import NewsCorpus
+
+def _news(published_at) -> News:
+    return News(authors=['Ada', 'Grace'], title='Title', published_at=published_at, contents='Contents', url='https://example.com')
+
+def test_roundtrip_keeps_fractional_seconds():
+    dates = [
+        datetime(2020, 12, 31, 23, 59, 59, 999999),
+        datetime(2021, 1, 2, 3, 4, 5, 678901, tzinfo=timezone(timedelta(hours=7))),
+        datetime(1969, 7, 20, 20, 17, 40, 500000, tzinfo=timezone.utc),
+        None,
+    ]
+    news = [_news(date) for date in dates]
+
+    restored = list(NewsCorpus.from_news(news))
+
+    assert [item.published_at for item in restored] == [item.published_at for item in news]
+    assert [item.to_dict() for item in restored] == [item.to_dict() for item in news]
@@ -0,0 +1,82 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.fetcher import Fetcher
+from src.politeness import Politeness
+
+def _robots_app(answers: list, hits: dict) -> web.Application:
+    """Stub answering robots.txt with the next `(status, body)` of `answers`,
+    the last one repeating
+    """
+    hits['robots'] = 0
+
+    async def robots_txt(_):
+        (status, body) = answers[min(hits['robots'], len(answers) - 1)]
+        hits['robots'] += 1
+
+        return web.Response(status=status, text=body)
+
+    app = web.Application()
+    app.router.add_get('/robots.txt', robots_txt)
+
+    return app
+
+def _can_fetch(answers: list, paths: list, **kwargs) -> list:
+    """Check robots.txt rules for `paths`, expiring the cached rules before
+    every check
+    """
+    hits = {}
+
+    async def main():
+        async with TestServer(_robots_app(answers, hits)) as server, Fetcher(retries=1, backoff=0.01) as fetcher:
+            politeness = Politeness(fetcher, **kwargs)
+            allowed = []
+
+            for url_path in paths:
+                allowed.append(await politeness.can_fetch(str(server.make_url(url_path))))
+
+                for (host, policy) in politeness.policies.items():
+                    politeness.policies[host] = policy._replace(expires_at=0)
+
+            return allowed
+
+    return asyncio.run(main())
+
+def test_forbidden_robots_txt_disallows_the_host():
+    assert _can_fetch([(403, 'User-agent: *\nAllow: /\n')], ['/news']) == [False]
+    assert _can_fetch([(401, '')], ['/news']) == [False]
+
+def test_missing_robots_txt_allows_the_host():
+    assert _can_fetch([(404, '')], ['/news']) == [True]
+
+def test_parsed_robots_txt_rules_apply():
+    assert _can_fetch([(200, 'User-agent: *\nDisallow: /private\n')], ['/news', '/private/page']) == [True, False]
+
+def test_unreachable_robots_txt_disallows_the_host():
+    assert _can_fetch([(503, '')], ['/news']) == [False]
+    assert _can_fetch([(429, '')], ['/news']) == [False]
+
+def test_unreachable_robots_txt_keeps_the_cached_rules():
+    answers = [(200, 'User-agent: *\nDisallow: /private\n'), (500, '')]
+
+    assert _can_fetch(answers, ['/news', '/news', '/private/page']) == [True, True, False]
+
+def test_robots_txt_is_downloaded_once_per_host():
+    hits = {}
+
+    async def main():
+        async with TestServer(_robots_app([(200, 'User-agent: *\nCrawl-delay: 1\n')], hits)) as server, Fetcher() as fetcher:
+            politeness = Politeness(fetcher)
+            urls = [str(server.make_url(f'/page/{i}')) for i in range(5)]
+
+            allowed = await asyncio.gather(*[politeness.can_fetch(url) for url in urls])
+
+            return (allowed, (await politeness.policy(urls[0])).delay)
+
+    (allowed, delay) = asyncio.run(main())
+
+    assert allowed == [True] * 5
+    assert delay == 1.0
+    assert hits['robots'] == 1
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from os import path
+
+import pytest
+
+_root = path.dirname(path.dirname(path.abspath(__file__)))
+
+# Loaded by the commands needing them, never by the entry point itself
+HEAVY_MODULES = ['sklearn', 'scipy', 'numpy', 'newspaper', 'wordcloud', 'matplotlib', 'nltk', 'nltk.corpus', 'aiohttp', 'lxml']
+
+def _loaded_modules(code: str) -> set:
+    """Run `code` on a fresh interpreter and list the modules it loaded
+    """
+    script = f'{code}\nimport sys\nprint("\\n".join(sys.modules))'
+    output = subprocess.run([sys.executable, '-c', script], cwd=_root, check=True, capture_output=True, text=True)
+
+    return set(output.stdout.splitlines())
+
+@pytest.mark.parametrize('module', HEAVY_MODULES)
+def test_importing_the_entry_point_skips_heavy_modules(module):
+    assert module not in _loaded_modules('import main')
+
+def test_parsing_arguments_skips_heavy_modules():
+    code = '\n'.join([
+        'import sys, main',
+        'sys.argv = ["main.py", "init", "--help"]',
+        'try:',
+        '    main.main()',
+        'except SystemExit:',
+        '    pass',
+    ])
+
+    assert _loaded_modules(code).isdisjoint(HEAVY_MODULES)
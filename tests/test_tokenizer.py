@@ -0,0 +1,68 @@
+from re import findall, search
+
+from nltk.stem.porter import PorterStemmer
+
+from src import tokenizer
+from src.tokenizer import tokenize_corpus
+
+_TEXTS = [
+    'The Quick brown foxes were jumping over the lazy dogs, weren\'t they?',
+    'Rust 1.50 ships const-generics; C++20 modules are still experimental.',
+    'This was the HN front page at 10:30 -- self-hosted servers and e-mail.',
+    'Clustering news articles: tf-idf, k-means and agglomerative clustering.',
+    '',
+    'ÜNICODE naïve café résumé, running runners ran',
+] * 3
+
+def _nltk_data_available() -> bool:
+    try:
+        from nltk import word_tokenize
+        from nltk.corpus import stopwords
+
+        stopwords.words('english')
+        word_tokenize('probe')
+    except LookupError:
+        return False
+
+    return True
+
+def _simple_word_tokenize(text: str) -> list:
+    return findall(r"\w+|[^\w\s]+", text)
+
+def _original_tokenize(text: str, word_tokenize, stopwords: list) -> list:
+    """Tokenizer of the clusterer before the cached pipeline, fed with text
+    lowercased like `TfidfVectorizer` does
+    """
+    tokens = word_tokenize(text.lower())
+    tokens = [token.lower() for token in tokens]
+
+    stemmer = PorterStemmer()
+    tokens = [stemmer.stem(token) for token in tokens]
+
+    tokens = list(filter(lambda token: token not in stopwords, tokens))
+
+    return list(filter(lambda token: search("[^a-zA-Z-]+", token) is None, tokens))
+
+def test_tokens_are_identical_to_the_original_pipeline(monkeypatch):
+    if _nltk_data_available():
+        from nltk import word_tokenize
+        from nltk.corpus import stopwords
+
+        stopword_list = stopwords.words('english')
+    else:
+        # Without NLTK data, both pipelines share a small tokenizer and stopword list
+        word_tokenize = _simple_word_tokenize
+        stopword_list = ['the', 'a', 'over', 'they', 'are', 'and', 'at', 'this', 'was', 'were', 'still']
+
+        monkeypatch.setattr(tokenizer, '_stemmer', PorterStemmer())
+        monkeypatch.setattr(tokenizer, 'word_tokenize', word_tokenize)
+        monkeypatch.setattr(tokenizer, '_stopwords', frozenset(stopword_list))
+
+    tokenizer._stem.cache_clear()
+
+    expected = [_original_tokenize(text, word_tokenize, stopword_list) for text in _TEXTS]
+
+    assert tokenize_corpus(_TEXTS) == expected
+    assert tokenize_corpus(_TEXTS, workers=2, chunk_size=4) == expected
+
+    tokenizer._stem.cache_clear()